@@ -0,0 +1,149 @@
+# bench_write_path.py
+# Benchmark del camino de escritura: pandas con copias encadenadas vs una sola conversión a Arrow
+#
+#   python bench_write_path.py [--games 1230] [--repeat 3]
+#
+# Genera una temporada sintética de boxscores (BoxScoreTraditionalV2, ~26 filas por partido),
+# la pasa por los dos caminos con el mismo schema de BQ y compara tiempo y memoria pico.
+# La memoria se mide por separado: tracemalloc ve pandas/numpy pero no el memory pool de Arrow,
+# así que cada camino corre además con un pool proxy propio (pico aislado por medición).
+import argparse, os, re, tempfile, time, tracemalloc
+from typing import Callable, Dict, Tuple
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
+import pyarrow as pa
+
+from nba_parquet import df_to_arrow, write_parquet_stream
+from nba_schema import CastPlan
+
+BOXSCORE_SCHEMA: Dict[str, str] = {
+    "game_id": "STRING", "team_id": "INT64", "team_abbreviation": "STRING", "team_city": "STRING",
+    "player_id": "INT64", "player_name": "STRING", "nickname": "STRING", "start_position": "STRING",
+    "comment": "STRING", "min": "STRING",
+    "fgm": "FLOAT64", "fga": "FLOAT64", "fg_pct": "FLOAT64", "fg3m": "FLOAT64", "fg3a": "FLOAT64",
+    "fg3_pct": "FLOAT64", "ftm": "FLOAT64", "fta": "FLOAT64", "ft_pct": "FLOAT64", "oreb": "FLOAT64",
+    "dreb": "FLOAT64", "reb": "FLOAT64", "ast": "FLOAT64", "stl": "FLOAT64", "blk": "FLOAT64",
+    "to": "FLOAT64", "pf": "FLOAT64", "pts": "FLOAT64", "plus_minus": "FLOAT64",
+    "game_date": "TIMESTAMP",
+}
+STAT_COLS = ["FGM", "FGA", "FG_PCT", "FG3M", "FG3A", "FG3_PCT", "FTM", "FTA", "FT_PCT", "OREB",
+             "DREB", "REB", "AST", "STL", "BLK", "TO", "PF", "PTS", "PLUS_MINUS"]
+
+def synthetic_season(games: int, players_per_game: int = 26, seed: int = 7) -> pd.DataFrame:
+    """Boxscores con los nombres/tipos crudos de la API (mayúsculas, IDs int, fechas en ns)."""
+    rng = np.random.default_rng(seed)
+    n = games * players_per_game
+    game_idx = np.repeat(np.arange(games), players_per_game)
+    df = pd.DataFrame({
+        "GAME_ID": np.char.add("00224", np.char.zfill((game_idx + 1).astype(str), 5)),
+        "TEAM_ID": 1610612737 + rng.integers(0, 30, n),
+        "TEAM_ABBREVIATION": rng.choice(["ATL", "BOS", "LAL", "GSW", "MIA"], n),
+        "TEAM_CITY": rng.choice(["Atlanta", "Boston", "Los Angeles", "Golden State", "Miami"], n),
+        "PLAYER_ID": rng.integers(200000, 1700000, n),
+        "PLAYER_NAME": rng.choice([f"Player {i}" for i in range(500)], n),
+        "NICKNAME": rng.choice([f"Nick {i}" for i in range(500)], n),
+        "START_POSITION": rng.choice(["F", "C", "G", ""], n),
+        "COMMENT": rng.choice(["", "DNP - Coach's Decision"], n, p=[0.9, 0.1]),
+        "MIN": [f"{m}:{s:02d}" for m, s in zip(rng.integers(0, 48, n), rng.integers(0, 60, n))],
+    })
+    for c in STAT_COLS:
+        vals = rng.integers(0, 20, n).astype("float64")
+        vals[rng.random(n) < 0.05] = np.nan
+        df[c] = vals
+    start = pd.Timestamp("2024-10-22")
+    df["GAME_DATE"] = start + pd.to_timedelta(game_idx // 8, unit="D") + pd.to_timedelta(rng.integers(0, 10**9, n), unit="ns")
+    return df
+
+# ---- camino anterior: normalize -> align_to_bq -> downcast -> from_pandas (cada paso copia) ----
+def _legacy_cast(s: pd.Series, bq_type: str) -> pd.Series:
+    if bq_type in ("INT64", "INTEGER"):
+        return pd.to_numeric(s, errors="coerce").astype("Int64")
+    if bq_type in ("FLOAT64", "FLOAT", "NUMERIC", "BIGNUMERIC"):
+        return pd.to_numeric(s, errors="coerce").astype("float64")
+    if bq_type == "TIMESTAMP":
+        return pd.to_datetime(s, errors="coerce", utc=True)
+    return s.astype(str)
+
+def legacy_path(df: pd.DataFrame, bq_schema: Dict[str, str]) -> pa.Table:
+    df = df.copy()
+    df.columns = [re.sub(r"\W+", "_", c.strip().lower()) for c in df.columns]
+    df = df.loc[:, ~df.columns.duplicated()]
+    df = df.copy()
+    common_cols = [c for c in df.columns if c in bq_schema]
+    df = df[common_cols]
+    for c in common_cols:
+        df[c] = _legacy_cast(df[c], bq_schema[c])
+    df = df.copy()
+    for col in df.columns:
+        if is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors="coerce", utc=True).dt.floor("us")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for col in df.columns:
+        if pa.types.is_timestamp(table.schema.field(col).type):
+            i = table.schema.get_field_index(col)
+            table = table.set_column(i, pa.field(col, pa.timestamp("us", tz="UTC")),
+                                     table.column(i).cast(pa.timestamp("us", tz="UTC")))
+    return table
+
+# ---- camino actual: df_to_arrow una vez y el resto como kernels de Arrow ----
+def arrow_path(df: pd.DataFrame, bq_schema: Dict[str, str]) -> pa.Table:
+    return CastPlan(bq_schema).apply(df_to_arrow(df))
+
+_POOLS = []
+
+def measure(fn: Callable[[], pa.Table], repeat: int) -> Tuple[float, int, int, pa.Table]:
+    """(mejor tiempo en s, pico pandas/numpy en bytes, pico del pool de Arrow en bytes, resultado).
+
+    El pico de Arrow sale de un proxy_memory_pool nuevo puesto como pool por defecto durante la
+    corrida medida: max_memory() del pool global no se puede reiniciar entre caminos.
+    """
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+        result = None
+    previous = pa.default_memory_pool()
+    pool = pa.proxy_memory_pool(previous)
+    _POOLS.append(pool)   # los buffers del resultado se liberan en este pool: tiene que vivir más que ellos
+    pa.set_memory_pool(pool)
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, py_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        pa.set_memory_pool(previous)
+    return best, py_peak, pool.max_memory(), result
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark del camino de escritura a Parquet")
+    ap.add_argument("--games", type=int, default=1230, help="partidos en la temporada sintética")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    df = synthetic_season(args.games)
+    mb = df.memory_usage(deep=True).sum() / 1e6
+    print(f"temporada sintética: {args.games} partidos, {len(df)} filas, {mb:.1f} MB en pandas")
+
+    results = {}
+    for name, fn in (("pandas (copias)", legacy_path), ("arrow (una conversión)", arrow_path)):
+        best, py_peak, arrow_peak, table = measure(lambda f=fn: f(df, BOXSCORE_SCHEMA), args.repeat)
+        results[name] = table
+        print(f"  {name:<24} {best * 1000:8.1f} ms   pico pandas/numpy {py_peak / 1e6:7.1f} MB   "
+              f"pico pool Arrow {arrow_peak / 1e6:7.1f} MB   total {(py_peak + arrow_peak) / 1e6:7.1f} MB   "
+              f"tabla Arrow {table.nbytes / 1e6:6.1f} MB")
+
+    legacy, arrow = results.values()
+    print(f"  mismo resultado: {legacy.replace_schema_metadata(None).cast(arrow.schema).equals(arrow)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "boxscore_traditional.parquet")
+        t0 = time.perf_counter()
+        write_parquet_stream([arrow], path)
+        print(f"  escritura Parquet: {(time.perf_counter() - t0) * 1000:.1f} ms, "
+              f"{os.path.getsize(path) / 1e6:.1f} MB")
+
+if __name__ == "__main__":
+    main()
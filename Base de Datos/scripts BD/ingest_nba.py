@@ -1,10 +1,10 @@
 # ingest_nba.py
-import os, re, time, tempfile, random
-from typing import Tuple, Callable, Any, Dict
+import os, time, tempfile, threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+from typing import Tuple, Callable, Any, Dict, List, Iterable, Iterator, Optional, Union
 import pandas as pd
-from pandas.api.types import is_datetime64_any_dtype
 import pyarrow as pa
-import pyarrow.parquet as pq
 
 # --- Configuración opcional de headers para nba_api (seguro en cualquier versión) ---
 try:
@@ -42,11 +42,16 @@ def _configure_nba_headers():
 
 _configure_nba_headers()
 
+from nba_cache import ResponseCache
+from nba_checkpoint import CheckpointJournal
+from nba_metrics import RunMetrics
+from nba_retry import (AdaptiveBackoff, CircuitBreaker, EmptyPayload, FetchFailed, classify_error,
+                       TIMEOUT, THROTTLE, CLIENT, SERVER, EMPTY, OTHER, CIRCUIT_OPEN)
+from nba_parquet import StreamingParquetWriter, write_parquet_stream, df_to_arrow, normalize_name
+from nba_schema import SchemaRegistry, to_numeric
+from nba_storage import Warehouse, GcsBigQueryWarehouse, LocalWarehouse, LoadScheduler
 
 
-from google.cloud import bigquery, storage
-from google.oauth2 import service_account
-
 # nba_api
 from nba_api.stats.endpoints import (
     commonplayerinfo,          # CommonPlayerInfo
@@ -58,6 +63,7 @@ from nba_api.stats.endpoints import (
     boxscoresummaryv2,         # BoxScoreSummaryV2
     commonallplayers           # CommonAllPlayers (para "player")
 )
+from nba_api.stats.static import teams as static_teams
 
 # ========= CONFIG =========
 PROJECT_ID  = "nba-henry-476501"
@@ -67,384 +73,713 @@ KEY_PATH    = r"C:\Users\Shai-Hulud\Downloads\nba-ingest.json"
 
 # Temporadas a procesar
 SEASONS = [f"{y}-{str(y+1)[-2:]}" for y in range(2024, 2025)]
-DATASET_REF = f"{PROJECT_ID}.{DATASET_ID}"
 
 # Límites/tiempos (robustos)
 MAX_GAMES_PER_SEASON = 60
-SLEEP_SEC   = 1.2
-TIMEOUT     = 45
-MAX_RETRIES = 8
+HTTP_TIMEOUT = 45       # segundos por request (no confundir con la clase de error TIMEOUT de nba_retry)
+MAX_RETRIES = 5          # tope total de reintentos por llamada, sumando todas las clases de error
 BACKOFF_BASE = 1.4
+BACKOFF_MAX  = 30.0
+
+# Reintentos por clase de error: un 4xx no se reintenta, un payload vacío una sola vez
+RETRY_BUDGET = {TIMEOUT: 3, THROTTLE: 4, SERVER: 3, EMPTY: 1, OTHER: 2, CLIENT: 0}
+
+# Circuit breaker por endpoint: tras N fallos seguidos, cuarentena de BREAKER_COOLDOWN s.
+# Los partidos que fallan se estacionan en el dead-letter y se reintentan al final de la temporada
+BREAKER_THRESHOLD    = 6
+BREAKER_COOLDOWN     = 120.0
+DEAD_LETTER_WORKERS  = 2
+DEAD_LETTER_MAX_ATTEMPTS = 6   # después de tantos fallos el partido queda solo como registro
+
+# Concurrencia y rate limit (compartido por todos los workers)
+MAX_WORKERS    = 4      # requests en vuelo a la vez
+RATE_PER_SEC   = 0.8    # tokens por segundo (promedio sostenido contra stats.nba.com)
+RATE_BURST     = 3      # ráfaga máxima permitida
+THROTTLE_PAUSE = 30.0   # pausa global (s) cuando la API empieza a estrangular
+
+# Cache local de respuestas (re-runs y backfills leen de disco en vez de la API)
+CACHE_ENABLED   = True
+CACHE_DIR       = os.path.join(tempfile.gettempdir(), "nba_api_cache")
+CACHE_MAX_BYTES = 2 * 1024 ** 3   # 2 GB, luego LRU
+CACHE_TTL_DAILY = 24 * 3600
+CACHE_TTL_CURRENT_SCHEDULE = 3600
+
+# Checkpoint / staging local para reanudar una ingesta cortada
+STATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ingest_state")
+
+# Modo incremental: solo partidos posteriores a la marca de agua ya cargada en BQ
+# (INGEST_INCREMENTAL=0 fuerza el reproceso completo de las temporadas)
+INCREMENTAL = os.environ.get("INGEST_INCREMENTAL", "1") != "0"
+
+# Partidos por row group al escribir el Parquet de la temporada (memoria acotada al lote)
+STREAM_BATCH_GAMES = 50
+
+# Cargas diferidas: se suben todos los Parquet y se lanza un job por tabla al final
+# del backfill (True) o al final de cada temporada (False)
+BATCH_LOADS_ACROSS_SEASONS = True
+
+# Dimensiones por jugador/equipo (CommonPlayerInfo, PlayerCareerStats, TeamInfoCommon):
+# tope de tiempo por corrida (lo que no entra sigue en la próxima) y refresh de activos a lo sumo diario
+DIM_REFRESH_BUDGET_S = 40 * 60
+DIM_ACTIVE_REFRESH_S = 24 * 3600
+
+# Schemas de BQ en un JSON local (opcional): evita los get_table al arrancar
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bq_schemas.json")
+
+# Reporte de la corrida (tiempos por etapa y contadores): un JSON por corrida en METRICS_DIR
+# y, si INGEST_PROM_FILE está definido, el mismo reporte en formato texto de Prometheus
+METRICS_DIR = os.path.join(STATE_DIR, "runs")
+PROM_FILE   = os.environ.get("INGEST_PROM_FILE")
 
 # ========= CLIENTES =========
-creds = service_account.Credentials.from_service_account_file(KEY_PATH)
-bq = bigquery.Client(project=PROJECT_ID, credentials=creds)
-gcs = storage.Client(project=PROJECT_ID, credentials=creds)
-bucket = gcs.bucket(BUCKET_NAME)
+# INGEST_WAREHOUSE=local corre todo el pipeline sin credenciales (Parquet + SQLite en LOCAL_WAREHOUSE_DIR)
+WAREHOUSE_BACKEND   = os.environ.get("INGEST_WAREHOUSE", "gcp")
+LOCAL_WAREHOUSE_DIR = os.environ.get("INGEST_LOCAL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "local_warehouse"))
+
+_warehouse: Optional[Warehouse] = None
+
+def get_warehouse() -> Warehouse:
+    """Backend configurado; los clientes se crean recién en el primer uso, no al importar."""
+    global _warehouse
+    if _warehouse is None:
+        if WAREHOUSE_BACKEND == "local":
+            _warehouse = LocalWarehouse(LOCAL_WAREHOUSE_DIR)
+        else:
+            _warehouse = GcsBigQueryWarehouse(PROJECT_ID, DATASET_ID, BUCKET_NAME, KEY_PATH)
+    return _warehouse
+
+def set_warehouse(wh: Warehouse):
+    global _warehouse
+    _warehouse = wh
+
+# ========= RATE LIMIT / POOL =========
+class TokenBucket:
+    """Token bucket thread-safe: cada request consume un token; se reponen a `rate` por segundo."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
 
-# ========= HELPERS =========
-def normalize(df: pd.DataFrame) -> pd.DataFrame:
-    if df is None or df.empty:
-        return df
-    df = df.copy()
-    df.columns = [re.sub(r"\W+", "_", c.strip().lower()) for c in df.columns]
-    return df
+class GlobalBackoff:
+    """Pausa compartida: si un worker detecta throttling, todos los workers esperan."""
+
+    def __init__(self):
+        self._until = 0.0
+        self._lock = threading.Lock()
+
+    def trip(self, seconds: float):
+        with self._lock:
+            self._until = max(self._until, time.monotonic() + seconds)
+
+    def wait(self):
+        while True:
+            with self._lock:
+                remaining = self._until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+metrics = RunMetrics()
+rate_limiter = TokenBucket(RATE_PER_SEC, RATE_BURST)
+global_backoff = GlobalBackoff()
+retry_backoff = AdaptiveBackoff(BACKOFF_BASE, BACKOFF_MAX)
+breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN)
+
+def run_pool(items: Iterable[Any], fn: Callable[[Any], Any], *, label: str, workers: int = MAX_WORKERS,
+             on_error: Optional[Callable[[Any, Exception], None]] = None) -> Iterator[Tuple[Any, Any]]:
+    """Ejecuta fn(item) en un pool acotado y devuelve (item, resultado) a medida que terminan.
+
+    El ritmo real lo impone `rate_limiter` dentro de fetch_df, no el tamaño del pool.
+    Si fn falla el resultado es None (y se avisa a `on_error`, si se pasó).
+    """
+    items = list(items)
+    total = len(items)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        futures = {ex.submit(fn, it): it for it in items}
+        for i, fut in enumerate(as_completed(futures), 1):
+            it = futures[fut]
+            try:
+                res = fut.result()
+            except Exception as e:
+                print(f"  {label} skip {it}: {e}")
+                if on_error is not None:
+                    on_error(it, e)
+                res = None
+            if i % 25 == 0 or i == total:
+                print(f"  {label} {i}/{total}")
+            yield it, res
+
+# ========= CACHE =========
+def current_season() -> str:
+    today = date.today()
+    start = today.year if today.month >= 10 else today.year - 1
+    return f"{start}-{str(start+1)[-2:]}"
+
+def cache_ttl(endpoint: str, kwargs: Dict[str, Any]) -> Optional[float]:
+    """Segundos de vida de una respuesta cacheada; None = nunca expira."""
+    if endpoint in ("BoxScoreTraditionalV2", "BoxScoreSummaryV2"):
+        # el manifiesto solo lista partidos finalizados: su boxscore ya no cambia
+        return None
+    if endpoint == "LeagueGameFinder":
+        season = kwargs.get("season_nullable")
+        return CACHE_TTL_CURRENT_SCHEDULE if season in (None, current_season()) else None
+    if endpoint == "DraftCombinePlayerAnthro":
+        season = kwargs.get("season_year")
+        return CACHE_TTL_DAILY if season in (None, current_season()) else None
+    # info de jugadores/equipos de la temporada actual: vence a diario
+    return CACHE_TTL_DAILY
 
-def dedupe_cols(df: pd.DataFrame) -> pd.DataFrame:
-    if df is None or df.empty:
-        return df
-    return df.loc[:, ~df.columns.duplicated()]
+response_cache = ResponseCache(CACHE_DIR, CACHE_MAX_BYTES, cache_ttl) if CACHE_ENABLED else None
 
-def ensure_unique_columns(df: pd.DataFrame) -> pd.DataFrame:
+# ========= HELPERS =========
+def normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """Nombres de columna en snake_case, in place: el frame es nuevo (API o cache), no hace falta copiarlo."""
     if df is None or df.empty:
         return df
-    seen = {}
-    new_cols = []
-    for c in df.columns:
-        if c not in seen:
-            seen[c] = 0
-            new_cols.append(c)
-        else:
-            seen[c] += 1
-            new_cols.append(f"{c}_dup{seen[c]}")
-    df.columns = new_cols
+    with metrics.stage("transform.normalize"):
+        df.columns = [normalize_name(c) for c in df.columns]
     return df
 
 def ensure_dataset():
-    try:
-        ds = bq.get_dataset(DATASET_REF)
-        print(f"Dataset detectado: {DATASET_REF} (location={ds.location})")
-    except Exception:
-        ds = bigquery.Dataset(DATASET_REF)
-        ds.location = "northamerica-south1"
-        bq.create_dataset(ds)
-        print(f"Dataset creado: {DATASET_REF} (location=northamerica-south1)")
+    get_warehouse().ensure_dataset()
 
 def get_bq_schema(table: str) -> Dict[str, str]:
-    try:
-        t = bq.get_table(f"{DATASET_REF}.{table}")
-        return {f.name: f.field_type for f in t.schema}
-    except Exception:
-        return {}
+    return get_warehouse().get_schema(table)
 
-def cast_series(s: pd.Series, bq_type: str) -> pd.Series:
-    if bq_type in ("INT64", "INTEGER"):
-        return pd.to_numeric(s, errors="coerce").astype("Int64")
-    if bq_type in ("FLOAT64", "FLOAT", "NUMERIC", "BIGNUMERIC"):
-        return pd.to_numeric(s, errors="coerce").astype("float64")
-    if bq_type in ("BOOL", "BOOLEAN"):
-        return (
-            s.astype(str)
-             .str.strip()
-             .str.upper()
-             .map({"1": True, "0": False, "TRUE": True, "FALSE": False,
-                   "T": True, "F": False, "Y": True, "N": False})
-        )
-    if bq_type == "TIMESTAMP":
-        return pd.to_datetime(s, errors="coerce", utc=True)
-    return s.astype(str)
-
-def align_to_bq(table: str, df: pd.DataFrame) -> pd.DataFrame:
-    bq_schema = get_bq_schema(table)
-    if not bq_schema or df is None or df.empty:
-        return df
+# una consulta de schema por tabla y corrida (o ninguna si existe SCHEMA_FILE)
+schema_registry = SchemaRegistry(get_bq_schema, SCHEMA_FILE, metrics=metrics)
 
-    df = df.copy()
+def align_to_bq(table: str, data: Union[pd.DataFrame, pa.Table]) -> Optional[pa.Table]:
+    """Columnas y tipos del schema de la tabla en BQ, en una pasada columnar sobre Arrow.
 
-    if table == "player":
-        low = {c.lower(): c for c in df.columns}
-        if "person_id" in low:
-            df.rename(columns={low["person_id"]: "id"}, inplace=True)
-        if "full_name" not in df.columns and "display_first_last" in low:
-            df.rename(columns={low["display_first_last"]: "full_name"}, inplace=True)
-        keep = list(bq_schema.keys())
-        for k in keep:
-            if k not in df.columns:
-                df[k] = pd.NA
-        df = df[keep]
-
-    if table == "common_player_info":
-        if "birthdate" in df.columns and bq_schema.get("birthdate") == "TIMESTAMP":
-            df["birthdate"] = pd.to_datetime(df["birthdate"], errors="coerce", utc=True)
-        if "season_exp" in df.columns and bq_schema.get("season_exp") in ("FLOAT","FLOAT64"):
-            df["season_exp"] = pd.to_numeric(df["season_exp"], errors="coerce").astype("float64")
-
-    if table == "draft_combine_stats":
-        if "height_w_shoes" in df.columns and bq_schema.get("height_w_shoes") in ("FLOAT","FLOAT64"):
-            df["height_w_shoes"] = pd.to_numeric(df["height_w_shoes"], errors="coerce").astype("float64")
-
-    common_cols = [c for c in df.columns if c in bq_schema]
-    if not common_cols:
-        return df
-    df = df[common_cols]
-    for c in common_cols:
-        try:
-            df[c] = cast_series(df[c], bq_schema[c])
-        except Exception:
-            pass
-    return df
-
-def _downcast_datetimes_to_us(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, pa.DataType]]:
-    df = df.copy()
-    pa_schema_map: Dict[str, pa.DataType] = {}
-    for col in df.columns:
-        if is_datetime64_any_dtype(df[col]):
-            if getattr(df[col].dtype, "tz", None) is not None:
-                df[col] = df[col].dt.tz_convert("UTC").dt.floor("us")
-                pa_schema_map[col] = pa.timestamp("us", tz="UTC")
-            else:
-                s = pd.to_datetime(df[col], errors="coerce", utc=True).dt.floor("us")
-                df[col] = s
-                pa_schema_map[col] = pa.timestamp("us", tz="UTC")
-    return df, pa_schema_map
-
-def to_parquet_gcs(df: pd.DataFrame, path: str, table: str = None):
-    if df is None or df.empty:
+    Un DataFrame se convierte a Arrow una sola vez (df_to_arrow); renombres, fechas y casteos
+    son operaciones sobre la tabla Arrow. Sin schema conocido (tabla nueva) la devuelve tal cual.
+    """
+    if data is None or len(data) == 0:
         return None
+    with metrics.stage("transform.align", table=table):
+        return _align_to_bq(table, data)
 
-    if table == "common_player_info":
-        if "season_exp" in df.columns:
-            df["season_exp"] = pd.to_numeric(df["season_exp"], errors="coerce").astype("float64")
-
-    df_fix, pa_schema_map = _downcast_datetimes_to_us(df)
+def _align_to_bq(table: str, data: Union[pd.DataFrame, pa.Table]) -> pa.Table:
+    out = df_to_arrow(data) if isinstance(data, pd.DataFrame) else data
+    plan = schema_registry.plan(table)
+    if plan is None:
+        return out
 
-    fields = []
-    for c in df_fix.columns:
-        if c in pa_schema_map:
-            fields.append(pa.field(c, pa_schema_map[c]))
+    if table == "player":
+        names = out.column_names
+        renames = {}
+        if "person_id" in names:
+            renames["person_id"] = "id"
+        if "full_name" not in names and "display_first_last" in names:
+            renames["display_first_last"] = "full_name"
+        if renames:
+            out = out.rename_columns([renames.get(c, c) for c in names])
+
+    if not any(c in plan.bq_schema for c in out.column_names):
+        return out
+    out = plan.apply(out)
 
-    if fields:
-        base_schema = pa.schema(fields)
-        table_pa = pa.Table.from_pandas(df_fix, schema=base_schema, preserve_index=False)
-    else:
-        table_pa = pa.Table.from_pandas(df_fix, preserve_index=False)
+    if table == "player":
+        # player se carga siempre con todas las columnas del schema
+        for field in plan.target:
+            if field.name not in out.column_names:
+                out = out.append_column(field, pa.nulls(out.num_rows, field.type))
+        out = out.select(plan.target.names)
+    return out
 
-    os.makedirs(tempfile.gettempdir(), exist_ok=True)
-    tmp = os.path.join(tempfile.gettempdir(), os.path.basename(path))
-    pq.write_table(table_pa, tmp, version="2.6")
-    blob = bucket.blob(path)
-    blob.upload_from_filename(tmp)
-    return f"gs://{BUCKET_NAME}/{path}"
+def write_parquet_local(data: Union[pd.DataFrame, pa.Table], local_path: str, table: str = None) -> int:
+    if data is None or len(data) == 0:
+        return 0
+    if isinstance(data, pd.DataFrame):
+        data = df_to_arrow(data)
+
+    if table == "common_player_info" and "season_exp" in data.column_names:
+        i = data.schema.get_field_index("season_exp")
+        if data.schema.field(i).type != pa.float64():
+            data = data.set_column(i, pa.field("season_exp", pa.float64()), to_numeric(data.column(i), pa.float64()))
+
+    with metrics.stage("parquet.encode", table=table):
+        rows = write_parquet_stream([data], local_path)
+    count_parquet(table, local_path, rows)
+    return rows
+
+def count_parquet(table: str, local_path: str, rows: int):
+    metrics.incr("rows_written", rows, table=table)
+    if rows and os.path.exists(local_path):
+        metrics.incr("parquet_bytes", os.path.getsize(local_path), table=table)
+
+def local_parquet_path(path: str) -> str:
+    return os.path.join(tempfile.gettempdir(), path.replace("/", "_"))
+
+def upload_to_gcs(local_path: str, path: str) -> str:
+    with metrics.stage("upload"):
+        uri = get_warehouse().upload(local_path, path)
+    metrics.incr("bytes_uploaded", os.path.getsize(local_path))
+    return uri
+
+def to_parquet_gcs(data: Union[pd.DataFrame, pa.Table], path: str, table: str = None):
+    tmp = local_parquet_path(path)
+    if not write_parquet_local(data, tmp, table=table):
+        return None
+    return upload_to_gcs(tmp, path)
 
 def load_parquet_to_bq(gcs_uri: str, table: str):
     if not gcs_uri:
         return
-    job_config = bigquery.LoadJobConfig(
-        source_format=bigquery.SourceFormat.PARQUET,
-        write_disposition="WRITE_APPEND",
-        schema_update_options=[
-            bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION,
-            bigquery.SchemaUpdateOption.ALLOW_FIELD_RELAXATION,
-        ],
-    )
-    bq.load_table_from_uri(gcs_uri, f"{DATASET_REF}.{table}", job_config=job_config).result()
-
-def fetch_df(endpoint_fn: Callable[..., Any], *, label: str, retries: int = MAX_RETRIES, **kwargs) -> pd.DataFrame:
-    for attempt in range(retries):
+    with metrics.stage("load", table=table):
+        get_warehouse().load(gcs_uri, table)
+
+def fetch_dfs(endpoint_fn: Callable[..., Any], *, label: str, retries: int = MAX_RETRIES,
+              limiter: TokenBucket = None, backoff: GlobalBackoff = None,
+              require_data: bool = False, raise_on_fail: bool = False, **kwargs) -> List[pd.DataFrame]:
+    """Llama al endpoint respetando el rate limit global y devuelve todos sus DataFrames.
+
+    Si hay cache, las respuestas vigentes se leen de disco sin consumir tokens.
+    Cada clase de error tiene su presupuesto en RETRY_BUDGET y la espera la da `retry_backoff`
+    según la tasa de éxito reciente. Con el circuito del endpoint abierto no se llama a la API.
+    Al agotarse devuelve [] (o levanta FetchFailed con `raise_on_fail`);
+    con `require_data` una respuesta sin filas cuenta como error EMPTY.
+    """
+    limiter = limiter or rate_limiter
+    backoff = backoff or global_backoff
+    endpoint = getattr(endpoint_fn, "__name__", str(endpoint_fn))
+    if response_cache is not None:
+        with metrics.stage("fetch.cache_read"):
+            cached = response_cache.get(endpoint, kwargs)
+        if cached is not None:
+            metrics.incr("cache_hits", endpoint=endpoint)
+            return cached
+
+    used: Dict[str, int] = {}
+    attempt = 0
+    while True:
+        if not breaker.allow(endpoint):
+            metrics.incr("fetch_failures", endpoint=endpoint, kind=CIRCUIT_OPEN)
+            if raise_on_fail:
+                raise FetchFailed(label, CIRCUIT_OPEN)
+            return []
+        with metrics.stage("fetch.backoff_wait"):
+            backoff.wait()
+        with metrics.stage("fetch.rate_limit_wait"):
+            limiter.acquire()
+        metrics.incr("requests", endpoint=endpoint)
         try:
-            obj = endpoint_fn(timeout=TIMEOUT, **kwargs)
-            dfs = obj.get_data_frames()
-            if dfs and len(dfs) > 0:
-                return dfs[0]
-            return pd.DataFrame()
+            with metrics.stage("fetch.network", endpoint=endpoint):
+                obj = endpoint_fn(timeout=HTTP_TIMEOUT, **kwargs)
+                dfs = list(obj.get_data_frames() or [])
+            raw = getattr(getattr(obj, "nba_response", None), "_response", None)
+            if raw:
+                metrics.incr("bytes_fetched", len(raw), endpoint=endpoint)
+            if require_data and all(d.empty for d in dfs):
+                raise EmptyPayload("respuesta sin filas")
         except Exception as e:
-            wait = (BACKOFF_BASE * (2 ** attempt)) + random.uniform(0, 0.4)
-            print(f"  retry {label} ({attempt+1}/{retries}): {e} -> sleep {wait:.1f}s")
-            time.sleep(wait)
-    try:
-        obj = endpoint_fn(timeout=TIMEOUT, **kwargs)
-        dfs = obj.get_data_frames()
-        if dfs and len(dfs) > 0:
-            return dfs[0]
-    except Exception as e:
-        print(f"  skip {label}: {e}")
+            kind = classify_error(e)
+            # un 4xx o un payload vacío: el servidor respondió, el circuito no se entera
+            breaker.record(endpoint, ok=kind in (CLIENT, EMPTY))
+            retry_backoff.record(False)
+            metrics.incr("request_errors", endpoint=endpoint, kind=kind)
+            used[kind] = used.get(kind, 0) + 1
+            if used[kind] > RETRY_BUDGET.get(kind, 0) or attempt >= retries:
+                metrics.incr("fetch_failures", endpoint=endpoint, kind=kind)
+                print(f"  skip {label} [{kind}]: {e}")
+                if raise_on_fail:
+                    raise FetchFailed(label, kind, e) from e
+                return []
+            if kind == THROTTLE:
+                # Throttling: frenamos a todos los workers, no solo a este. Un timeout es de
+                # este request (o de la red) y solo espera su propio retry_backoff
+                metrics.incr("throttled", endpoint=endpoint)
+                backoff.trip(THROTTLE_PAUSE)
+            wait = retry_backoff.delay(attempt)
+            attempt += 1
+            metrics.incr("retries", endpoint=endpoint, kind=kind)
+            print(f"  retry {label} [{kind}] ({attempt}/{retries}): {e} -> sleep {wait:.1f}s")
+            with metrics.stage("fetch.retry_sleep"):
+                time.sleep(wait)
+            continue
+
+        breaker.record(endpoint, ok=True)
+        retry_backoff.record(True)
+        metrics.incr("rows_fetched", sum(len(d) for d in dfs), endpoint=endpoint)
+        if response_cache is not None and any(not d.empty for d in dfs):
+            try:
+                response_cache.put(endpoint, kwargs, dfs)
+            except Exception as e:
+                print(f"  cache write {label}: {e}")
+        return dfs
+
+def fetch_df(endpoint_fn: Callable[..., Any], *, label: str, retries: int = MAX_RETRIES, **kwargs) -> pd.DataFrame:
+    dfs = fetch_dfs(endpoint_fn, label=label, retries=retries, **kwargs)
+    if dfs:
+        return dfs[0]
     return pd.DataFrame()
 
 # ========= EXTRACTORES =========
-def get_common_player_info() -> pd.DataFrame:
-    df = fetch_df(commonplayerinfo.CommonPlayerInfo, label="common_player_info", player_id=2544)
-    return normalize(df)
+def _first_frame(frames: List[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """None si el fetch falló; un DataFrame (quizás vacío) si la API respondió."""
+    if not frames:
+        return None
+    return normalize(frames[0])
+
+def get_common_player_info(player_id: int) -> Optional[pd.DataFrame]:
+    frames = fetch_dfs(commonplayerinfo.CommonPlayerInfo, label=f"common_player_info {player_id}", player_id=player_id)
+    return _first_frame(frames)
 
 def get_players() -> pd.DataFrame:
     df = fetch_df(commonallplayers.CommonAllPlayers, label="players", is_only_current_season=0)
     return normalize(df)
 
-def get_team_info() -> pd.DataFrame:
-    df = fetch_df(teaminfocommon.TeamInfoCommon, label="team_info_common", team_id=1610612747)
-    return normalize(df)
+def get_team_info(team_id: int) -> Optional[pd.DataFrame]:
+    frames = fetch_dfs(teaminfocommon.TeamInfoCommon, label=f"team_info_common {team_id}", team_id=team_id)
+    return _first_frame(frames)
 
 def get_draft_combine() -> pd.DataFrame:
     df = fetch_df(draftcombineplayeranthro.DraftCombinePlayerAnthro, label="draft_combine_stats")
     return normalize(df)
 
-def get_player_career_stats() -> pd.DataFrame:
-    df = fetch_df(playercareerstats.PlayerCareerStats, label="player_career_stats", player_id=2544)
-    return normalize(df)
-
-def get_boxscore_traditional(season: str = None) -> pd.DataFrame:
-    games_df = fetch_df(leaguegamefinder.LeagueGameFinder, label="leaguegamefinder", season_nullable=season)
-    if games_df.empty or "GAME_ID" not in games_df.columns:
-        return pd.DataFrame()
+def get_player_career_stats(player_id: int) -> Optional[pd.DataFrame]:
+    # frame 0 = SeasonTotalsRegularSeason (una fila por temporada del jugador)
+    frames = fetch_dfs(playercareerstats.PlayerCareerStats, label=f"player_career_stats {player_id}", player_id=player_id)
+    return _first_frame(frames)
 
-    df_all = []
-    game_ids = list(games_df["GAME_ID"])[:MAX_GAMES_PER_SEASON]
-    total = len(game_ids)
-    for i, gid in enumerate(game_ids, 1):
-        try:
-            df = fetch_df(boxscoretraditionalv2.BoxScoreTraditionalV2, label=f"boxscore {gid}", game_id=gid)
-            if df is None or df.empty:
-                continue
-            low = {c.lower(): c for c in df.columns}
-            if "game_id" not in low:
-                df["GAME_ID"] = gid
-            df = normalize(df)
-            df_all.append(df)
-        except Exception as e:
-            print(f"  boxscore skip {gid}: {e}")
+def get_high_water_mark(season: str) -> Tuple[Optional[date], set]:
+    """Última fecha de partido ya cargada para la temporada y los GAME_IDs de esa fecha.
 
-        if i % 25 == 0 or i == total:
-            print(f"  boxscores {i}/{total}")
-        time.sleep(SLEEP_SEC)
+    Se toma de game_summary, que es la tabla por partido que trae la fecha.
+    Si la tabla no existe o está vacía devuelve (None, set()) -> temporada completa.
+    """
+    try:
+        return get_warehouse().game_high_water_mark(season)
+    except Exception as e:
+        print(f"  high-water mark {season}: {e} -> temporada completa")
+        return None, set()
+
+def get_game_manifest(season: str = None, since: Optional[date] = None, exclude: Optional[set] = None) -> List[str]:
+    """GAME_IDs únicos de partidos finalizados de la temporada (una sola llamada a LeagueGameFinder).
+
+    LeagueGameFinder devuelve una fila por equipo, así que cada partido aparece dos veces.
+    WL vacío = partido no finalizado; se excluye para que sus boxscores no queden cacheados a medias.
+    Con `since` solo se piden partidos desde esa fecha (modo incremental) y se descartan los de `exclude`.
+    Se ordena cronológicamente para que el límite por temporada avance la marca de agua.
+    """
+    kwargs = {"season_nullable": season}
+    if since is not None:
+        kwargs["date_from_nullable"] = since.strftime("%m/%d/%Y")
+    games_df = fetch_df(leaguegamefinder.LeagueGameFinder, label="leaguegamefinder", **kwargs)
+    if games_df.empty or "GAME_ID" not in games_df.columns:
+        return []
+    if "WL" in games_df.columns:
+        games_df = games_df[games_df["WL"].notna()]
+    if "GAME_DATE" in games_df.columns:
+        games_df = games_df.sort_values(["GAME_DATE", "GAME_ID"])
+        if since is not None:
+            games_df = games_df[pd.to_datetime(games_df["GAME_DATE"], errors="coerce").dt.date >= since]
+    game_ids = list(dict.fromkeys(games_df["GAME_ID"].dropna().astype(str)))
+    if exclude:
+        game_ids = [g for g in game_ids if g not in exclude]
+    return game_ids[:MAX_GAMES_PER_SEASON]
+
+def _with_game_id(df: pd.DataFrame, gid: str) -> pd.DataFrame:
+    low = {c.lower(): c for c in df.columns}
+    if "game_id" not in low:
+        df["GAME_ID"] = gid
+    return normalize(df)
 
-    if not df_all:
-        return pd.DataFrame()
-    out = pd.concat(df_all, ignore_index=True)
-    out = dedupe_cols(out)
-    out = ensure_unique_columns(out)
+def fetch_game(gid: str) -> Dict[str, pd.DataFrame]:
+    """Todas las tablas por partido de un GAME_ID (traditional, summary y other stats).
+
+    Si boxscore o summary fallan levanta FetchFailed: el partido no queda a medias en staging.
+    """
+    out: Dict[str, pd.DataFrame] = {}
+
+    frames = fetch_dfs(boxscoretraditionalv2.BoxScoreTraditionalV2, label=f"boxscore {gid}", game_id=gid,
+                       require_data=True, raise_on_fail=True)
+    out["boxscore_traditional"] = _with_game_id(frames[0], gid)
+
+    frames = fetch_dfs(boxscoresummaryv2.BoxScoreSummaryV2, label=f"summary {gid}", game_id=gid,
+                       require_data=True, raise_on_fail=True)
+    gsum  = frames[0] if len(frames) > 0 else pd.DataFrame()
+    other = frames[5] if len(frames) > 5 else pd.DataFrame()
+    if not gsum.empty:
+        out["game_summary"] = _with_game_id(gsum, gid)
+    if not other.empty:
+        out["other_stats"] = _with_game_id(other, gid)
     return out
 
-def get_game_summary_and_other_stats(season: str = None):
-    games_df = fetch_df(leaguegamefinder.LeagueGameFinder, label="leaguegamefinder", season_nullable=season)
-    if games_df.empty or "GAME_ID" not in games_df.columns:
-        return pd.DataFrame(), pd.DataFrame()
+GAME_TABLES = ("boxscore_traditional", "game_summary", "other_stats")
+
+def stage_game_data(season: str, journal: CheckpointJournal, incremental: bool = INCREMENTAL) -> int:
+    """Una pasada por el manifiesto alimenta todas las tablas por partido.
+
+    Cada partido se escribe a staging y se registra en el journal apenas termina,
+    así un corte solo pierde los partidos en vuelo. Devuelve cuántos partidos se bajaron.
+    """
+    since, loaded = (None, set())
+    if incremental:
+        since, loaded = get_high_water_mark(season)
+        if since is not None:
+            print(f"  incremental: partidos desde {since} ({len(loaded)} ya cargados ese día)")
+    game_ids = get_game_manifest(season, since=since, exclude=loaded)
+    done = journal.fetched_games(season)
+    parked = set(journal.dead_letters(season))
+    pending = [g for g in game_ids if g not in done and g not in parked]
+    if len(pending) < len(game_ids):
+        print(f"  checkpoint: {len(game_ids) - len(pending)}/{len(game_ids)} partidos ya bajados o en dead-letter")
+
+    def park(gid: str, e: Exception):
+        journal.park_game(season, gid, classify_error(e), str(e))
+
+    fetched = 0
+    for gid, res in run_pool(pending, fetch_game, label="games", on_error=park):
+        if not res:
+            continue  # falló: queda en el dead-letter
+        journal.stage_game(season, gid, res)
+        fetched += 1
+    return fetched + retry_dead_letters(season, journal)
+
+def retry_dead_letters(season: str, journal: CheckpointJournal) -> int:
+    """Segunda pasada, más lenta, sobre los partidos estacionados (de esta corrida o de las anteriores).
+
+    Se cierra el circuito antes de empezar; los errores de cliente (4xx) no se reintentan.
+    """
+    parked = journal.dead_letters(season, retryable_only=True, max_attempts=DEAD_LETTER_MAX_ATTEMPTS)
+    if not parked:
+        return 0
+    print(f"  dead-letter: reintentando {len(parked)} partidos")
+    breaker.reset()
+
+    fetched = 0
+    for gid, res in run_pool(parked, fetch_game, label="dead-letter", workers=DEAD_LETTER_WORKERS,
+                             on_error=lambda g, e: journal.park_game(season, g, classify_error(e), str(e))):
+        if not res:
+            continue
+        journal.stage_game(season, gid, res)
+        fetched += 1
+    left = len(parked) - fetched
+    if left:
+        print(f"  dead-letter: {left} partidos siguen pendientes")
+    return fetched
+
+def write_staged_table(season: str, table: str, journal: CheckpointJournal, local_path: str) -> Tuple[int, List[str]]:
+    """Vuelca el staging pendiente de la tabla a un Parquet local, un row group por lote de partidos."""
+    game_ids: List[str] = []
+    with StreamingParquetWriter(local_path) as writer:
+        for batch, gids in journal.iter_pending(season, table, STREAM_BATCH_GAMES):
+            batch = align_to_bq(table, batch)
+            with metrics.stage("parquet.encode", table=table):
+                writer.write(batch)
+            game_ids.extend(gids)
+    count_parquet(table, local_path, writer.rows)
+    return writer.rows, game_ids
+
+# ========= DIMENSIONES MASIVAS =========
+def player_candidates(players: pd.DataFrame) -> Dict[str, Tuple[str, bool]]:
+    """{person_id: (huella, puede_cambiar)} a partir del roster de CommonAllPlayers.
+
+    La huella es rosterstatus|to_year|team_id. Un jugador fuera de roster cuyo to_year es
+    anterior a la temporada actual está retirado: si su huella no cambió, no hace falta pedirlo.
+    """
+    if players is None or players.empty or "person_id" not in players.columns:
+        return {}
+    p = players.reindex(columns=["person_id", "rosterstatus", "to_year", "team_id"])
+    roster  = pd.to_numeric(p["rosterstatus"], errors="coerce").fillna(0).astype("int64")
+    to_year = pd.to_numeric(p["to_year"], errors="coerce")
+    active  = (roster != 0) | to_year.isna() | (to_year >= int(current_season()[:4]))
+    fp = roster.astype(str) + "|" + to_year.astype("Int64").astype(str) + "|" + p["team_id"].astype(str)
+    return dict(zip(p["person_id"].astype(str), zip(fp, active)))
+
+def team_candidates() -> Dict[str, Tuple[str, bool]]:
+    """Los 30 equipos (lista estática de nba_api, sin request); siempre pueden cambiar."""
+    return {str(t["id"]): ("", True) for t in static_teams.get_teams()}
+
+def entities_to_refresh(table: str, candidates: Dict[str, Tuple[str, bool]], journal: CheckpointJournal) -> Dict[str, str]:
+    """{id: huella} a pedir: nuevos, con huella distinta a la cargada, o activos con refresh vencido.
+
+    Los activos van primero, así si se agota DIM_REFRESH_BUDGET_S lo que queda son retirados.
+    """
+    state = journal.dim_state(table)
+    now = time.time()
+    active, rest = {}, {}
+    for eid, (fp, can_change) in candidates.items():
+        prev = state.get(eid)
+        if prev is not None and prev[0] == fp and (not can_change or now - prev[1] < DIM_ACTIVE_REFRESH_S):
+            continue
+        (active if can_change else rest)[eid] = fp
+    return {**active, **rest}
+
+def refresh_bulk_dimension(table: str, fetch_one: Callable[[int], Optional[pd.DataFrame]],
+                           candidates: Dict[str, Tuple[str, bool]], journal: CheckpointJournal,
+                           scheduler: LoadScheduler, deadline: float):
+    """Pide en paralelo solo las entidades que pudieron cambiar y las sube en un único Parquet.
+
+    Las huellas se registran recién cuando la carga terminó bien; las que no entraron
+    en el presupuesto de tiempo (o fallaron) quedan para la próxima corrida.
+    """
+    todo = entities_to_refresh(table, candidates, journal)
+    if not todo:
+        print(f"SKIP (sin cambios): {table}")
+        return
+    print(f"{table}: {len(todo)}/{len(candidates)} a refrescar")
+
+    def fetch(eid: str) -> Optional[pd.DataFrame]:
+        if time.monotonic() > deadline:
+            return None
+        return fetch_one(int(eid))
+
+    frames: List[pd.DataFrame] = []
+    done: Dict[str, str] = {}
+    for eid, df in run_pool(todo, fetch, label=table):
+        if df is None:
+            continue
+        done[eid] = todo[eid]
+        if not df.empty:
+            frames.append(df)
+    if len(done) < len(todo):
+        print(f"  {table}: {len(todo) - len(done)} pendientes para la próxima corrida")
+    if not done:
+        return
 
-    summaries, others = [], []
-    game_ids = list(games_df["GAME_ID"])[:MAX_GAMES_PER_SEASON]
-    total = len(game_ids)
+    uri = None
+    if frames:
+        path = f"bronze/dim/{date.today():%Y-%m-%d}/{table}.parquet"
+        uri = to_parquet_gcs(align_to_bq(table, pd.concat(frames, ignore_index=True)), path, table=table)
+    if uri:
+        # reemplazo por entidad, no append: un refresh no duplica las filas del jugador/equipo
+        scheduler.add(table, uri, lambda: journal.mark_dim_loaded(table, done), replace_key=DIM_KEYS[table])
+        print(f"UPLOAD: {table} ({len(frames)} entidades)")
+    else:
+        # respondieron vacíos (p.ej. jugadores sin partidos): nada que cargar, pero ya están al día
+        journal.mark_dim_loaded(table, done)
 
-    for i, gid in enumerate(game_ids, 1):
+# ========= MAIN =========
+DIM_EXTRACTORS = [
+    ("player",              get_players),
+    ("draft_combine_stats", get_draft_combine),
+]
+
+# (tabla, extractor por id, roster): una vez por corrida, no por temporada
+BULK_DIMENSIONS = [
+    ("common_player_info",  get_common_player_info,  "players"),
+    ("player_career_stats", get_player_career_stats, "players"),
+    ("team_info_common",    get_team_info,           "teams"),
+]
+
+# clave natural de cada dimensión masiva: sus filas se reemplazan en cada refresh
+DIM_KEYS = {
+    "common_player_info":  "person_id",
+    "player_career_stats": "player_id",
+    "team_info_common":    "team_id",
+}
+
+def refresh_bulk_dimensions(journal: CheckpointJournal, scheduler: LoadScheduler):
+    deadline = time.monotonic() + DIM_REFRESH_BUDGET_S
+    rosters = {"players": player_candidates(get_players()), "teams": team_candidates()}
+    for table, fetch_one, roster in BULK_DIMENSIONS:
         try:
-            bs = boxscoresummaryv2.BoxScoreSummaryV2(game_id=gid, timeout=TIMEOUT)
-            frames = bs.get_data_frames()
-            gsum  = frames[0] if len(frames) > 0 else pd.DataFrame()
-            other = frames[5] if len(frames) > 5 else pd.DataFrame()
-
-            if not gsum.empty:
-                low = {c.lower(): c for c in gsum.columns}
-                if "game_id" not in low:
-                    gsum["GAME_ID"] = gid
-                gsum = normalize(gsum)
-                summaries.append(gsum)
-
-            if not other.empty:
-                low = {c.lower(): c for c in other.columns}
-                if "game_id" not in low:
-                    other["GAME_ID"] = gid
-                other = normalize(other)
-                others.append(other)
-
+            refresh_bulk_dimension(table, fetch_one, rosters[roster], journal, scheduler, deadline)
         except Exception as e:
-            print(f"  summary/other skip {gid}: {e}")
-
-        if i % 25 == 0 or i == total:
-            print(f"  summaries {i}/{total}")
-        time.sleep(SLEEP_SEC)
-
-    gs = pd.concat(summaries, ignore_index=True) if summaries else pd.DataFrame()
-    os = pd.concat(others,    ignore_index=True) if others    else pd.DataFrame()
+            print(f"WARN {table}: {e}")
 
-    if not gs.empty:
-        gs = dedupe_cols(gs)
-        gs = ensure_unique_columns(gs)
-    if not os.empty:
-        os = dedupe_cols(os)
-        os = ensure_unique_columns(os)
+def flush_loads(scheduler: LoadScheduler):
+    if not len(scheduler):
+        return
+    print(f"\nCargando {len(scheduler)} archivos...")
+    with metrics.stage("load"):
+        results = scheduler.flush()
+    for table, err in results.items():
+        # la carga pudo crear la tabla o agregarle columnas
+        schema_registry.invalidate(table)
+        metrics.incr("loads", status="ok" if err is None else "error", table=table)
+        if err is None:
+            print(f"OK: {table}")
+        else:
+            print(f"WARN load {table}: {err}")
 
-    return gs, os
+def write_run_report():
+    """JSON de la corrida en METRICS_DIR (y Prometheus si PROM_FILE), más un resumen por etapa."""
+    report = metrics.report()
+    path = os.path.join(METRICS_DIR, f"run_{time.strftime('%Y%m%dT%H%M%S', time.localtime(metrics.started))}.json")
+    try:
+        metrics.write_json(path)
+        if PROM_FILE:
+            metrics.write_prometheus(PROM_FILE)
+    except OSError as e:
+        print(f"WARN metrics: {e}")
+    print(f"\nReporte: {path} ({report['wall_seconds']:.0f}s)")
+    top = sorted(report["stages"].items(), key=lambda kv: kv[1]["total_s"], reverse=True)[:8]
+    for stage, st in top:
+        print(f"  {stage:<50} {st['total_s']:9.1f}s  x{st['count']}")
 
-# ========= MAIN =========
 def main():
+    try:
+        run()
+    finally:
+        write_run_report()
+
+def run():
     print("Iniciando proceso historico (2025-2026)")
     ensure_dataset()
+    journal = CheckpointJournal(STATE_DIR)
+    scheduler = LoadScheduler(get_warehouse())
+
+    refresh_bulk_dimensions(journal, scheduler)
 
     for season in SEASONS:
         print(f"\nProcesando temporada {season}...")
 
-        # 1) common_player_info
-        try:
-            df = get_common_player_info()
-            df = align_to_bq("common_player_info", df)
-            uri = to_parquet_gcs(df, f"bronze/{season}/common_player_info.parquet", table="common_player_info")
-            load_parquet_to_bq(uri, "common_player_info")
-            print("OK: common_player_info")
-        except Exception as e:
-            print(f"WARN common_player_info: {e}")
-
-        # 2) player
-        try:
-            df = get_players()
-            df = align_to_bq("player", df)
-            uri = to_parquet_gcs(df, f"bronze/{season}/player.parquet", table="player")
-            load_parquet_to_bq(uri, "player")
-            print("OK: player")
-        except Exception as e:
-            print(f"WARN player: {e}")
-
-        # 3) team_info_common
-        try:
-            df = get_team_info()
-            df = align_to_bq("team_info_common", df)
-            uri = to_parquet_gcs(df, f"bronze/{season}/team_info_common.parquet", table="team_info_common")
-            load_parquet_to_bq(uri, "team_info_common")
-            print("OK: team_info_common")
-        except Exception as e:
-            print(f"WARN team_info_common: {e}")
-
-        # 4) draft_combine_stats
-        try:
-            df = get_draft_combine()
-            df = align_to_bq("draft_combine_stats", df)
-            uri = to_parquet_gcs(df, f"bronze/{season}/draft_combine_stats.parquet", table="draft_combine_stats")
-            load_parquet_to_bq(uri, "draft_combine_stats")
-            print("OK: draft_combine_stats")
-        except Exception as e:
-            print(f"WARN draft_combine_stats: {e}")
-
-        # 5) player_career_stats
-        try:
-            df = get_player_career_stats()
-            df = align_to_bq("player_career_stats", df)
-            uri = to_parquet_gcs(df, f"bronze/{season}/player_career_stats.parquet", table="player_career_stats")
-            load_parquet_to_bq(uri, "player_career_stats")
-            print("OK: player_career_stats")
-        except Exception as e:
-            print(f"WARN player_career_stats: {e}")
-
-        # 6) game_summary, other_stats, boxscore_traditional
+        # 1-2) tablas de dimensión (una carga por temporada)
+        for table, extractor in DIM_EXTRACTORS:
+            if journal.is_loaded(season, table):
+                print(f"SKIP (checkpoint): {table}")
+                continue
+            try:
+                df = extractor()
+                df = align_to_bq(table, df)
+                uri = to_parquet_gcs(df, f"bronze/{season}/{table}.parquet", table=table)
+                scheduler.add(table, uri, lambda s=season, t=table, u=uri: journal.mark_loaded(s, t, u))
+                print(f"UPLOAD: {table}")
+            except Exception as e:
+                print(f"WARN {table}: {e}")
+
+        # 3) boxscore_traditional, game_summary, other_stats (un solo manifiesto)
         try:
-            box = get_boxscore_traditional(season)
-            gs, os = get_game_summary_and_other_stats(season)
-
-            if not box.empty:
-                box = align_to_bq("boxscore_traditional", box)
-                uri = to_parquet_gcs(box, f"bronze/{season}/boxscore_traditional.parquet", table="boxscore_traditional")
-                load_parquet_to_bq(uri, "boxscore_traditional")
-                print("OK: boxscore_traditional")
-
-            if not gs.empty:
-                gs = align_to_bq("game_summary", gs)
-                uri = to_parquet_gcs(gs, f"bronze/{season}/game_summary.parquet", table="game_summary")
-                load_parquet_to_bq(uri, "game_summary")
-                print("OK: game_summary")
-
-            if not os.empty:
-                os = align_to_bq("other_stats", os)
-                uri = to_parquet_gcs(os, f"bronze/{season}/other_stats.parquet", table="other_stats")
-                load_parquet_to_bq(uri, "other_stats")
-                print("OK: other_stats")
+            stage_game_data(season, journal)
         except Exception as e:
             print(f"WARN game data: {e}")
 
+        for table in GAME_TABLES:
+            try:
+                path = f"bronze/{season}/{table}.parquet"
+                rows, game_ids = write_staged_table(season, table, journal, local_parquet_path(path))
+                if not rows:
+                    continue
+                uri = upload_to_gcs(local_parquet_path(path), path)
+                scheduler.add(table, uri, lambda s=season, t=table, g=game_ids: journal.mark_staged_loaded(s, t, g))
+                print(f"UPLOAD: {table} ({len(game_ids)} partidos)")
+            except Exception as e:
+                print(f"WARN {table}: {e}")
+
+        if not BATCH_LOADS_ACROSS_SEASONS:
+            flush_loads(scheduler)
+
+    flush_loads(scheduler)
+    journal.close()
     print("\nIngesta historica completa (2025-2026).")
 
 if __name__ == "__main__":
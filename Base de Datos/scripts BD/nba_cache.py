@@ -0,0 +1,108 @@
+# nba_cache.py
+# Cache local en disco para las respuestas de nba_api (usado por fetch_dfs en ingest_nba.py)
+import os, json, time, hashlib, threading, tempfile
+from typing import Any, Callable, Dict, List, Optional
+import pandas as pd
+
+# ttl_policy(endpoint, kwargs) -> segundos de vida; None = no expira nunca
+TtlPolicy = Callable[[str, Dict[str, Any]], Optional[float]]
+
+class ResponseCache:
+    """Cache content-addressed: clave = sha256(endpoint + kwargs), valor = lista de DataFrames.
+
+    Cada entrada guarda su vencimiento según la política de TTL del endpoint.
+    Si el directorio supera `max_bytes` se desalojan las entradas menos usadas (LRU por mtime).
+    """
+
+    def __init__(self, root: str, max_bytes: int, ttl_policy: TtlPolicy):
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        self.ttl_policy = ttl_policy
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def key(endpoint: str, kwargs: Dict[str, Any]) -> str:
+        payload = json.dumps({"endpoint": endpoint, "kwargs": kwargs}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.pkl")
+
+    def get(self, endpoint: str, kwargs: Dict[str, Any]) -> Optional[List[pd.DataFrame]]:
+        path = self._path(self.key(endpoint, kwargs))
+        try:
+            entry = pd.read_pickle(path)
+        except Exception:
+            return None
+        expires_at = entry.get("expires_at")
+        if expires_at is not None and time.time() > expires_at:
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)  # marca de uso para el LRU
+        except OSError:
+            pass
+        return entry["frames"]
+
+    def put(self, endpoint: str, kwargs: Dict[str, Any], frames: List[pd.DataFrame]):
+        ttl = self.ttl_policy(endpoint, kwargs)
+        entry = {
+            "endpoint": endpoint,
+            "kwargs": kwargs,
+            "stored_at": time.time(),
+            "expires_at": None if ttl is None else time.time() + ttl,
+            "frames": frames,
+        }
+        path = self._path(self.key(endpoint, kwargs))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        try:
+            pd.to_pickle(entry, tmp)
+            old = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp, path)  # escritura atómica: nunca queda una entrada a medias
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._account(os.path.getsize(path) - old)
+
+    def _entries(self) -> List[str]:
+        out = []
+        for d, _, files in os.walk(self.root):
+            out.extend(os.path.join(d, f) for f in files if f.endswith(".pkl"))
+        return out
+
+    def _remove(self, path: str):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        self._account(-size)
+
+    def _account(self, delta: int):
+        with self._lock:
+            if self._size is None:
+                self._size = sum(os.path.getsize(p) for p in self._entries())
+            else:
+                self._size += delta
+            if self._size <= self.max_bytes:
+                return
+            # LRU: borramos las menos usadas hasta quedar en el 90% del límite
+            target = int(self.max_bytes * 0.9)
+            for p in sorted(self._entries(), key=os.path.getmtime):
+                if self._size <= target:
+                    break
+                try:
+                    size = os.path.getsize(p)
+                    os.remove(p)
+                    self._size -= size
+                except OSError:
+                    pass
+
+    def clear(self):
+        for p in self._entries():
+            self._remove(p)
@@ -0,0 +1,189 @@
+# nba_checkpoint.py
+# Journal de progreso de la ingesta (SQLite) para poder reanudar después de un corte
+import os, time, sqlite3, threading, tempfile
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from nba_parquet import conform_to_schema
+from nba_retry import CIRCUIT_OPEN
+
+def unify_staged_schemas(schemas: List[pa.Schema]) -> pa.Schema:
+    """Schema común de los Parquet en staging: nulos y anchos numéricos se promueven;
+    las columnas con tipos incompatibles entre partidos (int vs string) van como string."""
+    schemas = [s.remove_metadata() for s in schemas]
+    try:
+        return pa.unify_schemas(schemas, promote_options="permissive")
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+    types: Dict[str, Set[pa.DataType]] = {}
+    for s in schemas:
+        for f in s:
+            if not pa.types.is_null(f.type):
+                types.setdefault(f.name, set()).add(f.type)
+    conflict = {name for name, ts in types.items() if len(ts) > 1}
+    return pa.unify_schemas(
+        [pa.schema([pa.field(f.name, pa.string()) if f.name in conflict else f for f in s]) for s in schemas],
+        promote_options="permissive")
+
+class CheckpointJournal:
+    """Registra qué partidos ya se bajaron, qué quedó en staging y qué tablas ya se cargaron.
+
+    - fetched: partidos cuyo fetch terminó bien (no se vuelven a pedir a la API).
+    - staged:  un parquet por (partido, tabla) en disco, con flag `loaded` tras la carga a BQ.
+    - loads:   tablas no particionadas por partido (dimensiones) ya cargadas en una temporada.
+    - dead_letter: partidos cuyo fetch falló (clase de error y cantidad de intentos), para
+               reintentarlos en una pasada aparte sin frenar la principal.
+    - dim_state: huella (roster/to_year/equipo) de cada jugador o equipo ya cargado en una
+               dimensión masiva, para no volver a pedir los que no pudieron cambiar.
+    """
+
+    def __init__(self, state_dir: str):
+        self.state_dir = state_dir
+        self.staging_dir = os.path.join(state_dir, "staging")
+        os.makedirs(self.staging_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(state_dir, "checkpoint.sqlite"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS fetched (
+                season TEXT, game_id TEXT, done_at REAL,
+                PRIMARY KEY (season, game_id));
+            CREATE TABLE IF NOT EXISTS staged (
+                season TEXT, game_id TEXT, tbl TEXT, path TEXT, n_rows INTEGER,
+                loaded INTEGER DEFAULT 0,
+                PRIMARY KEY (season, game_id, tbl));
+            CREATE TABLE IF NOT EXISTS loads (
+                season TEXT, tbl TEXT, uri TEXT, done_at REAL,
+                PRIMARY KEY (season, tbl));
+            CREATE TABLE IF NOT EXISTS dead_letter (
+                season TEXT, game_id TEXT, kind TEXT, error TEXT, attempts INTEGER, parked_at REAL,
+                PRIMARY KEY (season, game_id));
+            CREATE TABLE IF NOT EXISTS dim_state (
+                tbl TEXT, entity_id TEXT, fingerprint TEXT, done_at REAL,
+                PRIMARY KEY (tbl, entity_id));
+        """)
+        self._conn.commit()
+
+    # ----- partidos -----
+    def fetched_games(self, season: str) -> Set[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT game_id FROM fetched WHERE season = ?", (season,)).fetchall()
+        return {r[0] for r in rows}
+
+    def stage_game(self, season: str, game_id: str, frames: Dict[str, pd.DataFrame]):
+        """Escribe los frames del partido a staging y recién después lo marca como bajado."""
+        staged = []
+        for tbl, df in frames.items():
+            path = os.path.join(self.staging_dir, season, tbl, f"{game_id}.parquet")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            os.close(fd)
+            df.to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+            staged.append((season, game_id, tbl, path, len(df)))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO staged (season, game_id, tbl, path, n_rows, loaded) VALUES (?, ?, ?, ?, ?, 0)",
+                staged)
+            self._conn.execute("INSERT OR REPLACE INTO fetched VALUES (?, ?, ?)", (season, game_id, time.time()))
+            self._conn.execute("DELETE FROM dead_letter WHERE season = ? AND game_id = ?", (season, game_id))
+            self._conn.commit()
+
+    def park_game(self, season: str, game_id: str, kind: str, error: str):
+        """Estaciona el partido; un rechazo por circuito abierto no cuenta como intento
+        (no se llegó a pedir), así no agota DEAD_LETTER_MAX_ATTEMPTS sin tocar la API."""
+        attempts = 0 if kind == CIRCUIT_OPEN else 1
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO dead_letter VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (season, game_id) DO UPDATE SET
+                    kind = excluded.kind, error = excluded.error,
+                    attempts = attempts + excluded.attempts, parked_at = excluded.parked_at""",
+                (season, game_id, kind, error[:500], attempts, time.time()))
+            self._conn.commit()
+
+    def dead_letters(self, season: str, retryable_only: bool = False, max_attempts: Optional[int] = None) -> List[str]:
+        """Partidos estacionados; con `retryable_only` sin los errores de cliente (4xx)
+        y sin los que ya agotaron `max_attempts`."""
+        sql = "SELECT game_id FROM dead_letter WHERE season = ?"
+        args: list = [season]
+        if retryable_only:
+            sql += " AND kind != 'client'"
+        if max_attempts is not None:
+            sql += " AND attempts < ?"
+            args.append(max_attempts)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY game_id", args).fetchall()
+        return [r[0] for r in rows]
+
+    def pending(self, season: str, tbl: str) -> List[Tuple[str, str]]:
+        """(game_id, path) en staging que todavía no se cargaron a la tabla."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT game_id, path FROM staged WHERE season = ? AND tbl = ? AND loaded = 0 ORDER BY game_id",
+                (season, tbl)).fetchall()
+
+    def iter_pending(self, season: str, tbl: str, batch_games: int) -> Iterator[Tuple[pa.Table, List[str]]]:
+        """Lotes (tabla Arrow, game_ids) de staging pendiente, de a `batch_games` partidos.
+
+        Se leen directo a Arrow (sin pasar por pandas). Todos los lotes salen con el mismo
+        schema (unify_staged_schemas sobre los footers de todos los archivos pendientes): si un
+        partido trae una columna toda nula o con otro tipo, el casteo y el row group de cada
+        lote siguen siendo los mismos.
+        """
+        rows = [(gid, p) for gid, p in self.pending(season, tbl) if os.path.exists(p)]
+        if not rows:
+            return
+        schema = unify_staged_schemas([pq.read_schema(p) for _, p in rows])
+        for i in range(0, len(rows), batch_games):
+            chunk = rows[i:i + batch_games]
+            table = pa.concat_tables([conform_to_schema(pq.read_table(p), schema) for _, p in chunk])
+            yield table, [gid for gid, _ in chunk]
+
+    def mark_staged_loaded(self, season: str, tbl: str, game_ids: List[str]):
+        with self._lock:
+            paths = self._conn.execute(
+                f"SELECT path FROM staged WHERE season = ? AND tbl = ? AND game_id IN ({','.join('?' * len(game_ids))})",
+                (season, tbl, *game_ids)).fetchall() if game_ids else []
+            self._conn.executemany(
+                "UPDATE staged SET loaded = 1 WHERE season = ? AND tbl = ? AND game_id = ?",
+                [(season, tbl, gid) for gid in game_ids])
+            self._conn.commit()
+        # ya está en BQ: el staging local se puede liberar
+        for (p,) in paths:
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+    # ----- tablas de dimensión -----
+    def is_loaded(self, season: str, tbl: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM loads WHERE season = ? AND tbl = ?", (season, tbl)).fetchone()
+        return row is not None
+
+    def mark_loaded(self, season: str, tbl: str, uri: str):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO loads VALUES (?, ?, ?, ?)", (season, tbl, uri, time.time()))
+            self._conn.commit()
+
+    # ----- dimensiones masivas (por jugador / equipo) -----
+    def dim_state(self, tbl: str) -> Dict[str, Tuple[str, float]]:
+        """{entity_id: (huella, done_at)} de lo ya cargado en la tabla."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT entity_id, fingerprint, done_at FROM dim_state WHERE tbl = ?", (tbl,)).fetchall()
+        return {eid: (fp, done_at) for eid, fp, done_at in rows}
+
+    def mark_dim_loaded(self, tbl: str, fingerprints: Dict[str, str]):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO dim_state VALUES (?, ?, ?, ?)",
+                [(tbl, eid, fp, now) for eid, fp in fingerprints.items()])
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
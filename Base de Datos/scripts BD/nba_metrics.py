@@ -0,0 +1,99 @@
+# nba_metrics.py
+# Métricas de una corrida de ingesta: tiempos por etapa y contadores, exportables a JSON o Prometheus
+import os, json, time, threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
+
+Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+def _key(name: str, labels: Dict[str, str]) -> Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _fmt(key: Key) -> str:
+    name, labels = key
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+class RunMetrics:
+    """Tiempos por etapa (count/total/max) y contadores, thread-safe.
+
+    Los tiempos de etapa se suman por hilo: con varios workers el total de "fetch.network"
+    puede superar la duración de la corrida (`wall_seconds`), que es lo que mide la espera agregada.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stages: Dict[Key, list] = {}      # [count, total_s, max_s]
+        self._counters: Dict[Key, float] = {}
+
+    def observe(self, stage: str, seconds: float, **labels):
+        k = _key(stage, labels)
+        with self._lock:
+            s = self._stages.setdefault(k, [0, 0.0, 0.0])
+            s[0] += 1
+            s[1] += seconds
+            s[2] = max(s[2], seconds)
+
+    @contextmanager
+    def stage(self, stage: str, **labels) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - t0, **labels)
+
+    def incr(self, counter: str, n: float = 1, **labels):
+        k = _key(counter, labels)
+        with self._lock:
+            self._counters[k] = self._counters.get(k, 0) + n
+
+    def report(self) -> dict:
+        with self._lock:
+            stages = {_fmt(k): {"count": c, "total_s": round(t, 4), "max_s": round(m, 4)}
+                      for k, (c, t, m) in sorted(self._stages.items())}
+            counters = {_fmt(k): v for k, v in sorted(self._counters.items())}
+        return {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "wall_seconds": round(time.perf_counter() - self._t0, 3),
+            "stages": stages,
+            "counters": counters,
+        }
+
+    def write_json(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def prometheus_text(self, prefix: str = "nba_ingest") -> str:
+        """Formato de exposición de Prometheus (p.ej. para el textfile collector de node_exporter)."""
+        lines = [f"# TYPE {prefix}_wall_seconds gauge",
+                 f"{prefix}_wall_seconds {time.perf_counter() - self._t0:.3f}"]
+        with self._lock:
+            stages = sorted(self._stages.items())
+            counters = sorted(self._counters.items())
+        seen = set()
+        for (name, labels), (c, t, _) in stages:
+            metric = f"{prefix}_stage_seconds"
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} summary")
+                seen.add(metric)
+            key = (("stage", name),) + labels
+            lines.append(f"{_fmt((metric + '_sum', key))} {t:.6f}")
+            lines.append(f"{_fmt((metric + '_count', key))} {c}")
+        for (name, labels), v in counters:
+            metric = f"{prefix}_{name.replace('.', '_')}_total"
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} counter")
+                seen.add(metric)
+            lines.append(f"{_fmt((metric, labels))} {int(v) if float(v).is_integer() else v}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, prefix: str = "nba_ingest"):
+        # escritura atómica: el collector nunca lee un archivo a medias
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text(prefix))
+        os.replace(tmp, path)
@@ -0,0 +1,273 @@
+# nba_nombres.py
+# Emparejamiento difuso de nombres de jugadores (lesiones -> player_id) con índice de bloqueo.
+# Reemplaza el process.extractOne de fuzzywuzzy contra la lista completa de jugadores
+# (O(nombres × jugadores) en Python puro) de creacion_dataset_lesiones.ipynb:
+#   1. normalización (acentos, puntuación, sufijos Jr./III, apodos -> nombre canónico)
+#   2. variantes del texto de lesiones ("A / B", "(William) Tony Parker", "John Wall (Hildred)")
+#   3. match exacto por nombre normalizado (la gran mayoría); el apodo se expande solo si
+#      el nombre tal como viene no existe ("Al Horford" no pasa a "Alan Horford")
+#   4. el resto: candidatos por trigramas de caracteres (índice invertido, conteos con numpy)
+#      y puntaje fino solo sobre los mejores candidatos
+#
+#   python nba_nombres.py lesiones.csv player.csv --salida lesiones_listas.csv
+import re, unicodedata
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+UMBRAL = 85            # mismo umbral que el token_set_ratio del notebook
+CANDIDATOS = 20        # candidatos por trigramas que pasan al puntaje fino
+
+SUFIJOS = frozenset({"jr", "sr", "ii", "iii", "iv", "v"})
+
+# apodo -> nombre canónico (se aplica al primer token de ambos lados). Solo hipocorísticos:
+# nombres que también son nombres propios completos (Al, Max, Stephen, KJ...) no van acá
+APODOS: Dict[str, str] = {
+    "mike": "michael", "mikey": "michael", "chris": "christopher", "matt": "matthew",
+    "nick": "nicholas", "nic": "nicholas", "wes": "wesley", "maxi": "maximilian",
+    "manu": "emanuel", "emmanuel": "emanuel", "tony": "anthony", "jon": "jonathan", "jonny": "jonathan",
+    "johnny": "john", "jim": "james", "jimmy": "james", "jamie": "james", "bill": "william",
+    "billy": "william", "will": "william", "willie": "william", "bob": "robert", "bobby": "robert",
+    "rob": "robert", "robbie": "robert", "dan": "daniel", "danny": "daniel", "dave": "david",
+    "steve": "steven", "tom": "thomas", "tommy": "thomas", "joe": "joseph",
+    "joey": "joseph", "ed": "edward", "eddie": "edward", "ben": "benjamin", "sam": "samuel",
+    "greg": "gregory", "jeff": "jeffrey", "pat": "patrick", "rick": "richard", "ricky": "richard",
+    "rich": "richard", "dick": "richard", "ron": "ronald", "ronnie": "ronald", "don": "donald",
+    "ray": "raymond", "larry": "lawrence", "lou": "louis", "fred": "frederick", "freddie": "frederick",
+    "andy": "andrew", "drew": "andrew", "alex": "alexander", "zach": "zachary",
+    "zack": "zachary", "nate": "nathan", "tim": "timothy", "ken": "kenneth", "kenny": "kenneth",
+    "charlie": "charles", "chuck": "charles", "jake": "jacob", "josh": "joshua", "gerry": "gerald",
+    "jerry": "gerald", "terry": "terrence", "vince": "vincent", "walt": "walter", "moe": "maurice",
+    "mo": "maurice", "lenny": "leonard", "len": "leonard", "og": "ogugua",
+}
+
+_NO_ALNUM = re.compile(r"[^a-z0-9 ]+")
+_ESPACIOS = re.compile(r"\s+")
+_PARENTESIS = re.compile(r"\(([^)]*)\)")
+
+
+def _sin_acentos(s: str) -> str:
+    return unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+
+
+def tokens(nombre: str, canonico: bool = True) -> Tuple[List[str], Optional[str]]:
+    """Tokens normalizados (sin sufijo; con `canonico`, el apodo pasa a nombre canónico) y el sufijo."""
+    s = _sin_acentos(str(nombre)).lower().replace(".", "").replace("'", "").replace("’", "")
+    toks = _ESPACIOS.sub(" ", _NO_ALNUM.sub(" ", s)).split()
+    sufijo = None
+    while toks and toks[-1] in SUFIJOS and len(toks) > 1:
+        sufijo = toks.pop()
+    if toks and canonico:
+        toks[0] = APODOS.get(toks[0], toks[0])
+    return toks, sufijo
+
+
+def normalizar(nombre: str) -> str:
+    return " ".join(tokens(nombre)[0])
+
+
+def variantes(texto: str) -> List[str]:
+    """Nombres posibles en un campo de lesiones: alias separados por '/' y paréntesis con o sin su contenido."""
+    texto = str(texto).strip("•· \t")
+    salida: List[str] = []
+    for parte in texto.split("/"):
+        parte = parte.strip()
+        if not parte:
+            continue
+        sin = _ESPACIOS.sub(" ", _PARENTESIS.sub(" ", parte)).strip()
+        con = _ESPACIOS.sub(" ", _PARENTESIS.sub(r" \1 ", parte)).strip()
+        for v in (sin, con):
+            if v and v not in salida:
+                salida.append(v)
+        # "James McAdoo (Michael)": el paréntesis suele ser el segundo nombre
+        m = _PARENTESIS.search(parte)
+        if m and sin:
+            t = sin.split()
+            medio = " ".join(t[:1] + [m.group(1).strip()] + t[1:])
+            if medio not in salida:
+                salida.append(medio)
+    return salida
+
+
+def _trigramas(s: str) -> List[str]:
+    s = f"  {s} "
+    return [s[i:i + 3] for i in range(len(s) - 2)]
+
+
+class EmparejadorNombres:
+    """Índice de jugadores para resolver nombres de texto libre a player_id.
+
+    `desde` / `hasta` (años de actividad, opcionales) desempatan homónimos cuando la consulta
+    trae el año; si no, gana el sufijo coincidente y después el id más reciente.
+    """
+
+    def __init__(self, ids: Sequence[int], nombres: Sequence[str],
+                 desde: Optional[Sequence[float]] = None, hasta: Optional[Sequence[float]] = None):
+        self.ids = np.asarray(ids)
+        self.nombres = [str(n) for n in nombres]
+        self.desde = None if desde is None else np.asarray(desde, dtype=np.float64)
+        self.hasta = None if hasta is None else np.asarray(hasta, dtype=np.float64)
+        tok = [tokens(n) for n in self.nombres]
+        self.norm = [" ".join(t) for t, _ in tok]
+        self.sufijos = [s for _, s in tok]
+        # para el puntaje fino: tokens canónicos y tal como vienen (un apodo con typo no tiene canónico)
+        self.tokens_canon = [frozenset(t) for t, _ in tok]
+        self.tokens_crudos = [frozenset(tokens(n, canonico=False)[0]) for n in self.nombres]
+
+        # exacto: nombre normalizado -> posiciones (con y sin expandir apodos)
+        self.exacto: Dict[str, List[int]] = {}
+        for i, n in enumerate(self.norm):
+            self.exacto.setdefault(n, []).append(i)
+        self.exacto_crudo: Dict[str, List[int]] = {}
+        for i, n in enumerate(self.nombres):
+            self.exacto_crudo.setdefault(" ".join(tokens(n, canonico=False)[0]), []).append(i)
+
+        # índice invertido de trigramas en formato CSR (trigrama -> posiciones de jugadores)
+        vocab: Dict[str, int] = {}
+        filas, cols = [], []
+        for i, n in enumerate(self.norm):
+            for g in set(_trigramas(n)):
+                filas.append(vocab.setdefault(g, len(vocab)))
+                cols.append(i)
+        filas, cols = np.asarray(filas, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+        orden = np.argsort(filas, kind="stable")
+        self.vocab = vocab
+        self.postings = cols[orden]
+        self.punteros = np.concatenate([[0], np.cumsum(np.bincount(filas, minlength=len(vocab)))])
+        self.n_trigramas = np.bincount(cols, minlength=len(self.norm))
+
+    @classmethod
+    def desde_df(cls, df: pd.DataFrame, id_col: str = "id", nombre_col: str = "full_name",
+                 desde_col: Optional[str] = None, hasta_col: Optional[str] = None) -> "EmparejadorNombres":
+        return cls(df[id_col].to_numpy(), df[nombre_col].astype(str).tolist(),
+                   df[desde_col] if desde_col else None, df[hasta_col] if hasta_col else None)
+
+    # ----- puntaje -----
+    def _candidatos(self, norm: str) -> np.ndarray:
+        """Los CANDIDATOS jugadores con mayor coeficiente de Dice sobre trigramas."""
+        grams = set(_trigramas(norm))
+        ids = [self.vocab[g] for g in grams if g in self.vocab]
+        if not ids:
+            return np.empty(0, dtype=np.int64)
+        ids = np.asarray(ids)
+        largos = self.punteros[ids + 1] - self.punteros[ids]
+        idx = np.repeat(self.punteros[ids] - np.cumsum(np.concatenate([[0], largos[:-1]])), largos) + np.arange(largos.sum())
+        comun = np.bincount(self.postings[idx], minlength=len(self.norm))
+        dice = 2.0 * comun / (len(grams) + self.n_trigramas)
+        k = min(CANDIDATOS, len(dice))
+        top = np.argpartition(-dice, k - 1)[:k]
+        return top[dice[top] > 0]
+
+    @staticmethod
+    def _token_set_ratio(a: frozenset, b: frozenset) -> float:
+        """0-1 con la lógica de token_set_ratio: intersección de tokens vs. cada nombre completo."""
+        comun = " ".join(sorted(a & b))
+        resto_a = f"{comun} {' '.join(sorted(a - b))}".strip()
+        resto_b = f"{comun} {' '.join(sorted(b - a))}".strip()
+        score = SequenceMatcher(None, resto_a, resto_b).ratio()
+        if comun:
+            score = max(score, SequenceMatcher(None, comun, resto_a).ratio(),
+                        SequenceMatcher(None, comun, resto_b).ratio())
+        return score
+
+    def _puntaje(self, canon: frozenset, crudos: frozenset, i: int) -> float:
+        return 100.0 * max(self._token_set_ratio(canon, self.tokens_canon[i]),
+                           self._token_set_ratio(crudos, self.tokens_crudos[i]))
+
+    def _desempatar(self, posiciones: List[int], sufijo: Optional[str], anio: Optional[float]) -> int:
+        def clave(i: int):
+            activo = 0
+            if anio is not None and self.desde is not None and self.hasta is not None:
+                activo = int(self.desde[i] <= anio <= self.hasta[i] + 1)
+            return (activo, int(sufijo is not None and self.sufijos[i] == sufijo), self.ids[i])
+        return max(posiciones, key=clave)
+
+    def emparejar_uno(self, texto: str, anio: Optional[float] = None) -> Tuple[Optional[int], float, str]:
+        """(posición del jugador, puntaje, método) para un nombre de texto libre."""
+        mejor: Tuple[Optional[int], float, str] = (None, 0.0, "sin_match")
+        vs = variantes(texto)
+        # primero el nombre tal como viene; el apodo expandido es el último recurso exacto
+        for canonico, indice in ((False, self.exacto_crudo), (True, self.exacto)):
+            for v in vs:
+                toks, sufijo = tokens(v, canonico=canonico)
+                if not toks:
+                    continue
+                pos = indice.get(" ".join(toks))
+                if pos:
+                    return self._desempatar(pos, sufijo, anio), 100.0, "exacto"
+        for v in vs:
+            toks, sufijo = tokens(v)
+            if not toks:
+                continue
+            cands = self._candidatos(" ".join(toks))
+            if not len(cands):
+                continue
+            canon, crudos = frozenset(toks), frozenset(tokens(v, canonico=False)[0])
+            puntajes = [(self._puntaje(canon, crudos, int(i)), int(i)) for i in cands]
+            top = max(p for p, _ in puntajes)
+            if top > mejor[1]:
+                empatados = [i for p, i in puntajes if p == top]
+                mejor = (self._desempatar(empatados, sufijo, anio), top, "difuso")
+        return mejor if mejor[1] >= UMBRAL else (None, mejor[1], "sin_match")
+
+    def emparejar(self, textos: Iterable[str], anios: Optional[Iterable[Optional[float]]] = None) -> pd.DataFrame:
+        """Un resultado por texto (se resuelve una vez por par único texto/año).
+
+        Columnas: nombre, player_id, nombre_jugador, puntaje, metodo.
+        """
+        textos = pd.Series(list(textos), dtype=object)
+        anios_s = pd.Series(list(anios) if anios is not None else [None] * len(textos), dtype=object)
+        claves = pd.MultiIndex.from_arrays([textos.fillna(""), anios_s.where(anios_s.notna(), -1)])
+        codigos, unicos = pd.factorize(claves)
+        resueltos = []
+        for texto, anio in unicos:
+            if not texto:
+                resueltos.append((None, 0.0, "sin_match"))
+                continue
+            resueltos.append(self.emparejar_uno(texto, None if anio == -1 else anio))
+        pos = np.array([-1 if r[0] is None else r[0] for r in resueltos], dtype=np.int64)[codigos]
+        ok = pos >= 0
+        return pd.DataFrame({
+            "nombre": textos.to_numpy(),
+            "player_id": pd.Series(self.ids[np.maximum(pos, 0)], dtype="Int64").where(ok, pd.NA),
+            "nombre_jugador": np.where(ok, np.asarray(self.nombres, dtype=object)[np.maximum(pos, 0)], None),
+            "puntaje": np.array([r[1] for r in resueltos])[codigos],
+            "metodo": np.array([r[2] for r in resueltos], dtype=object)[codigos],
+        })
+
+
+def resolver_lesiones(lesiones: pd.DataFrame, jugadores: pd.DataFrame) -> pd.DataFrame:
+    """Pasos 12-15 de creacion_dataset_lesiones.ipynb: agrega player_id, descarta los que no
+    se resolvieron y numera los registros (id_registro)."""
+    emparejador = EmparejadorNombres.desde_df(
+        jugadores, desde_col="from_year" if "from_year" in jugadores else None,
+        hasta_col="to_year" if "to_year" in jugadores else None)
+    nombres = lesiones["Acquired"].fillna(lesiones["Relinquished"])
+    anios = pd.to_datetime(lesiones["Date"], errors="coerce").dt.year if "Date" in lesiones else None
+    res = emparejador.emparejar(nombres, None if anios is None else anios.where(anios.notna(), None))
+    # Series Int64 alineada al índice de `lesiones`: con .to_numpy() pasaba a object/float
+    # y el CSV terminaba con ids como 201142.0
+    salida = lesiones.assign(player_id=res["player_id"].astype("Int64").set_axis(lesiones.index))
+    salida = salida[salida["player_id"].notna()].reset_index(drop=True)
+    salida["player_id"] = salida["player_id"].astype("int64")
+    salida["id_registro"] = np.arange(1, len(salida) + 1)
+    return salida
+
+
+if __name__ == "__main__":
+    import argparse, time
+
+    ap = argparse.ArgumentParser(description="Agrega player_id al dataset de lesiones")
+    ap.add_argument("lesiones", help="CSV con Date, Team, Acquired, Relinquished, Notes")
+    ap.add_argument("jugadores", help="player.csv (id, full_name[, from_year, to_year])")
+    ap.add_argument("--salida", required=True)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    lesiones = pd.read_csv(args.lesiones)
+    salida = resolver_lesiones(lesiones, pd.read_csv(args.jugadores))
+    salida.to_csv(args.salida, index=False)
+    print(f"{len(salida):,} de {len(lesiones):,} filas con player_id ({len(salida) / max(len(lesiones), 1):.1%}) "
+          f"en {time.perf_counter() - t0:.2f}s -> {args.salida}")
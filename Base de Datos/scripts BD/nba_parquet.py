@@ -0,0 +1,116 @@
+# nba_parquet.py
+# Escritura de Parquet local por row groups (sin dependencias de GCS/BigQuery)
+import os, re
+from typing import Iterable, List, Optional, Union
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+PARQUET_VERSION = "2.6"
+TS_US_UTC = pa.timestamp("us", tz="UTC")
+
+def normalize_name(col) -> str:
+    return re.sub(r"\W+", "_", str(col).strip().lower())
+
+def timestamp_to_us_utc(arr: Union[pa.Array, pa.ChunkedArray]) -> Union[pa.Array, pa.ChunkedArray]:
+    """timestamp[*] -> timestamp[us, UTC] (BigQuery no acepta nanosegundos en TIMESTAMP).
+
+    Las fechas sin zona se toman como UTC; los ns se truncan hacia abajo (floor, como dt.floor("us")).
+    """
+    if arr.type.tz is None:
+        arr = pc.assume_timezone(arr, "UTC")
+    if arr.type.unit == "ns":
+        arr = pc.floor_temporal(arr, unit="microsecond")
+    return pc.cast(arr, TS_US_UTC)
+
+def df_to_arrow(df: pd.DataFrame, schema: Optional[pa.Schema] = None) -> pa.Table:
+    """Única conversión pandas -> Arrow del camino de escritura, sin copias intermedias del DataFrame.
+
+    Columna a columna: nombres normalizados, duplicados descartados (gana la primera)
+    y fechas a timestamp[us, UTC]; el resto (schema, casteos) se resuelve ya sobre Arrow.
+    """
+    names: List[str] = []
+    arrays: List[pa.Array] = []
+    for i, col in enumerate(df.columns):
+        name = normalize_name(col)
+        if name in names:
+            continue
+        arr = pa.array(df.iloc[:, i], from_pandas=True)
+        if pa.types.is_timestamp(arr.type):
+            arr = timestamp_to_us_utc(arr)
+        names.append(name)
+        arrays.append(arr)
+    table = pa.Table.from_arrays(arrays, names=names)
+    if schema is not None:
+        table = conform_to_schema(table, schema)
+    return table
+
+def conform_to_schema(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """Columnas de `schema` en su orden y tipo; las que falten quedan nulas."""
+    cols = []
+    for field in schema:
+        if field.name in table.column_names:
+            col = table.column(field.name)
+            cols.append(col if col.type == field.type else col.cast(field.type))
+        else:
+            cols.append(pa.nulls(table.num_rows, field.type))
+    return pa.Table.from_arrays(cols, schema=schema)
+
+class StreamingParquetWriter:
+    """Escribe cada lote como un row group de un único archivo Parquet con schema fijo.
+
+    El schema sale del primer lote (o se pasa explícito); las columnas que falten en un lote
+    se completan con nulos y las que sobren se descartan. La memoria queda acotada al lote.
+    """
+
+    def __init__(self, path: str, schema: Optional[pa.Schema] = None):
+        self.path = path
+        self.schema = schema
+        self.rows = 0
+        self.row_groups = 0
+        self._writer: Optional[pq.ParquetWriter] = None
+        self._warned: set = set()
+
+    @staticmethod
+    def _fix_schema(schema: pa.Schema) -> pa.Schema:
+        # una columna toda nula en el primer lote no define tipo: la dejamos como string
+        return pa.schema([pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f
+                          for f in schema.remove_metadata()])
+
+    def write(self, data: Union[pd.DataFrame, pa.Table]):
+        if data is None or len(data) == 0:
+            return
+        if isinstance(data, pd.DataFrame):
+            data = df_to_arrow(data)
+        if self.schema is None:
+            self.schema = self._fix_schema(data.schema)
+        extra = [c for c in data.column_names if c not in self.schema.names and c not in self._warned]
+        if extra:
+            print(f"  parquet {os.path.basename(self.path)}: columnas fuera del schema descartadas {extra}")
+            self._warned.update(extra)
+        table = conform_to_schema(data, self.schema)
+        if self._writer is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._writer = pq.ParquetWriter(self.path, self.schema, version=PARQUET_VERSION)
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+        self.row_groups += 1
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def write_parquet_stream(batches: Iterable[Union[pd.DataFrame, pa.Table]], path: str, schema: Optional[pa.Schema] = None) -> int:
+    """Escribe los lotes a `path` y devuelve la cantidad de filas (0 = no se creó archivo)."""
+    with StreamingParquetWriter(path, schema) as w:
+        for df in batches:
+            w.write(df)
+    return w.rows
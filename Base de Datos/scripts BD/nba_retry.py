@@ -0,0 +1,118 @@
+# nba_retry.py
+# Clasificación de errores, backoff adaptativo y circuit breaker para las llamadas a stats.nba.com
+import random, threading, time
+from collections import deque
+from typing import Dict, Optional
+
+# clases de error
+TIMEOUT      = "timeout"
+THROTTLE     = "throttle"      # 429 / 503
+CLIENT       = "client"        # otros 4xx: el ID es inválido, reintentar no sirve
+SERVER       = "server"        # 5xx
+EMPTY        = "empty"         # respondió pero sin filas donde se esperaban datos
+OTHER        = "other"         # conexión cortada, JSON inválido, etc.
+CIRCUIT_OPEN = "circuit_open"  # no se llegó a pedir: el endpoint está en cuarentena
+
+# lo que vale la pena reintentar en una pasada posterior (dead-letter)
+RETRYABLE = frozenset({TIMEOUT, THROTTLE, SERVER, EMPTY, OTHER, CIRCUIT_OPEN})
+
+class EmptyPayload(Exception):
+    """La API respondió sin datos en una llamada que debe traerlos (p.ej. boxscore de un partido finalizado)."""
+
+class FetchFailed(Exception):
+    """Se agotó el presupuesto de reintentos de su clase de error (o el circuito estaba abierto)."""
+
+    def __init__(self, label: str, kind: str, cause: Optional[Exception] = None):
+        super().__init__(f"{label}: {kind}" + (f" ({cause})" if cause is not None else ""))
+        self.label = label
+        self.kind = kind
+
+def classify_error(e: Exception) -> str:
+    if isinstance(e, FetchFailed):
+        return e.kind
+    if isinstance(e, EmptyPayload):
+        return EMPTY
+    status = getattr(getattr(e, "response", None), "status_code", None)
+    if status in (429, 503):
+        return THROTTLE
+    if status is not None and 400 <= status < 500:
+        return CLIENT
+    if status is not None and status >= 500:
+        return SERVER
+    if isinstance(e, TimeoutError) or "timeout" in type(e).__name__.lower() or "timed out" in str(e).lower():
+        return TIMEOUT
+    return OTHER
+
+class AdaptiveBackoff:
+    """Espera entre reintentos escalada por la tasa de éxito de los últimos `window` requests.
+
+    Con la API sana (tasa ~1) un fallo aislado espera poco; si la tasa cae, la espera crece
+    hasta 5x, así no martillamos un servidor que ya está respondiendo mal.
+    """
+
+    def __init__(self, base: float, max_delay: float, window: int = 50):
+        self.base = base
+        self.max_delay = max_delay
+        self._results = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, ok: bool):
+        with self._lock:
+            self._results.append(ok)
+
+    def success_rate(self) -> float:
+        with self._lock:
+            if not self._results:
+                return 1.0
+            return sum(self._results) / len(self._results)
+
+    def delay(self, attempt: int) -> float:
+        scale = 1 + 4 * (1 - self.success_rate())
+        return min(self.max_delay, self.base * (2 ** attempt) * scale) + random.uniform(0, 0.4)
+
+class CircuitBreaker:
+    """Circuito por endpoint: tras `threshold` fallos seguidos se abre por `cooldown` segundos.
+
+    Abierto, las llamadas fallan al instante (sin consumir tokens); vencido el cooldown
+    deja pasar un solo request de prueba y se cierra si responde bien.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures: Dict[str, int] = {}
+        self._open_until: Dict[str, float] = {}
+        self._probing: set = set()
+        self._lock = threading.Lock()
+
+    def allow(self, key: str) -> bool:
+        with self._lock:
+            until = self._open_until.get(key)
+            if until is None:
+                return True
+            if time.monotonic() < until or key in self._probing:
+                return False
+            self._probing.add(key)   # half-open: pasa solo este
+            return True
+
+    def record(self, key: str, ok: bool):
+        with self._lock:
+            self._probing.discard(key)
+            if ok:
+                self._failures.pop(key, None)
+                self._open_until.pop(key, None)
+                return
+            n = self._failures.get(key, 0) + 1
+            self._failures[key] = n
+            if n >= self.threshold:
+                self._open_until[key] = time.monotonic() + self.cooldown
+
+    def is_open(self, key: str) -> bool:
+        with self._lock:
+            return key in self._open_until
+
+    def reset(self):
+        with self._lock:
+            self._failures.clear()
+            self._open_until.clear()
+            self._probing.clear()
@@ -0,0 +1,174 @@
+# nba_schema.py
+# Registro de schemas del warehouse (una consulta por tabla y corrida) y planes de casteo a Arrow
+import os, json, threading
+from typing import Callable, Dict, Optional, Tuple
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from nba_parquet import TS_US_UTC, timestamp_to_us_utc
+
+# BigQuery -> Arrow; cualquier otro tipo se escribe como string (igual que antes con astype(str))
+_BQ_TO_ARROW = {
+    "INT64": pa.int64(), "INTEGER": pa.int64(),
+    "FLOAT64": pa.float64(), "FLOAT": pa.float64(), "NUMERIC": pa.float64(), "BIGNUMERIC": pa.float64(),
+    "BOOL": pa.bool_(), "BOOLEAN": pa.bool_(),
+    "TIMESTAMP": TS_US_UTC,
+    "STRING": pa.string(),
+}
+_TRUE  = pa.array(["1", "TRUE", "T", "Y"])
+_FALSE = pa.array(["0", "FALSE", "F", "N"])
+_NUMERIC_RE = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"
+
+class SchemaRegistry:
+    """Schemas {columna: tipo BQ} por tabla, pedidos una sola vez por corrida.
+
+    Si existe `schema_file` (JSON {tabla: {columna: tipo}}) se usa sin consultar al warehouse.
+    """
+
+    def __init__(self, fetch: Callable[[str], Dict[str, str]], schema_file: Optional[str] = None, metrics=None):
+        self._fetch = fetch
+        self.metrics = metrics
+        self._schemas: Dict[str, Dict[str, str]] = {}
+        self._plans: Dict[str, "CastPlan"] = {}
+        self._lock = threading.Lock()
+        if schema_file and os.path.exists(schema_file):
+            with open(schema_file, encoding="utf-8") as f:
+                self._schemas.update(json.load(f))
+
+    def get(self, table: str) -> Dict[str, str]:
+        with self._lock:
+            if table not in self._schemas:
+                self._schemas[table] = self._fetch(table)
+            return self._schemas[table]
+
+    def plan(self, table: str) -> Optional["CastPlan"]:
+        schema = self.get(table)
+        if not schema:
+            return None
+        with self._lock:
+            if table not in self._plans:
+                self._plans[table] = CastPlan(schema, table=table, metrics=self.metrics)
+            return self._plans[table]
+
+    def invalidate(self, table: str):
+        """Tras una carga que pudo agregar columnas (o crear la tabla)."""
+        with self._lock:
+            self._schemas.pop(table, None)
+            self._plans.pop(table, None)
+
+    def dump(self, path: str):
+        with self._lock:
+            data = {t: s for t, s in self._schemas.items() if s}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+
+
+def to_numeric(arr: pa.ChunkedArray, target: pa.DataType) -> pa.ChunkedArray:
+    if pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type):
+        s = pc.utf8_trim_whitespace(arr)
+        ok = pc.match_substring_regex(s, _NUMERIC_RE)
+        s = pc.if_else(ok, s, pa.scalar(None, s.type))
+        arr = pc.cast(s, pa.float64())
+    elif pa.types.is_boolean(arr.type):
+        arr = pc.cast(arr, pa.int64())
+    if pa.types.is_integer(target) and pa.types.is_floating(arr.type):
+        # valores con decimales o fuera de rango (inf) no son enteros válidos -> nulo
+        # (como errors="coerce"); así el casteo no falla según los datos de cada lote
+        valid = pc.and_(pc.equal(pc.floor(arr), arr), pc.less(pc.abs(arr), 2.0 ** 63))
+        arr = pc.if_else(valid, arr, pa.scalar(None, arr.type))
+    return pc.cast(arr, target)
+
+def _to_bool(arr: pa.ChunkedArray) -> pa.ChunkedArray:
+    if pa.types.is_boolean(arr.type):
+        return arr
+    if pa.types.is_integer(arr.type) or pa.types.is_floating(arr.type):
+        return pc.not_equal(arr, pa.scalar(0, arr.type))
+    s = pc.utf8_upper(pc.utf8_trim_whitespace(pc.cast(arr, pa.string())))
+    return pc.if_else(pc.is_in(s, value_set=_TRUE), True,
+                      pc.if_else(pc.is_in(s, value_set=_FALSE), False, pa.scalar(None, pa.bool_())))
+
+def _to_timestamp(arr: pa.ChunkedArray) -> pa.ChunkedArray:
+    if pa.types.is_timestamp(arr.type):
+        return timestamp_to_us_utc(arr)
+    try:
+        return pc.cast(pc.cast(arr, pa.timestamp("us")), TS_US_UTC)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        # formatos mixtos: pandas es más tolerante (y convierte inválidos a NaT)
+        s = pd.to_datetime(arr.to_pandas(), errors="coerce", utc=True).dt.floor("us")
+        return pa.chunked_array([pa.array(s, type=TS_US_UTC)])
+
+def _to_string(arr: pa.ChunkedArray) -> pa.ChunkedArray:
+    return arr if pa.types.is_string(arr.type) else pc.cast(arr, pa.string())
+
+class CastPlan:
+    """Plan de casteo compilado para una tabla: schema Arrow destino y un convertidor por columna.
+
+    Los convertidores se eligen según (tipo BQ destino, tipo Arrow origen) y se memorizan,
+    así cada lote solo ejecuta kernels de Arrow columnares, sin try/except por columna.
+    Si un casteo falla la columna se conserva con su tipo original (como el astype con
+    try/except de antes), con un aviso y el contador `cast_failures` en `metrics`. La columna
+    queda así para los lotes siguientes del plan: todos los row groups de un Parquet
+    tienen que compartir el tipo.
+    """
+
+    def __init__(self, bq_schema: Dict[str, str], table: Optional[str] = None, metrics=None):
+        self.bq_schema = dict(bq_schema)
+        self.table = table
+        self.metrics = metrics
+        self.cast_failures: Dict[str, int] = {}
+        self.target = pa.schema([pa.field(c, _BQ_TO_ARROW.get(t, pa.string())) for c, t in bq_schema.items()])
+        self._converters: Dict[Tuple[str, pa.DataType], Callable[[pa.ChunkedArray], pa.ChunkedArray]] = {}
+        self._fallback: Dict[str, pa.DataType] = {}
+
+    def _converter(self, col: str, src: pa.DataType) -> Callable[[pa.ChunkedArray], pa.ChunkedArray]:
+        key = (col, src)
+        conv = self._converters.get(key)
+        if conv is None:
+            target = self.target.field(col).type
+            if src == target:
+                conv = lambda a: a
+            elif pa.types.is_null(src):
+                conv = lambda a, t=target: pa.chunked_array([pa.nulls(len(a), t)])
+            elif pa.types.is_integer(target) or pa.types.is_floating(target):
+                conv = lambda a, t=target: to_numeric(a, t)
+            elif pa.types.is_boolean(target):
+                conv = _to_bool
+            elif pa.types.is_timestamp(target):
+                conv = _to_timestamp
+            else:
+                conv = _to_string
+            self._converters[key] = conv
+        return conv
+
+    def apply(self, table: pa.Table) -> pa.Table:
+        """Deja solo las columnas del schema (en su orden) casteadas a su tipo destino.
+
+        Una columna que no se puede castear queda con sus datos y su tipo de origen.
+        """
+        cols, fields = [], []
+        for field in self.target:
+            if field.name not in table.column_names:
+                continue
+            arr = table.column(field.name)
+            fallback = self._fallback.get(field.name)
+            if fallback is not None:
+                # ya falló en un lote anterior: mismo tipo que ese lote
+                arr = arr if arr.type == fallback else arr.cast(fallback)
+                field = pa.field(field.name, fallback)
+                cols.append(arr)
+                fields.append(field)
+                continue
+            try:
+                arr = self._converter(field.name, arr.type)(arr)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError) as e:
+                self.cast_failures[field.name] = self.cast_failures.get(field.name, 0) + 1
+                if self.metrics is not None:
+                    self.metrics.incr("cast_failures", table=self.table or "", column=field.name)
+                print(f"  WARN cast {self.table or '?'}.{field.name} {arr.type} -> {field.type}: "
+                      f"se conserva el tipo de origen ({e})")
+                self._fallback[field.name] = arr.type
+                field = pa.field(field.name, arr.type)
+            cols.append(arr)
+            fields.append(field)
+        return pa.Table.from_arrays(cols, schema=pa.schema(fields))
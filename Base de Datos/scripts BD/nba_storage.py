@@ -0,0 +1,304 @@
+# nba_storage.py
+# Backends de almacenamiento/warehouse para ingest_nba.py:
+#   - GcsBigQueryWarehouse: GCS + BigQuery (producción)
+#   - LocalWarehouse: directorio de Parquet + SQLite (offline, profiling, CI sin credenciales)
+import os, shutil, sqlite3, threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import pandas as pd
+
+# Tipos en vocabulario BigQuery: es lo que entiende align_to_bq/cast_series
+_SQLITE_TO_BQ = {
+    "INTEGER": "INT64", "BIGINT": "INT64",
+    "REAL": "FLOAT64", "FLOAT": "FLOAT64",
+    "TEXT": "STRING",
+    "TIMESTAMP": "TIMESTAMP", "DATE": "DATE",
+    "BOOLEAN": "BOOL",
+}
+
+class Warehouse:
+    """Interfaz mínima que usa la ingesta: subir Parquet, cargarlo a una tabla y leer schemas."""
+
+    def ensure_dataset(self):
+        raise NotImplementedError
+
+    def upload(self, local_path: str, path: str) -> str:
+        """Copia el Parquet local al storage y devuelve su URI."""
+        raise NotImplementedError
+
+    def load(self, uri: str, table: str, replace_key: Optional[str] = None):
+        """Append del Parquet en `uri` a `table`, agregando columnas nuevas si hace falta."""
+        self.submit_load([uri], table, replace_key=replace_key).result()
+
+    def submit_load(self, uris: List[str], table: str, replace_key: Optional[str] = None) -> Any:
+        """Lanza la carga de varios Parquet a `table` sin esperar; devuelve un job con `.result()`.
+
+        Sin `replace_key` es un append. Con `replace_key` (dimensiones) las filas de `table` cuyo
+        valor de esa columna aparece en los archivos se reemplazan por las nuevas, en una sola
+        transacción: refrescar una entidad no duplica sus filas.
+        """
+        raise NotImplementedError
+
+    def get_schema(self, table: str) -> Dict[str, str]:
+        """{columna: tipo BigQuery}; {} si la tabla no existe."""
+        raise NotImplementedError
+
+    def game_high_water_mark(self, season: str) -> Tuple[Optional[date], Set[str]]:
+        """Última fecha cargada en game_summary para la temporada y los GAME_IDs de esa fecha."""
+        raise NotImplementedError
+
+
+class GcsBigQueryWarehouse(Warehouse):
+    def __init__(self, project_id: str, dataset_id: str, bucket_name: str, key_path: str,
+                 location: str = "northamerica-south1"):
+        from google.cloud import bigquery, storage
+        from google.oauth2 import service_account
+
+        self._bigquery = bigquery
+        creds = service_account.Credentials.from_service_account_file(key_path)
+        self.bq = bigquery.Client(project=project_id, credentials=creds)
+        self.gcs = storage.Client(project=project_id, credentials=creds)
+        self.bucket_name = bucket_name
+        self.bucket = self.gcs.bucket(bucket_name)
+        self.dataset_ref = f"{project_id}.{dataset_id}"
+        self.location = location
+        # load a staging + MERGE encadenados: cada reemplazo espera su load en un hilo
+        self._executor = ThreadPoolExecutor(max_workers=4)
+
+    def ensure_dataset(self):
+        bigquery = self._bigquery
+        try:
+            ds = self.bq.get_dataset(self.dataset_ref)
+            print(f"Dataset detectado: {self.dataset_ref} (location={ds.location})")
+        except Exception:
+            ds = bigquery.Dataset(self.dataset_ref)
+            ds.location = self.location
+            self.bq.create_dataset(ds)
+            print(f"Dataset creado: {self.dataset_ref} (location={self.location})")
+
+    def upload(self, local_path: str, path: str) -> str:
+        blob = self.bucket.blob(path)
+        blob.upload_from_filename(local_path)
+        return f"gs://{self.bucket_name}/{path}"
+
+    def submit_load(self, uris: List[str], table: str, replace_key: Optional[str] = None):
+        if replace_key:
+            return self._executor.submit(self._replace, uris, table, replace_key)
+        bigquery = self._bigquery
+        job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.PARQUET,
+            write_disposition="WRITE_APPEND",
+            schema_update_options=[
+                bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION,
+                bigquery.SchemaUpdateOption.ALLOW_FIELD_RELAXATION,
+            ],
+        )
+        # un solo job por tabla aunque haya varios archivos (p.ej. varias temporadas)
+        return self.bq.load_table_from_uri(uris, f"{self.dataset_ref}.{table}", job_config=job_config)
+
+    def _replace(self, uris: List[str], table: str, key: str):
+        """WRITE_TRUNCATE a `<table>__staging` y MERGE por `key` sobre `table`."""
+        bigquery = self._bigquery
+        target, staging = f"{self.dataset_ref}.{table}", f"{self.dataset_ref}.{table}__staging"
+        job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.PARQUET,
+            write_disposition="WRITE_TRUNCATE",
+        )
+        self.bq.load_table_from_uri(uris, staging, job_config=job_config).result()
+        fields = self.bq.get_table(staging).schema
+        if key not in {f.name for f in fields}:
+            raise ValueError(f"{table}: la columna clave {key} no está en los archivos")
+
+        existing = self.get_schema(table)
+        if not existing:
+            sql = f"CREATE TABLE `{target}` AS SELECT * FROM `{staging}`"
+        else:
+            # equivalente a ALLOW_FIELD_ADDITION antes del MERGE
+            added = "".join(f"ALTER TABLE `{target}` ADD COLUMN IF NOT EXISTS `{f.name}` {f.field_type};\n"
+                            for f in fields if f.name not in existing)
+            cols = ", ".join(f"`{f.name}`" for f in fields)
+            values = ", ".join(f"S.`{f.name}`" for f in fields)
+            # ON FALSE: se borran todas las filas de las entidades refrescadas (un jugador
+            # tiene varias filas en player_career_stats) y se insertan las del archivo
+            sql = f"""{added}
+                MERGE `{target}` T
+                USING `{staging}` S
+                ON FALSE
+                WHEN NOT MATCHED BY SOURCE AND T.`{key}` IN (SELECT `{key}` FROM `{staging}`) THEN DELETE
+                WHEN NOT MATCHED THEN INSERT ({cols}) VALUES ({values})"""
+        self.bq.query(sql).result()
+        self.bq.delete_table(staging, not_found_ok=True)
+
+    def get_schema(self, table: str) -> Dict[str, str]:
+        try:
+            t = self.bq.get_table(f"{self.dataset_ref}.{table}")
+            return {f.name: f.field_type for f in t.schema}
+        except Exception:
+            return {}
+
+    _GAME_DATE_SQL = "SAFE_CAST(SUBSTR(CAST(game_date_est AS STRING), 1, 10) AS DATE)"
+
+    def game_high_water_mark(self, season: str) -> Tuple[Optional[date], Set[str]]:
+        bigquery = self._bigquery
+        job_config = bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ScalarQueryParameter("season", "STRING", season[:4]),
+        ])
+        rows = list(self.bq.query(f"""
+            SELECT MAX({self._GAME_DATE_SQL}) AS hwm
+            FROM `{self.dataset_ref}.game_summary`
+            WHERE CAST(season AS STRING) = @season
+        """, job_config=job_config).result())
+        hwm = rows[0]["hwm"] if rows else None
+        if hwm is None:
+            return None, set()
+
+        # los partidos del mismo día de la marca pueden estar cargados solo en parte
+        job_config = bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ScalarQueryParameter("hwm", "DATE", hwm),
+        ])
+        rows = self.bq.query(f"""
+            SELECT DISTINCT LPAD(CAST(game_id AS STRING), 10, '0') AS game_id
+            FROM `{self.dataset_ref}.game_summary`
+            WHERE {self._GAME_DATE_SQL} = @hwm
+        """, job_config=job_config).result()
+        return hwm, {r["game_id"] for r in rows}
+
+
+class LocalWarehouse(Warehouse):
+    """Parquet en `root/<path>` y tablas en `root/warehouse.sqlite` (mismo contrato que GCS+BQ)."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.db_path = os.path.join(root, "warehouse.sqlite")
+        self._lock = threading.Lock()
+        # SQLite serializa las escrituras: un solo worker para las cargas diferidas
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:  # commit/rollback
+                yield conn
+        finally:
+            conn.close()
+
+    def ensure_dataset(self):
+        os.makedirs(self.root, exist_ok=True)
+        with self._connect():
+            pass
+        print(f"Warehouse local: {self.db_path}")
+
+    def upload(self, local_path: str, path: str) -> str:
+        dest = os.path.join(self.root, *path.split("/"))
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        shutil.copyfile(local_path, dest)
+        return dest
+
+    def submit_load(self, uris: List[str], table: str, replace_key: Optional[str] = None):
+        if replace_key:
+            return self._executor.submit(lambda: self._load_frames([pd.read_parquet(u) for u in uris], table, replace_key))
+        return self._executor.submit(lambda: [self.load(u, table) for u in uris])
+
+    def load(self, uri: str, table: str, replace_key: Optional[str] = None):
+        self._load_frames([pd.read_parquet(uri)], table, replace_key)
+
+    def _load_frames(self, frames: List[pd.DataFrame], table: str, replace_key: Optional[str] = None):
+        frames = [df for df in frames if not df.empty]
+        if not frames:
+            return
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        if replace_key and replace_key not in df.columns:
+            raise ValueError(f"{table}: la columna clave {replace_key} no está en los archivos")
+        with self._lock, self._connect() as conn:
+            existing = self._columns(conn, table)
+            if existing:
+                # equivalente a ALLOW_FIELD_ADDITION
+                for col in df.columns:
+                    if col not in existing:
+                        conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{col}"')
+                if replace_key:
+                    # mismo efecto que el MERGE de BigQuery: fuera las filas de las entidades que llegan
+                    conn.execute("CREATE TEMP TABLE IF NOT EXISTS _replace_keys (k)")
+                    conn.execute("DELETE FROM _replace_keys")
+                    conn.executemany("INSERT INTO _replace_keys VALUES (?)",
+                                     [(k,) for k in df[replace_key].dropna().unique().tolist()])
+                    conn.execute(f'DELETE FROM "{table}" WHERE "{replace_key}" IN (SELECT k FROM _replace_keys)')
+            df.to_sql(table, conn, if_exists="append", index=False, chunksize=10_000)
+
+    @staticmethod
+    def _columns(conn: sqlite3.Connection, table: str) -> Dict[str, str]:
+        rows = conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+        return {r[1]: (r[2] or "").upper() for r in rows}
+
+    def get_schema(self, table: str) -> Dict[str, str]:
+        if not os.path.exists(self.db_path):
+            return {}
+        with self._connect() as conn:
+            cols = self._columns(conn, table)
+        return {c: _SQLITE_TO_BQ.get(t, "STRING") for c, t in cols.items()}
+
+    def game_high_water_mark(self, season: str) -> Tuple[Optional[date], Set[str]]:
+        if "game_date_est" not in self.get_schema("game_summary"):
+            return None, set()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT MAX(SUBSTR(game_date_est, 1, 10)) FROM game_summary WHERE CAST(season AS TEXT) = ?",
+                (season[:4],)).fetchone()
+            if not row or row[0] is None:
+                return None, set()
+            hwm = date.fromisoformat(row[0])
+            ids = conn.execute(
+                "SELECT DISTINCT game_id FROM game_summary WHERE SUBSTR(game_date_est, 1, 10) = ?",
+                (row[0],)).fetchall()
+        return hwm, {str(r[0]).zfill(10) for r in ids}
+
+
+class LoadScheduler:
+    """Acumula (tabla, uri) y al hacer flush lanza un job por tabla y espera todos juntos.
+
+    Así la fase de carga tarda lo que el job más largo y no la suma de todos.
+    `on_done` se llama solo si el job de su tabla terminó bien (p.ej. para marcar el checkpoint).
+    `replace_key` pide reemplazo por esa columna en lugar de append (ver Warehouse.submit_load).
+    """
+
+    def __init__(self, warehouse: Warehouse):
+        self.warehouse = warehouse
+        self._pending: Dict[str, List[Tuple[str, Optional[Callable[[], None]]]]] = {}
+        self._replace_keys: Dict[str, str] = {}
+
+    def add(self, table: str, uri: str, on_done: Optional[Callable[[], None]] = None,
+            replace_key: Optional[str] = None):
+        if uri:
+            self._pending.setdefault(table, []).append((uri, on_done))
+            if replace_key:
+                self._replace_keys[table] = replace_key
+
+    def __len__(self):
+        return sum(len(v) for v in self._pending.values())
+
+    def flush(self) -> Dict[str, Optional[Exception]]:
+        """Devuelve {tabla: None si cargó bien, o la excepción del job}."""
+        pending, self._pending = self._pending, {}
+        replace_keys, self._replace_keys = self._replace_keys, {}
+        jobs = {}
+        results: Dict[str, Optional[Exception]] = {}
+        for table, items in pending.items():
+            try:
+                jobs[table] = self.warehouse.submit_load([uri for uri, _ in items], table,
+                                                         replace_key=replace_keys.get(table))
+            except Exception as e:
+                results[table] = e
+        for table, job in jobs.items():
+            try:
+                job.result()
+                results[table] = None
+            except Exception as e:
+                results[table] = e
+                continue
+            for _, on_done in pending[table]:
+                if on_done is not None:
+                    on_done()
+        return results
@@ -0,0 +1,58 @@
+# test_ingest_dimensions.py
+# refresh_bulk_dimension contra LocalWarehouse: refrescar dos veces no duplica filas de la dimensión
+import os, sqlite3, sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import ingest_nba
+from nba_checkpoint import CheckpointJournal
+from nba_schema import SchemaRegistry
+from nba_storage import LocalWarehouse, LoadScheduler
+
+@pytest.fixture
+def warehouse(tmp_path, monkeypatch):
+    wh = LocalWarehouse(str(tmp_path / "wh"))
+    wh.ensure_dataset()
+    monkeypatch.setattr(ingest_nba, "_warehouse", wh)
+    monkeypatch.setattr(ingest_nba, "schema_registry", SchemaRegistry(ingest_nba.get_bq_schema))
+    monkeypatch.setattr(ingest_nba.tempfile, "tempdir", str(tmp_path))
+    # todo jugador activo se vuelve a pedir en cada corrida
+    monkeypatch.setattr(ingest_nba, "DIM_ACTIVE_REFRESH_S", 0)
+    return wh
+
+def _refresh(table, fetch_one, candidates, journal, wh):
+    scheduler = LoadScheduler(wh)
+    ingest_nba.refresh_bulk_dimension(table, fetch_one, candidates, journal, scheduler, deadline=float("inf"))
+    assert all(err is None for err in scheduler.flush().values())
+
+def _rows(wh, sql):
+    with sqlite3.connect(wh.db_path) as conn:
+        return conn.execute(sql).fetchall()
+
+def test_dos_refresh_dejan_una_fila_por_jugador(warehouse, tmp_path):
+    journal = CheckpointJournal(str(tmp_path / "state"))
+    candidates = {"1": ("1|2025|10", True), "2": ("1|2025|20", True)}
+    for version in (1, 2):
+        fetch_one = lambda pid, v=version: pd.DataFrame({"person_id": [pid], "season_exp": [float(v)]})
+        _refresh("common_player_info", fetch_one, candidates, journal, warehouse)
+
+    rows = _rows(warehouse, "SELECT person_id, COUNT(*), MAX(season_exp) FROM common_player_info GROUP BY person_id")
+    # una fila por jugador, con los datos del último refresh
+    assert sorted(rows) == [(1, 1, 2.0), (2, 1, 2.0)]
+
+def test_refresh_reemplaza_todas_las_filas_del_jugador(warehouse, tmp_path):
+    journal = CheckpointJournal(str(tmp_path / "state"))
+    _refresh("player_career_stats",
+             lambda pid: pd.DataFrame({"player_id": [pid, pid], "season_id": ["2023-24", "2024-25"], "pts": [1, 2]}),
+             {"1": ("a", True), "2": ("a", True)}, journal, warehouse)
+    # el segundo refresh solo trae al jugador 1, con una temporada más
+    _refresh("player_career_stats",
+             lambda pid: pd.DataFrame({"player_id": [pid] * 3, "season_id": ["2023-24", "2024-25", "2025-26"],
+                                       "pts": [1, 2, 3]}),
+             {"1": ("b", True)}, journal, warehouse)
+
+    rows = _rows(warehouse, "SELECT player_id, COUNT(*) FROM player_career_stats GROUP BY player_id")
+    assert sorted(rows) == [(1, 3), (2, 2)]
@@ -0,0 +1,63 @@
+# test_ingest_pool.py
+# Rate limit (TokenBucket), pausa compartida (GlobalBackoff) y run_pool, sin red
+import os, sys, threading, time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ingest_nba import GlobalBackoff, TokenBucket, run_pool
+
+def test_token_bucket_respeta_la_tasa():
+    bucket = TokenBucket(rate=50, burst=1)
+    bucket.acquire()  # el token inicial del burst
+    t0 = time.monotonic()
+    for _ in range(25):
+        bucket.acquire()
+    elapsed = time.monotonic() - t0
+    # 25 tokens a 50/s = 0.5s
+    assert 0.5 * 0.9 <= elapsed <= 0.5 * 1.5
+
+def test_token_bucket_burst_inicial_sin_espera():
+    bucket = TokenBucket(rate=1, burst=5)
+    t0 = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - t0 < 0.1
+
+def test_pausa_global_frena_a_todos_los_workers():
+    backoff = GlobalBackoff()
+    backoff.wait()  # sin trip no espera
+    backoff.trip(0.3)
+    backoff.trip(0.1)  # una pausa más corta no acorta la vigente
+    waited = []
+
+    def worker():
+        t0 = time.monotonic()
+        backoff.wait()
+        waited.append(time.monotonic() - t0)
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(waited) == 3
+    assert all(0.25 <= w <= 0.6 for w in waited)
+
+def test_run_pool_aisla_fallos_y_empareja_resultados(capsys):
+    errors = []
+
+    def fn(x):
+        if x == 3:
+            raise ValueError("boom")
+        time.sleep(0.2 if x == 0 else 0)
+        return x * 10
+
+    out = list(run_pool(range(6), fn, label="test", workers=3, on_error=lambda it, e: errors.append((it, str(e)))))
+    # cada item una vez, con su propio resultado; el que falla da None sin frenar al resto
+    assert sorted(out, key=lambda p: p[0]) == [(0, 0), (1, 10), (2, 20), (3, None), (4, 40), (5, 50)]
+    assert errors == [(3, "boom")]
+    # se devuelven a medida que terminan: el lento llega último
+    assert out[-1] == (0, 0)
+
+def test_run_pool_sin_items():
+    assert list(run_pool([], lambda x: x, label="vacío")) == []
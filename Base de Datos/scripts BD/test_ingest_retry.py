@@ -0,0 +1,81 @@
+# test_ingest_retry.py
+# Presupuesto de reintentos por clase de error en fetch_dfs (sin red: el endpoint es falso)
+import os, sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import ingest_nba
+from nba_retry import TIMEOUT, FetchFailed, CircuitBreaker
+
+class _Tripped:
+    """GlobalBackoff de prueba: registra las pausas globales en lugar de dormir."""
+
+    def __init__(self):
+        self.trips = []
+
+    def trip(self, seconds: float):
+        self.trips.append(seconds)
+
+    def wait(self):
+        pass
+
+class _Unlimited:
+    def acquire(self):
+        pass
+
+@pytest.fixture
+def pausa_global(monkeypatch):
+    monkeypatch.setattr(ingest_nba.time, "sleep", lambda s: None)
+    monkeypatch.setattr(ingest_nba, "response_cache", None)
+    monkeypatch.setattr(ingest_nba, "breaker", CircuitBreaker(threshold=100, cooldown=0))
+    return _Tripped()
+
+def _timeout_endpoint(calls):
+    def endpoint(timeout=None, **kwargs):
+        calls.append(timeout)
+        raise TimeoutError("read timed out")
+    return endpoint
+
+def test_timeout_se_reintenta_hasta_su_presupuesto(pausa_global):
+    calls = []
+    with pytest.raises(FetchFailed) as exc:
+        ingest_nba.fetch_dfs(_timeout_endpoint(calls), label="box 1", retries=20,
+                             limiter=_Unlimited(), backoff=pausa_global, raise_on_fail=True)
+    # el primer intento más RETRY_BUDGET["timeout"] reintentos
+    assert ingest_nba.RETRY_BUDGET[TIMEOUT] > 0
+    assert len(calls) == ingest_nba.RETRY_BUDGET[TIMEOUT] + 1
+    # el timeout HTTP que recibe el endpoint es el de la config, no la clase de error
+    assert calls == [ingest_nba.HTTP_TIMEOUT] * len(calls)
+    # el dead-letter recibe la clase correcta
+    assert exc.value.kind == TIMEOUT
+    # un timeout espera su propio backoff: no frena a los demás workers
+    assert pausa_global.trips == []
+
+def test_timeout_respeta_el_tope_total_de_reintentos(pausa_global):
+    calls = []
+    assert ingest_nba.fetch_dfs(_timeout_endpoint(calls), label="box 2", retries=1,
+                                limiter=_Unlimited(), backoff=pausa_global) == []
+    assert len(calls) == 2
+
+class _HttpError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.response = type("Response", (), {"status_code": status_code})()
+
+def test_throttle_dispara_la_pausa_global_una_vez(pausa_global):
+    calls = []
+    frame = pd.DataFrame({"game_id": ["0022400001"]})
+
+    def endpoint(timeout=None, **kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            raise _HttpError(429)
+        return type("Response", (), {"get_data_frames": lambda self: [frame]})()
+
+    dfs = ingest_nba.fetch_dfs(endpoint, label="box 3", limiter=_Unlimited(), backoff=pausa_global, game_id="1")
+    assert len(calls) == 2
+    assert len(dfs) == 1 and dfs[0].equals(frame)
+    assert pausa_global.trips == [ingest_nba.THROTTLE_PAUSE]
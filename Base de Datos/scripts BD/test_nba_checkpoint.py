@@ -0,0 +1,40 @@
+# test_nba_checkpoint.py
+# CheckpointJournal: dead-letter y lectura de staging pendiente
+import os, sys
+
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from nba_checkpoint import CheckpointJournal
+from nba_retry import CIRCUIT_OPEN, TIMEOUT
+
+def test_circuito_abierto_no_cuenta_como_intento(tmp_path):
+    journal = CheckpointJournal(str(tmp_path))
+    journal.park_game("2024-25", "0022400001", TIMEOUT, "read timed out")
+    for _ in range(5):
+        journal.park_game("2024-25", "0022400001", CIRCUIT_OPEN, "box: circuit_open")
+    # un solo request real: sigue elegible con max_attempts=2
+    assert journal.dead_letters("2024-25", retryable_only=True, max_attempts=2) == ["0022400001"]
+    journal.park_game("2024-25", "0022400001", TIMEOUT, "read timed out")
+    assert journal.dead_letters("2024-25", retryable_only=True, max_attempts=2) == []
+
+def test_iter_pending_promueve_tipos_y_usa_string_en_conflicto(tmp_path):
+    journal = CheckpointJournal(str(tmp_path))
+    # partido 1: `fg_pct` toda nula y `jersey` entero; partido 2: `fg_pct` float y `jersey` texto
+    journal.stage_game("2024-25", "1", {"box": pd.DataFrame({"game_id": ["1"], "fg_pct": [None], "jersey": [23]})})
+    journal.stage_game("2024-25", "2", {"box": pd.DataFrame({"game_id": ["2"], "fg_pct": [0.5], "jersey": ["0"]})})
+    journal.stage_game("2024-25", "3", {"box": pd.DataFrame({"game_id": ["3"], "fg_pct": [0.4], "jersey": [7]})})
+
+    batches = list(journal.iter_pending("2024-25", "box", batch_games=2))
+    assert [gids for _, gids in batches] == [["1", "2"], ["3"]]
+    first, _ = batches[0]
+    # null + double se promueve; int64 vs string no se puede unificar y va como string
+    assert first.schema.field("fg_pct").type == pa.float64()
+    assert first.schema.field("jersey").type == pa.string()
+    assert first.column("jersey").to_pylist() == ["23", "0"]
+    assert first.column("fg_pct").to_pylist() == [None, 0.5]
+    # el schema es el de todos los pendientes: el segundo lote sale igual aunque solo traiga enteros
+    assert batches[1][0].schema == first.schema
+    assert batches[1][0].column("jersey").to_pylist() == ["7"]
@@ -0,0 +1,31 @@
+# test_nba_nombres.py
+# EmparejadorNombres: el apodo se expande solo si el nombre tal como viene no tiene match exacto
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from nba_nombres import EmparejadorNombres
+
+JUGADORES = {
+    1: "Al Horford", 2: "Alan Horford", 3: "Stephen Curry", 4: "Steven Curry",
+    5: "Max Strus", 6: "Maximilian Strus", 7: "Michael Conley",
+}
+
+def _emparejador():
+    return EmparejadorNombres(list(JUGADORES), list(JUGADORES.values()))
+
+def _id(emp, texto):
+    pos, _, metodo = emp.emparejar_uno(texto)
+    return None if pos is None else int(emp.ids[pos]), metodo
+
+def test_nombre_propio_no_se_confunde_con_otro():
+    emp = _emparejador()
+    assert _id(emp, "Al Horford") == (1, "exacto")
+    assert _id(emp, "Alan Horford") == (2, "exacto")
+    assert _id(emp, "Stephen Curry") == (3, "exacto")
+    assert _id(emp, "Max Strus") == (5, "exacto")
+
+def test_apodo_se_expande_sin_match_directo():
+    emp = _emparejador()
+    # no hay "Mike Conley": el apodo lleva al nombre completo
+    assert _id(emp, "Mike Conley") == (7, "exacto")
@@ -0,0 +1,39 @@
+# test_nba_parquet.py
+# StreamingParquetWriter y conform_to_schema: un row group por lote con schema fijo aunque los lotes cambien
+import os, sys
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from nba_parquet import StreamingParquetWriter, conform_to_schema
+
+def test_conform_to_schema_ordena_castea_y_completa():
+    schema = pa.schema([("game_id", pa.string()), ("pts", pa.float64()), ("team_id", pa.int64())])
+    table = pa.table({"pts": pa.array([10, 20], pa.int64()), "game_id": ["1", "2"], "extra": [1, 2]})
+    out = conform_to_schema(table, schema)
+    assert out.schema == schema
+    assert out.column("pts").to_pylist() == [10.0, 20.0]
+    assert out.column("team_id").to_pylist() == [None, None]
+
+def test_streaming_un_row_group_por_lote_con_schema_que_deriva(tmp_path):
+    path = str(tmp_path / "box.parquet")
+    with StreamingParquetWriter(path) as writer:
+        # primer lote: `comment` toda nula -> el schema la fija como string
+        writer.write(pa.table({"game_id": ["1", "2"], "pts": pa.array([10, 12], pa.int64()),
+                               "comment": pa.nulls(2)}))
+        # segundo: `comment` con valores, una columna nueva y `pts` como int32
+        writer.write(pa.table({"game_id": ["3"], "pts": pa.array([7], pa.int32()),
+                               "comment": ["DNP"], "nueva": [1.5]}))
+        # tercero: falta `pts`
+        writer.write(pa.table({"game_id": ["4"], "comment": pa.nulls(1)}))
+        writer.write(pa.table({"game_id": pa.array([], pa.string())}))  # vacío: no genera row group
+
+    assert writer.rows == 4 and writer.row_groups == 3
+    f = pq.ParquetFile(path)
+    assert f.metadata.num_row_groups == 3
+    assert f.schema_arrow == pa.schema([("game_id", pa.string()), ("pts", pa.int64()), ("comment", pa.string())])
+    out = f.read()
+    assert out.column("pts").to_pylist() == [10, 12, 7, None]
+    assert out.column("comment").to_pylist() == [None, None, "DNP", None]
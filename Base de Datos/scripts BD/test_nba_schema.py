@@ -0,0 +1,62 @@
+# test_nba_schema.py
+# CastPlan: una columna que no se puede castear se conserva (con aviso y métrica), no se pierde,
+# y mantiene el mismo tipo en todos los lotes que van al mismo Parquet
+import os, sys
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from nba_metrics import RunMetrics
+from nba_parquet import StreamingParquetWriter
+from nba_schema import CastPlan, to_numeric
+
+def test_cast_fallido_conserva_la_columna(capsys):
+    metrics = RunMetrics()
+    plan = CastPlan({"game_id": "INT64", "tags": "INT64"}, table="game", metrics=metrics)
+    table = pa.table({"game_id": pa.array(["1", "2"]), "tags": pa.array([[1], [2, 3]])})
+    out = plan.apply(table)
+    assert out.column_names == ["game_id", "tags"]
+    assert out.schema.field("game_id").type == pa.int64()
+    # sin casteo posible: mismos datos y tipo de origen
+    assert out.column("tags").to_pylist() == [[1], [2, 3]]
+    assert out.schema.field("tags").type == table.schema.field("tags").type
+    assert plan.cast_failures == {"tags": 1}
+    assert metrics.report()["counters"]
+    assert "WARN cast game.tags" in capsys.readouterr().out
+
+def test_columna_que_falla_en_un_lote_mantiene_el_tipo_en_los_siguientes(tmp_path, capsys):
+    plan = CastPlan({"game_id": "INT64", "tags": "INT64"}, table="game")
+    batches = [
+        pa.table({"game_id": ["1"], "tags": pa.array([[1]])}),           # no castea: queda list
+        pa.table({"game_id": ["2"], "tags": pa.nulls(1)}),                # castearía a int64
+        pa.table({"game_id": ["3"], "tags": pa.array([[2, 3]])}),
+    ]
+    path = str(tmp_path / "game.parquet")
+    with StreamingParquetWriter(path) as writer:
+        for batch in batches:
+            out = plan.apply(batch)
+            assert out.schema.field("tags").type == pa.list_(pa.int64())
+            writer.write(out)
+    out = pq.read_table(path)
+    assert out.column("tags").to_pylist() == [[1], None, [2, 3]]
+    assert out.column("game_id").to_pylist() == [1, 2, 3]
+    # falla una vez; los lotes siguientes ya no intentan el casteo (ni repiten el aviso)
+    assert plan.cast_failures == {"tags": 1}
+    assert capsys.readouterr().out.count("WARN cast") == 1
+
+def test_lote_nulo_antes_del_fallo_entra_al_mismo_parquet(tmp_path):
+    # el primer lote castea (todo nulo) y fija int64; los valores fuera de rango del segundo
+    # quedan nulos en lugar de hacer fallar el casteo solo en ese lote
+    plan = CastPlan({"pts": "INT64"}, table="box")
+    path = str(tmp_path / "box.parquet")
+    with StreamingParquetWriter(path) as writer:
+        writer.write(plan.apply(pa.table({"pts": pa.nulls(2)})))
+        writer.write(plan.apply(pa.table({"pts": pa.array([3.0, float("inf"), 1e20])})))
+    assert pq.read_table(path).column("pts").to_pylist() == [None, None, 3, None, None]
+    assert plan.cast_failures == {}
+
+def test_to_numeric_anula_decimales_e_infinitos():
+    arr = pa.chunked_array([pa.array([1.0, 1.5, float("inf"), None, -2.0])])
+    assert to_numeric(arr, pa.int64()).to_pylist() == [1, None, None, None, -2]
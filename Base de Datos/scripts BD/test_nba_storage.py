@@ -0,0 +1,61 @@
+# test_nba_storage.py
+# LoadScheduler con un warehouse falso: un job por tabla y on_done solo si su tabla cargó bien
+import os, sys
+from concurrent.futures import Future
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from nba_storage import LoadScheduler, Warehouse
+
+class _FakeWarehouse(Warehouse):
+    """Registra los submit_load; las tablas de `failing` fallan al esperar el job."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.jobs = []
+
+    def submit_load(self, uris, table, replace_key=None):
+        self.jobs.append((table, list(uris), replace_key))
+        job = Future()
+        if table in self.failing:
+            job.set_exception(RuntimeError(f"load {table} falló"))
+        else:
+            job.set_result(None)
+        return job
+
+def test_un_job_por_tabla_con_todos_sus_archivos():
+    wh = _FakeWarehouse()
+    scheduler = LoadScheduler(wh)
+    scheduler.add("box_score", "gs://b/2023.parquet")
+    scheduler.add("box_score", "gs://b/2024.parquet")
+    scheduler.add("player", "gs://b/player.parquet")
+    scheduler.add("player", None)  # sin archivo no hay nada que cargar
+    assert len(scheduler) == 3
+
+    assert scheduler.flush() == {"box_score": None, "player": None}
+    assert sorted(wh.jobs) == [("box_score", ["gs://b/2023.parquet", "gs://b/2024.parquet"], None),
+                               ("player", ["gs://b/player.parquet"], None)]
+    assert len(scheduler) == 0
+
+def test_una_tabla_que_falla_no_frena_a_las_demas():
+    wh = _FakeWarehouse(failing={"box_score"})
+    scheduler = LoadScheduler(wh)
+    done = []
+    scheduler.add("box_score", "gs://b/2023.parquet", lambda: done.append("box_score 2023"))
+    scheduler.add("box_score", "gs://b/2024.parquet", lambda: done.append("box_score 2024"))
+    scheduler.add("player", "gs://b/player.parquet", lambda: done.append("player"))
+
+    results = scheduler.flush()
+    assert results["player"] is None
+    assert isinstance(results["box_score"], RuntimeError)
+    # el checkpoint de la tabla fallida no se marca: se vuelve a cargar en la próxima corrida
+    assert done == ["player"]
+
+def test_replace_key_llega_al_job_de_su_tabla():
+    wh = _FakeWarehouse()
+    scheduler = LoadScheduler(wh)
+    scheduler.add("common_player_info", "gs://b/cpi.parquet", replace_key="person_id")
+    scheduler.add("box_score", "gs://b/2024.parquet")
+    scheduler.flush()
+    assert sorted(wh.jobs) == [("box_score", ["gs://b/2024.parquet"], None),
+                               ("common_player_info", ["gs://b/cpi.parquet"], "person_id")]
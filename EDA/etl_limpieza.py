@@ -0,0 +1,230 @@
+# ETL LIMPIEZA Y TRANSFORMACIÓN CSV guiada por configuración
+# Cada tabla se describe en TABLAS (columnas a eliminar, tipos y política de nulos) y se limpia
+# leyendo el CSV por bloques con usecols y dtypes explícitos: las columnas eliminadas nunca se
+# parsean y la memoria queda acotada al tamaño del bloque. La salida es CSV y Parquet tipado.
+#
+#   python etl_limpieza.py game common_player_info --entrada Dataset_NBA/ --salida processed_data/
+#   python etl_limpieza.py --todas                    # todas las tablas de TABLAS
+#   (etl_paralelo.py limpia todas en paralelo y omite las que no cambiaron)
+#
+# Las carpetas por defecto salen de NBA_DATASET_DIR / NBA_PROCESSED_DIR (o la carpeta actual).
+
+import os
+import time
+
+import pandas as pd
+
+ENTRADA_DIR = os.environ.get("NBA_DATASET_DIR", ".")
+SALIDA_DIR = os.environ.get("NBA_PROCESSED_DIR", ".")
+FILAS_POR_BLOQUE = 250_000
+FILAS_MUESTRA = 20_000
+
+# --- Configuración por tabla ---
+# entrada / salida : nombre del CSV original y nombre base del archivo limpio (.csv y .parquet)
+# eliminar         : columnas que no se leen
+# tipos            : 'int', 'float', 'str', 'bool', 'category' o 'datetime64[ns]'; las demás
+#                    columnas toman el tipo que se infiere de las primeras FILAS_MUESTRA filas
+# nulos            : 'todas' -> se descarta la fila con cualquier nulo (como el dropna() de antes)
+#                    lista   -> solo se exige valor en esas columnas
+#                    'ninguna' -> no se descartan filas
+TABLAS = {
+    'game': {
+        'entrada': 'game.csv',
+        'salida': 'clean_game',
+        'eliminar': [],
+        # wl_home / wl_away se dejan como 'W'/'L': astype('bool') de un texto no vacío es siempre
+        # True y TrueShot lee clean_game.csv esperando las letras
+        'tipos': {'game_date': 'datetime64[ns]', 'diff_pts': 'int'},
+        'nulos': 'todas',
+    },
+    'common_player_info': {
+        'entrada': 'common_player_info.csv',
+        'salida': 'clean_common_player_info',
+        'eliminar': ['first_name', 'last_name', 'display_last_comma_first', 'display_fi_last', 'player_slug',
+                     'birthdate', 'school', 'country', 'season_exp', 'jersey', 'rosterstatus',
+                     'games_played_current_season_flag', 'team_id', 'team_name', 'team_abbreviation', 'team_city',
+                     'playercode', 'from_year', 'to_year', 'dleague_flag', 'nba_flag', 'games_played_flag',
+                     'draft_round', 'draft_number', 'greatest_75_flag'],
+        'tipos': {'person_id': 'str'},
+        'nulos': 'todas',
+    },
+    'officials': {
+        'entrada': 'officials.csv',
+        'salida': 'officials_clean',
+        'eliminar': [],
+        'tipos': {'game_id': 'int', 'official_id': 'int', 'jersey_num': 'str'},
+        'nulos': ['game_id', 'official_id'],
+    },
+    'play_by_play': {
+        'entrada': 'play_by_play.csv',
+        'salida': 'clean_play_by_play',
+        # ciudad/apodo/sigla del equipo se recuperan de team.csv con el team_id
+        'eliminar': [f'player{i}_team_{c}' for i in (1, 2, 3) for c in ('city', 'nickname', 'abbreviation')]
+                    + ['video_available_flag'],
+        'tipos': {'game_id': 'int', 'eventnum': 'int', 'eventmsgtype': 'int', 'eventmsgactiontype': 'int',
+                  'period': 'int', 'wctimestring': 'str', 'pctimestring': 'str', 'score': 'str',
+                  'scoremargin': 'str', 'homedescription': 'str', 'neutraldescription': 'str',
+                  'visitordescription': 'str'},
+        # las descripciones y los jugadores 2/3 son nulos en la mayoría de los eventos
+        'nulos': ['game_id', 'eventnum', 'period'],
+    },
+}
+
+# tipo de la configuración -> (dtype de lectura, dtype final si la columna no puede tener nulos)
+_TIPOS = {
+    'int': ('Int64', 'int64'),
+    'float': ('float64', 'float64'),
+    'str': ('string', 'string'),
+    'object': ('string', 'string'),
+    'bool': ('boolean', 'bool'),
+    'category': ('category', 'category'),
+}
+
+
+def _tipos_lectura(ruta, columnas, tipos):
+    """Tipo de cada columna: el de la configuración o el inferido de una muestra.
+
+    Los enteros se leen como Int64 (nullable) para que un nulo en un bloque posterior no los
+    vuelva float, y el texto como 'string'; así todos los bloques comparten el mismo schema.
+    """
+    faltan = [c for c in columnas if c not in tipos]
+    inferidos = {}
+    if faltan:
+        muestra = pd.read_csv(ruta, usecols=faltan, nrows=FILAS_MUESTRA)
+        for c in faltan:
+            dt = muestra[c].dtype
+            if pd.api.types.is_bool_dtype(dt):
+                inferidos[c] = 'bool'
+            elif pd.api.types.is_integer_dtype(dt):
+                inferidos[c] = 'int'
+            elif pd.api.types.is_float_dtype(dt):
+                inferidos[c] = 'float'
+            else:
+                inferidos[c] = 'str'
+    return {c: tipos.get(c, inferidos.get(c)) for c in columnas}
+
+
+def _bloque_a_arrow(df, schema):
+    import pyarrow as pa
+
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    if schema is not None and tabla.schema != schema:
+        tabla = tabla.cast(schema)
+    return tabla
+
+
+def limpiar_tabla(nombre, entrada_dir=ENTRADA_DIR, salida_dir=SALIDA_DIR, filas_por_bloque=FILAS_POR_BLOQUE,
+                  spec=None, parquet=True):
+    """Limpia una tabla de TABLAS (o `spec`) por bloques y escribe <salida>.csv y <salida>.parquet.
+
+    Devuelve un resumen con filas de entrada/salida, filas descartadas por nulos, nulos por
+    columna (antes de descartar) y segundos.
+    """
+    import pyarrow.parquet as pq
+
+    t0 = time.perf_counter()
+    spec = TABLAS[nombre] if spec is None else spec
+    ruta = os.path.join(entrada_dir, spec['entrada'])
+
+    # --- 1️ Columnas: solo las que quedan se leen ---
+    encabezado = pd.read_csv(ruta, nrows=0).columns
+    eliminar = set(spec.get('eliminar', ()))
+    columnas = [c for c in encabezado if c not in eliminar]
+    ausentes = [c for c in spec.get('tipos', {}) if c not in columnas]   # como el "if col in df.columns" de antes
+
+    # --- 2️ Tipos explícitos para todos los bloques ---
+    tipos = _tipos_lectura(ruta, columnas, {c: t for c, t in spec.get('tipos', {}).items() if c in columnas})
+    fechas = [c for c, t in tipos.items() if t.startswith('datetime')]
+    dtype = {c: _TIPOS[t][0] for c, t in tipos.items() if c not in fechas}
+
+    # --- 3️ Política de nulos ---
+    nulos = spec.get('nulos', 'todas')
+    requeridas = columnas if nulos == 'todas' else [] if nulos == 'ninguna' else [c for c in nulos if c in columnas]
+    final = {c: _TIPOS[t][1] for c, t in tipos.items() if c in requeridas and c not in fechas}
+
+    os.makedirs(salida_dir, exist_ok=True)
+    csv_path = os.path.join(salida_dir, spec['salida'] + '.csv')
+    parquet_path = os.path.join(salida_dir, spec['salida'] + '.parquet')
+    escritor = None
+    schema = None
+    filas_entrada = filas_salida = 0
+    nulos_por_columna = pd.Series(0, index=columnas, dtype='int64')
+
+    # --- 4️ Lectura, limpieza y escritura por bloques ---
+    try:
+        bloques = pd.read_csv(ruta, usecols=columnas, dtype=dtype, parse_dates=fechas, chunksize=filas_por_bloque)
+        for i, df in enumerate(bloques):
+            filas_entrada += len(df)
+            faltantes = df.isna()
+            nulos_por_columna += faltantes.sum()
+            if requeridas:
+                df = df[~faltantes[requeridas].to_numpy().any(axis=1)]
+            if final:
+                df = df.astype(final)
+            filas_salida += len(df)
+
+            df.to_csv(csv_path + '.tmp', mode='w' if i == 0 else 'a', header=i == 0, index=False)
+            if parquet:
+                tabla = _bloque_a_arrow(df, schema)
+                if escritor is None:
+                    schema = tabla.schema
+                    escritor = pq.ParquetWriter(parquet_path + '.tmp', schema)
+                escritor.write_table(tabla)
+    except (ValueError, TypeError) as e:
+        if escritor is not None:
+            escritor.close()
+            escritor = None
+        for tmp in (csv_path + '.tmp', parquet_path + '.tmp'):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        raise ValueError(f"{nombre}: un bloque no respeta los tipos {tipos} ({e}); "
+                         f"fijá el tipo de la columna en TABLAS['{nombre}']['tipos']") from e
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+    os.replace(csv_path + '.tmp', csv_path)
+    if escritor is not None:
+        os.replace(parquet_path + '.tmp', parquet_path)
+    return {
+        'tabla': nombre,
+        'filas_entrada': filas_entrada,
+        'filas_salida': filas_salida,
+        'filas_con_nulos': filas_entrada - filas_salida,
+        'nulos_por_columna': {c: int(n) for c, n in nulos_por_columna.items() if n},
+        'columnas': len(columnas),
+        'columnas_eliminadas': len(encabezado) - len(columnas),
+        'tipos_ausentes': ausentes,
+        'segundos': round(time.perf_counter() - t0, 3),
+        'salida': csv_path,
+    }
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Limpieza de tablas NBA guiada por TABLAS")
+    parser.add_argument("tablas", nargs="*", help=f"tablas a limpiar ({', '.join(TABLAS)})")
+    parser.add_argument("--todas", action="store_true", help="limpia todas las tablas configuradas")
+    parser.add_argument("--entrada", default=ENTRADA_DIR, help="carpeta con los CSV originales")
+    parser.add_argument("--salida", default=SALIDA_DIR, help="carpeta de los archivos limpios")
+    parser.add_argument("--bloque", type=int, default=FILAS_POR_BLOQUE, help="filas por bloque")
+    parser.add_argument("--sin-parquet", action="store_true", help="solo escribe el CSV")
+    args = parser.parse_args(argv)
+
+    nombres = list(TABLAS) if args.todas else args.tablas
+    if not nombres:
+        parser.error("indicá al menos una tabla o --todas")
+    for nombre in nombres:
+        r = limpiar_tabla(nombre, args.entrada, args.salida, args.bloque, parquet=not args.sin_parquet)
+        print(f"{nombre}: {r['filas_entrada']:,} filas -> {r['filas_salida']:,} "
+              f"({r['filas_con_nulos']:,} con nulos eliminadas, {r['columnas_eliminadas']} columnas eliminadas) "
+              f"en {r['segundos']:.2f}s -> {r['salida']}")
+        if r['nulos_por_columna']:
+            print(f"  nulos por columna: {r['nulos_por_columna']}")
+        if r['tipos_ausentes']:
+            print(f"  columnas de 'tipos' que no están en el archivo: {r['tipos_ausentes']}")
+
+
+if __name__ == "__main__":
+    main()
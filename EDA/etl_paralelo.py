@@ -0,0 +1,150 @@
+# ETL LIMPIEZA de todas las tablas en paralelo (un proceso por tabla)
+# Corre etl_limpieza.limpiar_tabla para cada tabla de TABLAS en un pool de procesos, empezando
+# por los archivos más grandes para que el tiempo total se acerque al de la tabla más pesada.
+# Se omiten las tablas cuyo CSV de entrada (hash del contenido), configuración y código de
+# limpieza no cambiaron desde la última corrida y cuyos archivos limpios siguen en la salida.
+#
+#   python etl_paralelo.py --entrada Dataset_NBA/ --salida processed_data/ [--procesos 8] [--forzar] [tablas...]
+#
+# Las huellas de la última corrida quedan en <salida>/.etl_huellas.json.
+
+import os
+import json
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import etl_limpieza
+from etl_limpieza import TABLAS, ENTRADA_DIR, SALIDA_DIR, FILAS_POR_BLOQUE, limpiar_tabla
+
+ARCHIVO_HUELLAS = ".etl_huellas.json"
+BYTES_POR_LECTURA = 4 * 1024 * 1024
+
+
+def hash_archivo(path, previo=None):
+    """sha1 del contenido; si tamaño y mtime coinciden con `previo` se reutiliza su hash."""
+    st = os.stat(path)
+    if previo and previo.get('bytes') == st.st_size and previo.get('mtime_ns') == st.st_mtime_ns:
+        return previo['sha1'], st
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for bloque in iter(lambda: f.read(BYTES_POR_LECTURA), b''):
+            h.update(bloque)
+    return h.hexdigest(), st
+
+
+def _version_codigo():
+    """Hash del código de limpieza: si cambia etl_limpieza.py, ninguna salida previa vale."""
+    with open(etl_limpieza.__file__, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+VERSION_CODIGO = _version_codigo()
+
+
+def _clave(spec, sha1, parquet):
+    contenido = {'spec': spec, 'sha1': sha1, 'parquet': parquet, 'codigo': VERSION_CODIGO}
+    return hashlib.sha1(json.dumps(contenido, sort_keys=True).encode()).hexdigest()
+
+
+def _salidas(spec, salida_dir, parquet):
+    base = os.path.join(salida_dir, spec['salida'])
+    return [base + '.csv'] + ([base + '.parquet'] if parquet else [])
+
+
+def _procesar(nombre, spec, entrada_dir, salida_dir, filas_por_bloque, parquet, previo, forzar):
+    """Trabajo de un proceso: hashea la entrada y limpia la tabla si cambió algo."""
+    t0 = time.perf_counter()
+    sha1, st = hash_archivo(os.path.join(entrada_dir, spec['entrada']), previo)
+    huella = {'sha1': sha1, 'bytes': st.st_size, 'mtime_ns': st.st_mtime_ns, 'clave': _clave(spec, sha1, parquet)}
+    if (not forzar and previo and previo.get('clave') == huella['clave']
+            and all(os.path.exists(p) for p in _salidas(spec, salida_dir, parquet))):
+        resumen = dict(previo.get('resumen', {}), tabla=nombre, omitida=True,
+                       segundos=round(time.perf_counter() - t0, 3))
+        return resumen, dict(previo, bytes=st.st_size, mtime_ns=st.st_mtime_ns)
+    resumen = limpiar_tabla(nombre, entrada_dir, salida_dir, filas_por_bloque, spec=spec, parquet=parquet)
+    resumen['segundos'] = round(time.perf_counter() - t0, 3)
+    resumen['omitida'] = False
+    huella['resumen'] = {k: resumen[k] for k in ('filas_entrada', 'filas_salida', 'filas_con_nulos')}
+    return resumen, huella
+
+
+def _leer_huellas(salida_dir):
+    try:
+        with open(os.path.join(salida_dir, ARCHIVO_HUELLAS), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _guardar_huellas(salida_dir, huellas):
+    path = os.path.join(salida_dir, ARCHIVO_HUELLAS)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(huellas, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def limpiar_todas(nombres=None, entrada_dir=ENTRADA_DIR, salida_dir=SALIDA_DIR, procesos=None,
+                  filas_por_bloque=FILAS_POR_BLOQUE, parquet=True, forzar=False):
+    """Limpia `nombres` (por defecto todas las TABLAS) en paralelo.
+
+    Devuelve (resúmenes por tabla en el orden pedido, errores {tabla: mensaje}, segundos totales).
+    """
+    t0 = time.perf_counter()
+    nombres = list(TABLAS) if not nombres else list(nombres)
+    os.makedirs(salida_dir, exist_ok=True)
+    huellas = _leer_huellas(salida_dir)
+
+    # las más grandes primero: con N procesos el total queda cerca del de la tabla más pesada
+    def tamaño(nombre):
+        try:
+            return os.path.getsize(os.path.join(entrada_dir, TABLAS[nombre]['entrada']))
+        except OSError:
+            return 0
+    orden = sorted(nombres, key=tamaño, reverse=True)
+
+    resumenes, errores = {}, {}
+    procesos = min(procesos or os.cpu_count() or 1, len(orden)) or 1
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        futuros = {pool.submit(_procesar, n, TABLAS[n], entrada_dir, salida_dir, filas_por_bloque, parquet,
+                               huellas.get(n), forzar): n for n in orden}
+        for futuro in as_completed(futuros):
+            nombre = futuros[futuro]
+            try:
+                resumenes[nombre], huellas[nombre] = futuro.result()
+            except Exception as e:   # una tabla rota no frena al resto; su huella no se actualiza
+                errores[nombre] = f"{type(e).__name__}: {e}"
+                huellas.pop(nombre, None)
+            _guardar_huellas(salida_dir, huellas)
+    return [resumenes[n] for n in nombres if n in resumenes], errores, time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Limpieza en paralelo de las tablas NBA configuradas en TABLAS")
+    parser.add_argument("tablas", nargs="*", help=f"tablas a limpiar (por defecto todas: {', '.join(TABLAS)})")
+    parser.add_argument("--entrada", default=ENTRADA_DIR, help="carpeta con los CSV originales")
+    parser.add_argument("--salida", default=SALIDA_DIR, help="carpeta de los archivos limpios")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos del pool (por defecto, núcleos)")
+    parser.add_argument("--bloque", type=int, default=FILAS_POR_BLOQUE, help="filas por bloque")
+    parser.add_argument("--sin-parquet", action="store_true", help="solo escribe el CSV")
+    parser.add_argument("--forzar", action="store_true", help="limpia aunque la entrada no haya cambiado")
+    args = parser.parse_args()
+
+    desconocidas = [t for t in args.tablas if t not in TABLAS]
+    if desconocidas:
+        parser.error(f"tablas sin configuración: {desconocidas}")
+
+    resumenes, errores, total = limpiar_todas(args.tablas, args.entrada, args.salida, args.procesos,
+                                              args.bloque, not args.sin_parquet, args.forzar)
+    print(f"{'tabla':<22} {'estado':<8} {'filas entrada':>14} {'filas salida':>14} {'con nulos':>10} {'segundos':>9}")
+    for r in resumenes:
+        print(f"{r['tabla']:<22} {'omitida' if r['omitida'] else 'limpia':<8} {r.get('filas_entrada', 0):>14,} "
+              f"{r.get('filas_salida', 0):>14,} {r.get('filas_con_nulos', 0):>10,} {r['segundos']:>9.2f}")
+    for nombre, error in errores.items():
+        print(f"{nombre:<22} {'error':<8} {error}")
+    suma = sum(r['segundos'] for r in resumenes)
+    print(f"Total: {total:.2f}s (suma por tabla {suma:.2f}s) -> {args.salida}")
+    sys.exit(1 if errores else 0)
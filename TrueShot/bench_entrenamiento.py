@@ -0,0 +1,78 @@
+# =======================================================
+# 🏀 TrueShot - Benchmark: reajuste completo vs actualización incremental
+# Hace crecer una matriz sintética (filas remuestreadas de matriz_entrenamiento_final.csv,
+# etiquetas sorteadas con el modelo real) y en cada tamaño compara:
+#   - LogisticRegression().fit sobre toda la matriz (lo que hacía la app al arrancar)
+#   - el reajuste completo con Newton (trueshot_entrenamiento --completo)
+#   - la actualización incremental sobre las últimas --nuevas filas (trueshot_entrenamiento)
+# en tiempo, paridad con el reajuste completo y accuracy / log-loss sobre un holdout.
+# Localia es constante en la matriz, así que sklearn (tol por defecto) reparte distinto
+# intercept/Localia: la paridad de coeficientes se mide contra Newton y contra sklearn
+# se compara la probabilidad predicha.
+#
+#   python bench_entrenamiento.py [--tamanos 63000,250000,1000000,2000000] [--nuevas 1230]
+# =======================================================
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from trueshot_modelo import MATRIZ_PATH, FEATURES
+from trueshot_entrenamiento import ajustar_newton, prior_inicial, metricas, _sigmoide, _con_intercept
+
+
+def matriz_sintetica(n, base_X, w_real, rng):
+    X = base_X[rng.integers(0, len(base_X), n)]
+    y = (rng.random(n) < _sigmoide(_con_intercept(X) @ w_real)).astype(np.float64)
+    return X, y
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de entrenamiento TrueShot")
+    parser.add_argument("--tamanos", default="63000,250000,1000000,2000000")
+    parser.add_argument("--nuevas", type=int, default=1230, help="filas que trae cada actualización (≈ una temporada)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    df = pd.read_csv(MATRIZ_PATH)
+    base_X = df[FEATURES].fillna(0).to_numpy(dtype=np.float64)
+    w_real, _ = ajustar_newton(base_X, df['Resultado_Real'].to_numpy(dtype=np.float64),
+                               np.zeros(len(FEATURES) + 1), prior_inicial())
+    X_test, y_test = matriz_sintetica(200_000, base_X, w_real, rng)
+
+    print(f"{'filas':>10} {'sklearn':>10} {'newton':>10} {'incremental':>12} {'speedup':>8} "
+          f"{'max|Δcoef|':>11} {'max|Δprob|':>11} {'acc full':>9} {'acc inc':>8} {'ll full':>8} {'ll inc':>8}")
+    for n in (int(t) for t in args.tamanos.split(",")):
+        X, y = matriz_sintetica(n, base_X, w_real, rng)
+        historia, nuevas = slice(0, n - args.nuevas), slice(n - args.nuevas, n)
+
+        # estado previo (lo que ya estaría versionado en disco antes de la actualización)
+        w_prev, H_prev = ajustar_newton(X[historia], y[historia], np.zeros(len(FEATURES) + 1), prior_inicial())
+
+        t0 = time.perf_counter()
+        modelo = LogisticRegression().fit(pd.DataFrame(X, columns=FEATURES), y)
+        t_full = time.perf_counter() - t0
+        w_sk = np.append(modelo.coef_[0], modelo.intercept_[0])
+
+        t0 = time.perf_counter()
+        w_full, _ = ajustar_newton(X, y, np.zeros(len(FEATURES) + 1), prior_inicial())
+        t_newton = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        w_inc, _ = ajustar_newton(X[nuevas], y[nuevas], w_prev, H_prev)
+        t_inc = time.perf_counter() - t0
+
+        m_full, m_inc = metricas(X_test, y_test, w_sk), metricas(X_test, y_test, w_inc)
+        X1_test = _con_intercept(X_test)
+        d_prob = np.max(np.abs(_sigmoide(X1_test @ w_sk) - _sigmoide(X1_test @ w_inc)))
+        print(f"{n:>10,} {t_full * 1000:>8.1f}ms {t_newton * 1000:>8.1f}ms {t_inc * 1000:>10.2f}ms "
+              f"{t_full / t_inc:>7.0f}x {np.max(np.abs(w_full - w_inc)):>11.2e} {d_prob:>11.2e} {m_full['accuracy']:>9.4f} {m_inc['accuracy']:>8.4f} "
+              f"{m_full['log_loss']:>8.4f} {m_inc['log_loss']:>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
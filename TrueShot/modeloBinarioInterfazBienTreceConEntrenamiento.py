@@ -4,16 +4,16 @@
 # ESTILO: Interfaz modernizada con tema oscuro y colores de analitIQ
 # LÓGICA: Se mantiene la lógica de carga de datos desde Excel y el modelo de Regresión Logística del Décimo.
 # CORRECCIÓN: Se utiliza un DataFrame de Pandas para X_test para evitar el UserWarning de scikit-learn.
+# ARRANQUE: El modelo y las tablas se leen del artefacto precalculado (trueshot_modelo.py --rebuild).
 # =======================================================
 
 import tkinter as tk
 from tkinter import messagebox
 from PIL import Image, ImageTk
-import numpy as np
-import pandas as pd
-from sklearn.linear_model import LogisticRegression
 import os
 
+from trueshot_modelo import ModeloTrueShot, DATOS_NBA_PATH
+
 # ==============================================
 # 1️⃣ Configuración de Imagen y Globales
 # ==============================================
@@ -23,13 +23,6 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 LOGO_PATH_EMPRESA = os.path.join(BASE_DIR, "logo.png") # Logo de la empresa
 LOGO_PATH_NBA = os.path.join(BASE_DIR, "NBAlogo.png")  # Logo de la NBA
 
-# Rutas de los datos
-MATRIZ_PATH = os.path.join(BASE_DIR, "matriz_entrenamiento_final.csv")
-DATOS_NBA_PATH = os.path.join(BASE_DIR, "datos_nba_analizados_final_v4.xlsx")
-SHEET_EQUIPOS = "Equipos"
-SHEET_JUGADORES = "Jugadores"
-SHEET_ARBITROS = "Arbitros_y_Victorias"
-
 # Tamaños
 TAMANO_LOGO_ESQUINA = (90, 70) # Original company logo (analitIQ)
 TAMANO_LOGO_ESQUINA_NBA = (50, 100) # NBA logo - tall portrait format with correct proportions
@@ -58,60 +51,28 @@ COLOR_ALERTA = "#E74C3C"           # Red for negative (losses)
 # ==============================================
 # 2️⃣ Carga y Preparación del Modelo
 # ==============================================
-def cargar_datos_y_entrenar_modelo():
-    """Carga los datos de entrenamiento y entrena el modelo de Regresión Logística."""
+def cargar_modelo():
+    """Carga el modelo y las tablas de referencia precalculadas (se reconstruyen solo si faltan)."""
     try:
-        # Cargar matriz de entrenamiento
-        matriz_df = pd.read_csv(MATRIZ_PATH)
-        
-        # 1. Preparar datos de entrenamiento (X) y objetivo (y)
-        features = ['diff_strength', 'Localia', 'star_home_is_injured', 'star_away_is_injured', 'referee_effect']
-        X_train = matriz_df[features].fillna(0) # Rellenar NaNs con 0 (manejo simple)
-        y_train = matriz_df['Resultado_Real'] # 1 si gana el local, 0 si pierde
-        
-        # 2. Entrenar el modelo
-        modelo = LogisticRegression()
-        modelo.fit(X_train, y_train)
-        
-        return modelo
+        return ModeloTrueShot.cargar()
     except Exception as e:
-        messagebox.showerror("Error de Carga/Entrenamiento", f"No se pudo cargar o entrenar el modelo: {e}")
+        messagebox.showerror("Error de Carga de Datos", f"No se pudo cargar el modelo ni las tablas de '{DATOS_NBA_PATH}': {e}")
         return None
 
-# Cargar el modelo al inicio de la aplicación
-modelo_regresion = cargar_datos_y_entrenar_modelo()
+# Cargar el modelo y los datos de referencia al inicio de la aplicación (una sola vez)
+modelo_regresion = cargar_modelo()
 
-# Cargar datos de referencia de equipos, jugadores y árbitros
-try:
-    # Cargar datos desde el archivo Excel
-    df_equipos = pd.read_excel(DATOS_NBA_PATH, sheet_name=SHEET_EQUIPOS)
-    df_jugadores = pd.read_excel(DATOS_NBA_PATH, sheet_name=SHEET_JUGADORES)
-    df_arbitros = pd.read_excel(DATOS_NBA_PATH, sheet_name=SHEET_ARBITROS)
-    
-    # Preprocesamiento de datos de equipos para acceso rápido
-    df_equipos['PPA_Total'] = (df_equipos['promedio de puntos ANOTADOS de local'] + df_equipos['promedio de puntos ANOTADOS de visitante']) / 2
-    
-    # Crear un diccionario de equipos para fácil acceso
-    equipos_dict = df_equipos.set_index('nickname (Punto 2)')['PPA_Total'].to_dict()
-    equipos_id_dict = df_equipos.set_index('nickname (Punto 2)')['id team (Punto 2)'].to_dict()
-    
-    # Crear un diccionario de jugadores lesionados (solo MVP's para simplificar la simulación)
-    mvp_lesionados = df_jugadores[df_jugadores['Jugador más valioso (Punto 9)'] == 'Sí']
-    mvp_lesionados_dict = mvp_lesionados.set_index('Equipo más reciente')['Estado MVP (Punto 9)'].to_dict()
-    
-    # Lista de árbitros
-    arbitros_list = sorted(df_arbitros['nombre arbitro (Punto 3)'].unique().tolist())
-    arbitros_dict = df_arbitros.groupby(['nombre arbitro (Punto 3)', 'nombre equipo'])['número de victorias del equipo con este árbitro (Punto 6)'].sum().to_dict()
-
-    NOMBRES_EQUIPOS = sorted(equipos_dict.keys())
-    
-except Exception as e:
-    messagebox.showerror("Error de Carga de Datos", f"No se pudieron cargar los archivos de datos. Asegúrese de que '{DATOS_NBA_PATH}' existe y contiene las hojas correctas: {e}")
+if modelo_regresion is not None:
+    equipos_dict = modelo_regresion.equipos_dict
+    equipos_id_dict = modelo_regresion.equipos_id_dict
+    mvp_lesionados_dict = modelo_regresion.mvp_lesionados_dict
+    arbitros_list = modelo_regresion.arbitros_list
+    NOMBRES_EQUIPOS = modelo_regresion.nombres_equipos
+else:
     NOMBRES_EQUIPOS = []
     equipos_dict = {}
     mvp_lesionados_dict = {}
     arbitros_list = []
-    arbitros_dict = {}
 
 
 # ==============================================
@@ -192,24 +153,11 @@ def configurar_header_con_logo(frame, titulo):
 
 def calcular_factor_arbitro(local, visitante, arbitro_seleccionado):
     """Calcula el factor de sesgo del árbitro (Victorias Local - Victorias Visitante)."""
-    
-    # 1. Obtener victorias del local con el árbitro
-    try:
-        # La clave del diccionario es (nombre_arbitro, nombre_equipo)
-        victorias_local = arbitros_dict.get((arbitro_seleccionado, local), 0)
-    except:
-        victorias_local = 0
-        
-    # 2. Obtener victorias del visitante con el árbitro
-    try:
-        victorias_visitante = arbitros_dict.get((arbitro_seleccionado, visitante), 0)
-    except:
-        victorias_visitante = 0
+    if modelo_regresion is None:
+        return 0, 0, 0
 
-    # 3. Calcular el efecto
-    referee_effect = victorias_local - victorias_visitante
-    
-    return referee_effect, victorias_local, victorias_visitante
+    # Matriz densa [árbitro, equipo] del modelo (0 victorias si el árbitro o el equipo no figuran)
+    return modelo_regresion.calcular_factor_arbitro(local, visitante, arbitro_seleccionado)
 
 
 def hacer_prediccion(local, visitante, arbitro_seleccionado, mvp_local_lesionado=False, mvp_visitante_lesionado=False):
@@ -218,51 +166,8 @@ def hacer_prediccion(local, visitante, arbitro_seleccionado, mvp_local_lesionado
     if modelo_regresion is None:
         return 0.5, 0.5, "Modelo no entrenado"
 
-    # 1. Diff Strength (Fuerza Diferencial)
-    ppa_local = equipos_dict.get(local, 100)
-    ppa_visitante = equipos_dict.get(visitante, 100)
-    # Usamos la normalización del Décimo: (PPA_Local - PPA_Visitante) / (PPA_Local + PPA_Visitante)
-    diff_strength = (ppa_local - ppa_visitante) / (ppa_local + ppa_visitante) 
-
-    # 2. Localia
-    localia = 1.0 # Siempre 1.0 ya que local es 'Local'
-
-    # 3. Lesiones del MVP - Ahora recibe como parámetros
-    star_home_is_injured = 1.0 if mvp_local_lesionado else 0.0
-    star_away_is_injured = 1.0 if mvp_visitante_lesionado else 0.0
-    
-    # 4. Efecto del Árbitro
-    referee_effect, victorias_local, victorias_visitante = calcular_factor_arbitro(local, visitante, arbitro_seleccionado)
-    
-    # 5. Crear un DataFrame de Pandas con los nombres de las features ✅ CORRECCIÓN APLICADA
-    features_data = {
-        'diff_strength': [diff_strength],
-        'Localia': [localia],
-        'star_home_is_injured': [star_home_is_injured],
-        'star_away_is_injured': [star_away_is_injured],
-        'referee_effect': [referee_effect]
-    }
-    
-    # X_test es ahora un DataFrame, manteniendo los nombres de las features que usó el modelo
-    X_test = pd.DataFrame(features_data) 
-    
-    # 6. Predecir
-    probabilidades = modelo_regresion.predict_proba(X_test)[0]
-    prob_local = probabilidades[1] # Probabilidad de 1 (Gana Local)
-    prob_visitante = probabilidades[0] # Probabilidad de 0 (Gana Visitante)
-    
-    # 7. Determinar el ganador
-    ganador = local if prob_local > prob_visitante else visitante
-    
-    # Devolver probabilidades y datos adicionales para el resumen
-    return prob_local, prob_visitante, ganador, {
-        "diff_strength": diff_strength,
-        "star_home_is_injured": star_home_is_injured,
-        "star_away_is_injured": star_away_is_injured,
-        "referee_effect": referee_effect,
-        "victorias_local_arbitro": victorias_local,
-        "victorias_visitante_arbitro": victorias_visitante
-    }
+    # Features, referee_effect y probabilidad con el modelo ya cargado
+    return modelo_regresion.predecir(local, visitante, arbitro_seleccionado, mvp_local_lesionado, mvp_visitante_lesionado)
 
 
 # ==============================================
@@ -0,0 +1,31 @@
+# =======================================================
+# 🏀 TrueShot - pruebas de las etapas de trueshot_matriz con datos mínimos
+#
+#   python -m pytest -q test_trueshot_matriz.py
+# =======================================================
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import trueshot_matriz
+
+
+def test_estrellas_ignora_mvp_sin_id(tmp_path, monkeypatch):
+    # como leer_hoja: id de jugador Int64 nullable, con un MVP sin id
+    jugadores = pd.DataFrame({
+        'id player (Punto 1)': pd.array([201939, pd.NA, 2544, 1629029], dtype='Int64'),
+        'Jugador más valioso (Punto 9)': ['Sí', 'Sí', 'Sí', 'No'],
+        'Equipo más reciente': ['GSW', 'BOS', 'LAL', 'DAL'],
+    })
+    monkeypatch.setattr(trueshot_matriz, 'leer_hoja', lambda hoja: jugadores)
+    pd.DataFrame({'id': [1610612744, 1610612738, 1610612747, 1610612742],
+                  'abbreviation': ['GSW', 'BOS', 'LAL', 'DAL']}).to_csv(tmp_path / trueshot_matriz.ARCHIVO_EQUIPOS,
+                                                                       index=False)
+
+    estrellas = trueshot_matriz.etapa_estrellas(str(tmp_path))
+    assert estrellas.to_dict('list') == {'team_id': [1610612744, 1610612747], 'player_id': [201939, 2544]}
+    assert estrellas['player_id'].dtype == 'int64'
@@ -0,0 +1,100 @@
+# =======================================================
+# 🏀 TrueShot - Matriz densa árbitro × equipo para el referee_effect
+# Las victorias de cada equipo con cada árbitro se guardan en un array [árbitro, equipo]
+# con índices enteros; el referee_effect de un lote de partidos es una resta con fancy indexing:
+#
+#   victorias[arbitro, local] - victorias[arbitro, visitante]
+#
+# El último índice de cada eje es el "desconocido" (fila/columna de ceros), así un nombre
+# que no está en la tabla aporta 0 victorias, igual que el .get(..., 0) de la interfaz.
+# La usan el modelo (predicción individual, por lotes y la matriz completa) y la
+# generación de la matriz de entrenamiento.
+# =======================================================
+
+import numpy as np
+
+
+def _indices(nombres, idx, desconocido):
+    """Nombres -> array de índices (los que no están en `idx` van al índice `desconocido`)."""
+    get = idx.get
+    return np.fromiter((get(n, desconocido) for n in nombres), dtype=np.intp, count=len(nombres))
+
+
+class MatrizArbitros:
+    """Victorias por (árbitro, equipo) como matriz densa más los mapas nombre -> índice."""
+
+    def __init__(self, arbitros, equipos, victorias):
+        self.arbitros = list(arbitros)
+        self.equipos = list(equipos)
+        self.idx_arbitro = {a: i for i, a in enumerate(self.arbitros)}
+        self.idx_equipo = {e: i for i, e in enumerate(self.equipos)}
+        victorias = np.asarray(victorias)
+        if victorias.shape != (len(self.arbitros), len(self.equipos)):
+            raise ValueError(f"victorias tiene forma {victorias.shape}, se esperaba "
+                             f"({len(self.arbitros)}, {len(self.equipos)})")
+        # fila y columna extra de ceros para los desconocidos
+        self.victorias = np.zeros((len(self.arbitros) + 1, len(self.equipos) + 1), dtype=victorias.dtype)
+        self.victorias[:-1, :-1] = victorias
+
+    # ----- construcción -----
+    @classmethod
+    def desde_registros(cls, arbitros, equipos, valores, nombres_arbitros=None, nombres_equipos=None):
+        """Suma `valores` por (árbitro, equipo) en una sola pasada (equivale a groupby(...).sum()).
+
+        Con `nombres_arbitros` / `nombres_equipos` los ejes quedan fijos (p.ej. alineados con los
+        equipos del modelo) y los registros con nombres fuera de esos ejes se descartan.
+        """
+        import pandas as pd
+        arbitros, equipos = pd.Series(arbitros), pd.Series(equipos)
+        if nombres_arbitros is None:
+            nombres_arbitros = sorted(arbitros.dropna().unique().tolist())
+        if nombres_equipos is None:
+            nombres_equipos = sorted(equipos.dropna().unique().tolist())
+        ai = pd.Index(nombres_arbitros).get_indexer(arbitros)
+        ei = pd.Index(nombres_equipos).get_indexer(equipos)
+        valores = np.asarray(valores)
+        ok = (ai >= 0) & (ei >= 0)
+        victorias = np.zeros((len(nombres_arbitros), len(nombres_equipos)),
+                             dtype=np.result_type(valores.dtype, np.int64))
+        np.add.at(victorias, (ai[ok], ei[ok]), valores[ok])
+        return cls(nombres_arbitros, nombres_equipos, victorias)
+
+    @classmethod
+    def desde_partidos(cls, arbitros, locales, visitantes, gano_local, nombres_arbitros=None, nombres_equipos=None):
+        """Cuenta victorias por (árbitro, equipo) a partir de filas partido × árbitro.
+
+        Cada fila suma `gano_local` al local y `1 - gano_local` al visitante con ese árbitro.
+        """
+        gano_local = np.asarray(gano_local, dtype=np.int64)
+        return cls.desde_registros(
+            np.concatenate([np.asarray(arbitros, dtype=object)] * 2),
+            np.concatenate([np.asarray(locales, dtype=object), np.asarray(visitantes, dtype=object)]),
+            np.concatenate([gano_local, 1 - gano_local]),
+            nombres_arbitros, nombres_equipos)
+
+    @classmethod
+    def desde_json(cls, datos):
+        return cls(datos["arbitros"], datos["equipos"], np.array(datos["victorias"]).reshape(
+            len(datos["arbitros"]), len(datos["equipos"])))
+
+    def a_json(self):
+        return {"arbitros": self.arbitros, "equipos": self.equipos,
+                "victorias": self.victorias[:-1, :-1].tolist()}
+
+    # ----- consultas -----
+    def indices_arbitros(self, nombres):
+        return _indices(nombres, self.idx_arbitro, len(self.arbitros))
+
+    def indices_equipos(self, nombres):
+        return _indices(nombres, self.idx_equipo, len(self.equipos))
+
+    def efecto(self, ai, li, vi):
+        """referee_effect (victorias local - victorias visitante) para arrays de índices."""
+        return self.victorias[ai, li] - self.victorias[ai, vi]
+
+    def efecto_nombres(self, arbitros, locales, visitantes):
+        return self.efecto(self.indices_arbitros(arbitros), self.indices_equipos(locales),
+                           self.indices_equipos(visitantes))
+
+    def victorias_de(self, arbitro, equipo):
+        return self.victorias[self.idx_arbitro.get(arbitro, -1), self.idx_equipo.get(equipo, -1)].item()
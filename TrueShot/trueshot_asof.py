@@ -0,0 +1,141 @@
+# =======================================================
+# 🏀 TrueShot - Features "as-of" (punto en el tiempo) sin fuga de información
+# Para cada partido, las features usan solo partidos jugados ANTES del salto inicial.
+# En vez de re-escanear la historia por partido (O(N²)), se recorre la historia una sola
+# vez en orden cronológico con sumas acumuladas por grupo (equipo / árbitro × equipo):
+# el agregado "antes del partido" es la suma acumulada del grupo sin el propio partido.
+# Lineal salvo el ordenamiento por grupo (un sort estable), todo en numpy.
+#
+# Las tablas de entrada tienen la forma de las etapas de trueshot_matriz:
+#   partidos: game_id, fecha, local_id, visitante_id, gano_local, pts_local, pts_visitante
+#   arbitros: game_id, official_id
+# =======================================================
+
+import numpy as np
+import pandas as pd
+
+from trueshot_modelo import PPA_POR_DEFECTO
+
+
+def _primera_del_tramo(inicio):
+    """Para cada fila, el índice de la primera fila de su tramo (`inicio` marca los comienzos)."""
+    return np.maximum.accumulate(np.where(inicio, np.arange(len(inicio)), 0))
+
+
+def _acumulado_previo(valores, inicio_grupo, inicio_dia):
+    """Suma de `valores` en los días anteriores del mismo grupo.
+
+    Las filas vienen ordenadas por grupo y, dentro de cada grupo, en orden cronológico;
+    `inicio_grupo` marca la primera fila de cada grupo e `inicio_dia` la primera de cada
+    (grupo, fecha). Las filas del mismo día no se ven entre sí: el horario no está en los datos.
+    """
+    previo = np.cumsum(valores) - valores
+    previo = previo - previo[_primera_del_tramo(inicio_grupo)]
+    return previo[_primera_del_tramo(inicio_dia)]
+
+
+def _inicios(*claves):
+    """True en la primera fila de cada grupo de claves consecutivas iguales."""
+    n = len(claves[0])
+    inicio = np.zeros(n, dtype=bool)
+    if n:
+        inicio[0] = True
+        for c in claves:
+            inicio[1:] |= c[1:] != c[:-1]
+    return inicio
+
+
+def _intercalar(a, b):
+    """[a0, b0, a1, b1, ...]"""
+    return np.column_stack([a, b]).ravel()
+
+
+def _orden_cronologico(partidos):
+    if partidos['fecha'].is_monotonic_increasing:
+        return partidos.reset_index(drop=True)
+    return partidos.sort_values(['fecha', 'game_id'], kind='stable', ignore_index=True)
+
+
+def fuerza_asof(partidos):
+    """PPA de local y visitante con la historia previa a cada partido.
+
+    PPA = (promedio de puntos anotados de local + promedio de puntos anotados de visitante) / 2,
+    la misma definición que la hoja Equipos pero acumulada hasta el día anterior. Si el
+    equipo todavía no jugó en uno de los dos roles se usa el otro; sin historia, PPA_POR_DEFECTO.
+    Devuelve un DataFrame alineado con `partidos` (game_id, ppa_local, ppa_visitante).
+    """
+    partidos = _orden_cronologico(partidos)
+    n = len(partidos)
+    # una fila por equipo y partido, intercaladas (local, visitante) para que la posición
+    # siga siendo cronológica; el sort estable por equipo conserva ese orden dentro de cada uno
+    equipo = _intercalar(partidos['local_id'].to_numpy(), partidos['visitante_id'].to_numpy())
+    de_local = np.tile([1.0, 0.0], n)
+    pts = _intercalar(partidos['pts_local'].to_numpy(dtype=np.float64),
+                      partidos['pts_visitante'].to_numpy(dtype=np.float64))
+    orden = np.argsort(equipo, kind='stable')
+    equipo, de_local, pts = equipo[orden], de_local[orden], pts[orden]
+    fecha = np.repeat(partidos['fecha'].to_numpy(), 2)[orden]
+    inicio, dia = _inicios(equipo), _inicios(equipo, fecha)
+
+    pts_local = _acumulado_previo(pts * de_local, inicio, dia)
+    n_local = _acumulado_previo(de_local, inicio, dia)
+    pts_visit = _acumulado_previo(pts * (1 - de_local), inicio, dia)
+    n_visit = _acumulado_previo(1 - de_local, inicio, dia)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        prom_local = pts_local / n_local
+        prom_visit = pts_visit / n_visit
+    ppa = np.where(np.isnan(prom_local), prom_visit,
+                   np.where(np.isnan(prom_visit), prom_local, (prom_local + prom_visit) / 2))
+    ppa = np.where(np.isnan(ppa), PPA_POR_DEFECTO, ppa)
+
+    por_fila = np.empty(2 * n)
+    por_fila[orden] = ppa
+    return pd.DataFrame({'game_id': partidos['game_id'].to_numpy(),
+                         'ppa_local': por_fila[0::2], 'ppa_visitante': por_fila[1::2]})
+
+
+def victorias_arbitro_asof(partidos, arbitros):
+    """Victorias previas de local y visitante con cada árbitro del partido.
+
+    Devuelve una fila por (partido, árbitro) en el orden de `arbitros` dentro de cada partido:
+    game_id, official_id, victorias_local, victorias_visitante (solo partidos anteriores).
+    """
+    partidos = _orden_cronologico(partidos)
+    pos = pd.Index(partidos['game_id']).get_indexer(arbitros['game_id'])
+    oficial = arbitros['official_id'].to_numpy()[pos >= 0]
+    pos = pos[pos >= 0]
+    # filas partido × árbitro en orden cronológico (estable: respeta el orden del cuerpo arbitral)
+    cronologico = np.argsort(pos, kind='stable')
+    pos, oficial = pos[cronologico], oficial[cronologico]
+    m = len(pos)
+
+    # (árbitro, equipo, ganó) para el local y para el visitante de cada fila partido × árbitro
+    gano_local = partidos['gano_local'].to_numpy(dtype=np.int64)[pos]
+    arbitro = np.repeat(oficial, 2)
+    equipo = _intercalar(partidos['local_id'].to_numpy()[pos], partidos['visitante_id'].to_numpy()[pos])
+    gano = _intercalar(gano_local, 1 - gano_local)
+    fecha = np.repeat(partidos['fecha'].to_numpy()[pos], 2)
+    # una sola clave entera (árbitro, equipo); el sort estable conserva el orden cronológico
+    cod_arbitro, _ = pd.factorize(arbitro)
+    cod_equipo, equipos = pd.factorize(equipo)
+    orden = np.argsort(cod_arbitro.astype(np.int64) * len(equipos) + cod_equipo, kind='stable')
+    arbitro, equipo, fecha = arbitro[orden], equipo[orden], fecha[orden]
+    previas = np.empty(2 * m, dtype=np.int64)
+    previas[orden] = _acumulado_previo(gano[orden], _inicios(arbitro, equipo), _inicios(arbitro, equipo, fecha))
+
+    return pd.DataFrame({
+        'game_id': partidos['game_id'].to_numpy()[pos],
+        'official_id': oficial,
+        'victorias_local': previas[0::2],
+        'victorias_visitante': previas[1::2],
+    })
+
+
+def efecto_arbitro_asof(partidos, arbitros):
+    """referee_effect por partido con el árbitro principal (el primero listado), solo con historia previa."""
+    por_arbitro = victorias_arbitro_asof(partidos, arbitros).drop_duplicates('game_id')
+    return pd.DataFrame({
+        'game_id': por_arbitro['game_id'].to_numpy(),
+        'referee_effect': (por_arbitro['victorias_local'] - por_arbitro['victorias_visitante']).to_numpy(dtype=np.float64),
+    })
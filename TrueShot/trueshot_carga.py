@@ -0,0 +1,94 @@
+# =======================================================
+# 🏀 TrueShot - Prueba de carga del servidor de predicción
+# Abre N conexiones keep-alive y manda POST /prediccion sin pausa durante D segundos;
+# informa requests por segundo y latencia p50 / p90 / p99.
+#
+#   python trueshot_servidor.py &
+#   python trueshot_carga.py --conexiones 64 --duracion 10
+# =======================================================
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import urllib.request
+
+
+def percentil(valores, p):
+    if not valores:
+        return float("nan")
+    k = min(len(valores) - 1, max(0, int(round(p / 100.0 * (len(valores) - 1)))))
+    return valores[k]
+
+
+async def cliente(host, port, cuerpos, fin, latencias, errores):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < fin:
+            cuerpo = random.choice(cuerpos)
+            t0 = time.perf_counter()
+            writer.write(b"POST /prediccion HTTP/1.1\r\nHost: %s\r\nContent-Type: application/json\r\n"
+                         b"Content-Length: %d\r\n\r\n%s" % (host.encode(), len(cuerpo), cuerpo))
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            largo = 0
+            while True:
+                h = await reader.readline()
+                if h in (b"\r\n", b""):
+                    break
+                if h.lower().startswith(b"content-length:"):
+                    largo = int(h.split(b":", 1)[1])
+            await reader.readexactly(largo)
+            latencias.append(time.perf_counter() - t0)
+            if status != 200:
+                errores.append(status)
+    finally:
+        writer.close()
+
+
+async def correr(host, port, conexiones, duracion, cuerpos):
+    latencias, errores = [], []
+    fin = time.perf_counter() + duracion
+    t0 = time.perf_counter()
+    await asyncio.gather(*(cliente(host, port, cuerpos, fin, latencias, errores) for _ in range(conexiones)))
+    return latencias, errores, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de trueshot_servidor.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--conexiones", type=int, default=64)
+    parser.add_argument("--duracion", type=float, default=10.0)
+    args = parser.parse_args()
+
+    base = f"http://{args.host}:{args.port}"
+    with urllib.request.urlopen(f"{base}/equipos") as r:
+        equipos = json.load(r)
+    with urllib.request.urlopen(f"{base}/arbitros") as r:
+        arbitros = json.load(r)
+
+    # cuerpos aleatorios precalculados: el cliente no compite por CPU armando JSON
+    cuerpos = []
+    for _ in range(500):
+        local, visitante = random.sample(equipos, 2)
+        cuerpos.append(json.dumps({
+            "local": local, "visitante": visitante, "arbitro": random.choice(arbitros),
+            "mvp_local_lesionado": random.random() < 0.2, "mvp_visitante_lesionado": random.random() < 0.2,
+        }).encode("utf-8"))
+
+    latencias, errores, total = asyncio.run(correr(args.host, args.port, args.conexiones, args.duracion, cuerpos))
+    latencias.sort()
+    print(f"{len(latencias):,} requests en {total:.1f}s con {args.conexiones} conexiones "
+          f"-> {len(latencias) / total:,.0f} req/s, {len(errores)} errores")
+    print(f"latencia p50 {percentil(latencias, 50) * 1000:.2f} ms | "
+          f"p90 {percentil(latencias, 90) * 1000:.2f} ms | p99 {percentil(latencias, 99) * 1000:.2f} ms")
+    with urllib.request.urlopen(f"{base}/health") as r:
+        salud = json.load(r)
+    if salud.get("lotes"):
+        print(f"lotes del servidor: {salud['lotes']:,} ({salud['predicciones'] / salud['lotes']:.1f} predicciones por lote)")
+
+
+if __name__ == "__main__":
+    main()
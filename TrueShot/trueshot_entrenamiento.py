@@ -0,0 +1,212 @@
+# =======================================================
+# 🏀 TrueShot - Entrenamiento incremental de la Regresión Logística
+# La matriz de entrenamiento solo crece (se agregan partidos al final). En vez de reentrenar
+# sobre toda la historia, cada actualización lee solo las filas nuevas y ajusta el modelo
+# partiendo del anterior: el modelo previo entra como prior cuadrático (su Hessiana acumulada),
+# así que el resultado es prácticamente el mismo que un reajuste completo, con costo O(filas nuevas).
+#
+#   python trueshot_entrenamiento.py             # actualización incremental (o completa si no hay versión)
+#   python trueshot_entrenamiento.py --completo  # fuerza el reajuste sobre toda la matriz
+#
+# Cada actualización queda versionada en artefactos/modelos/vNNNN.json.
+# =======================================================
+
+import os
+import io
+import json
+import glob
+import time
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from trueshot_modelo import BASE_DIR, MATRIZ_PATH, FEATURES
+
+MODELOS_DIR = os.path.join(BASE_DIR, "artefactos", "modelos")
+MAX_VERSIONES = 10
+OBJETIVO = 'Resultado_Real'
+
+# Igual que LogisticRegression() por defecto: L2 con C=1 sobre los coeficientes, sin penalizar el intercept
+C_REGULARIZACION = 1.0
+MAX_ITER_NEWTON = 50
+TOL_NEWTON = 1e-10
+BYTES_COLA = 4096   # bytes previos al offset que se comparan para detectar si la matriz se reescribió
+
+
+def _sigmoide(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+def _con_intercept(X):
+    return np.hstack([X, np.ones((len(X), 1))])
+
+
+def prior_inicial(n_features=len(FEATURES)):
+    """Hessiana del término de regularización (el intercept casi sin penalizar, para que sea invertible)."""
+    return np.diag([1.0 / C_REGULARIZACION] * n_features + [1e-8])
+
+
+def ajustar_newton(X, y, w0, H0):
+    """Minimiza log-loss(X, y) + ½ (w - w0)ᵀ H0 (w - w0) con Newton.
+
+    Con w0 = 0 y H0 = prior_inicial() es la Regresión Logística L2 estándar.
+    Con (w0, H0) de la versión anterior es la actualización incremental: la historia
+    ya vista está resumida en H0. Devuelve (w, H) con H la Hessiana en el óptimo.
+    """
+    X1 = _con_intercept(np.asarray(X, dtype=np.float64))
+    y = np.asarray(y, dtype=np.float64)
+    w = w0.copy()
+    for _ in range(MAX_ITER_NEWTON):
+        p = _sigmoide(X1 @ w)
+        g = X1.T @ (p - y) + H0 @ (w - w0)
+        H = (X1 * (p * (1 - p))[:, None]).T @ X1 + H0
+        paso = np.linalg.solve(H, g)
+        w -= paso
+        if np.max(np.abs(paso)) < TOL_NEWTON:
+            break
+    p = _sigmoide(X1 @ w)
+    H = (X1 * (p * (1 - p))[:, None]).T @ X1 + H0
+    return w, H
+
+
+def metricas(X, y, w):
+    if len(y) == 0:
+        return {}
+    p = np.clip(_sigmoide(_con_intercept(X) @ w), 1e-12, 1 - 1e-12)
+    y = np.asarray(y, dtype=np.float64)
+    return {
+        "accuracy": float(np.mean((p > 0.5) == (y == 1))),
+        "log_loss": float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))),
+    }
+
+
+# ==============================================
+# Lectura de la matriz (completa o solo la cola nueva)
+# ==============================================
+
+def _hash_cola(f, offset):
+    inicio = max(0, offset - BYTES_COLA)
+    f.seek(inicio)
+    return hashlib.sha1(f.read(offset - inicio)).hexdigest()
+
+
+def _preparar(df):
+    return df[FEATURES].fillna(0).to_numpy(dtype=np.float64), df[OBJETIVO].to_numpy(dtype=np.float64)
+
+
+def leer_matriz(path=MATRIZ_PATH, desde_offset=0, hash_cola=None):
+    """(X, y, offset_final, hash_cola_final, incremental).
+
+    Con `desde_offset` solo se parsean los bytes nuevos; si la cola no coincide con `hash_cola`
+    la matriz se reescribió (no solo creció) y se lee completa (incremental=False).
+    """
+    with open(path, "rb") as f:
+        header = f.readline()
+        tamano = os.fstat(f.fileno()).st_size
+        incremental = desde_offset > 0 and desde_offset <= tamano and _hash_cola(f, desde_offset) == hash_cola
+        inicio = desde_offset if incremental else len(header)
+        f.seek(inicio)
+        cuerpo = f.read()
+        # solo filas completas: una línea a medio escribir queda para la próxima
+        fin = cuerpo.rfind(b"\n") + 1
+        cuerpo = cuerpo[:fin]
+        offset_final = inicio + fin
+        cola = _hash_cola(f, offset_final)
+    if cuerpo.strip():
+        df = pd.read_csv(io.BytesIO(header + cuerpo))
+    else:
+        df = pd.DataFrame(columns=FEATURES + [OBJETIVO])
+    X, y = _preparar(df)
+    return X, y, offset_final, cola, incremental
+
+
+# ==============================================
+# Versiones en disco
+# ==============================================
+
+def _versiones():
+    return sorted(glob.glob(os.path.join(MODELOS_DIR, "v[0-9][0-9][0-9][0-9].json")))
+
+
+def cargar_version_actual():
+    versiones = _versiones()
+    if not versiones:
+        return None
+    with open(versiones[-1], encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _guardar_version(estado):
+    os.makedirs(MODELOS_DIR, exist_ok=True)
+    path = os.path.join(MODELOS_DIR, f"v{estado['version']:04d}.json")
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(estado, f, indent=1)
+    os.replace(tmp, path)
+    for viejo in _versiones()[:-MAX_VERSIONES]:
+        os.remove(viejo)
+    return path
+
+
+def actualizar_modelo(completo=False, path=MATRIZ_PATH):
+    """Entrena solo sobre las filas nuevas desde la última versión (o todo si `completo`).
+
+    Devuelve el estado de la versión vigente: {"version", "filas", "coef", "intercept", ...}.
+    Si no hay filas nuevas no crea versión.
+    """
+    t0 = time.perf_counter()
+    previo = None if completo else cargar_version_actual()
+    if previo is not None and previo.get("features") != FEATURES:
+        previo = None
+
+    if previo is None:
+        X, y, offset, cola, _ = leer_matriz(path)
+        incremental = False
+    else:
+        X, y, offset, cola, incremental = leer_matriz(path, previo["offset"], previo["hash_cola"])
+        if incremental and len(y) == 0:
+            return previo
+
+    if incremental:
+        w0, H0 = np.array(previo["w"]), np.array(previo["H"])
+        filas = previo["filas"] + len(y)
+    else:
+        w0, H0 = np.zeros(len(FEATURES) + 1), prior_inicial()
+        filas = len(y)
+    antes = metricas(X, y, w0) if incremental else {}
+    w, H = ajustar_newton(X, y, w0, H0)
+
+    estado = {
+        "version": (previo["version"] + 1) if previo is not None else 1,
+        "features": FEATURES,
+        "modo": "incremental" if incremental else "completo",
+        "creado": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "filas": int(filas),
+        "filas_nuevas": int(len(y)),
+        "offset": int(offset),
+        "hash_cola": cola,
+        "w": w.tolist(),
+        "H": H.tolist(),
+        "coef": w[:-1].tolist(),
+        "intercept": float(w[-1]),
+        "segundos": round(time.perf_counter() - t0, 4),
+        # sobre las filas nuevas: con el modelo anterior (antes) y con el actualizado
+        "metricas_nuevas_antes": antes,
+        "metricas_nuevas": metricas(X, y, w),
+    }
+    _guardar_version(estado)
+    return estado
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Entrenamiento incremental del modelo TrueShot")
+    parser.add_argument("--completo", action="store_true", help="reajusta sobre toda la matriz")
+    args = parser.parse_args()
+
+    estado = actualizar_modelo(completo=args.completo)
+    print(f"Modelo v{estado['version']:04d} ({estado['modo']}): {estado['filas']:,} filas, "
+          f"{estado['filas_nuevas']:,} nuevas, {estado['segundos']:.3f}s")
+    print(f"  coef={np.round(estado['coef'], 5).tolist()} intercept={estado['intercept']:.5f}")
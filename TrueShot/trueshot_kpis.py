@@ -0,0 +1,148 @@
+# =======================================================
+# 🏀 TrueShot - KPIs de eficiencia (posesiones, ORtg/DRtg/Net Rating, TS%, eFG%, Pace)
+# Versión reutilizable de EDA/KPIs_Extra.ipynb: una sola pasada vectorizada sobre columnas
+# numpy tipadas de clean_game.csv, y los promedios por equipo y temporada sin apilar copias
+# local/visitante: cada métrica se acumula con np.bincount sobre la clave (temporada, equipo)
+# de cada lado y se suman los dos lados.
+#
+#   python trueshot_kpis.py clean_game.csv --salida kpis/    # tablas para BigQuery/Looker
+#
+# Salidas: nba_kpi_net_rating.csv y nba_kpi_ts_pct.csv (mismas columnas que el notebook)
+# y nba_kpis_equipo_temporada.parquet con todos los KPIs juntos.
+# =======================================================
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+LADOS = ('home', 'away')
+ESTADISTICAS = ('pts', 'fgm', 'fga', 'fg3m', 'fta', 'oreb', 'tov')
+COLUMNAS = (['season_id', 'game_id', 'min', 'team_id_home', 'team_id_away']
+            + [f"{e}_{lado}" for lado in LADOS for e in ESTADISTICAS])
+MINUTOS_REGLAMENTO = 48.0
+
+
+def leer_partidos(path):
+    """Columnas numpy float64/int64 de clean_game.csv (solo las que usan los KPIs)."""
+    import pyarrow as pa
+    import pyarrow.csv as pv
+
+    tipos = {c: pa.float64() for c in COLUMNAS}
+    tipos.update({'season_id': pa.int64(), 'game_id': pa.int64(), 'team_id_home': pa.int64(), 'team_id_away': pa.int64()})
+    tabla = pv.read_csv(path, convert_options=pv.ConvertOptions(include_columns=COLUMNAS, column_types=tipos))
+    return {c: tabla.column(c).to_numpy() for c in COLUMNAS}
+
+
+def kpis_partido(c):
+    """KPIs por partido para ambos lados; `c` es un dict (o DataFrame) de columnas de clean_game.
+
+    Posesiones = FGA - OREB + TOV + 0.44·FTA de cada lado y POSS el promedio de los dos
+    (los equipos comparten posesiones). Ratings por 100 posesiones; TS% como en el notebook
+    (PTS·50 / (FGA + 0.44·FTA)); eFG% = (FGM + 0.5·FG3M) / FGA; Pace = posesiones por 48 minutos.
+    """
+    f = lambda k: np.asarray(c[k], dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        poss_home = f('fga_home') - f('oreb_home') + f('tov_home') + 0.44 * f('fta_home')
+        poss_away = f('fga_away') - f('oreb_away') + f('tov_away') + 0.44 * f('fta_away')
+        poss = (poss_home + poss_away) / 2
+        por_100 = 100.0 / poss
+        ortg_home = f('pts_home') * por_100
+        ortg_away = f('pts_away') * por_100
+        # 'min' son los minutos de equipo (240 en tiempo reglamentario = 5 jugadores × 48)
+        minutos = f('min') / 5 if 'min' in c else np.full(len(poss), MINUTOS_REGLAMENTO)
+        minutos = np.where(minutos > 0, minutos, MINUTOS_REGLAMENTO)
+        out = {
+            'POSS_HOME': poss_home,
+            'POSS_AWAY': poss_away,
+            'POSS': poss,
+            'ORtg_Home': ortg_home,
+            'DRtg_Home': ortg_away,
+            'NetRtg_Home': ortg_home - ortg_away,
+            'ORtg_Away': ortg_away,
+            'DRtg_Away': ortg_home,
+            'NetRtg_Away': ortg_away - ortg_home,
+            'TS_PCT_Home': f('pts_home') * 50 / (f('fga_home') + 0.44 * f('fta_home')),
+            'TS_PCT_Away': f('pts_away') * 50 / (f('fga_away') + 0.44 * f('fta_away')),
+            'EFG_PCT_Home': (f('fgm_home') + 0.5 * f('fg3m_home')) / f('fga_home'),
+            'EFG_PCT_Away': (f('fgm_away') + 0.5 * f('fg3m_away')) / f('fga_away'),
+            'PACE': MINUTOS_REGLAMENTO * poss / minutos,
+        }
+    return out
+
+
+# KPI por equipo -> (columna del local, columna del visitante)
+KPIS_EQUIPO = {
+    'NetRtg': ('NetRtg_Home', 'NetRtg_Away'),
+    'ORtg': ('ORtg_Home', 'ORtg_Away'),
+    'DRtg': ('DRtg_Home', 'DRtg_Away'),
+    'TS_PCT': ('TS_PCT_Home', 'TS_PCT_Away'),
+    'EFG_PCT': ('EFG_PCT_Home', 'EFG_PCT_Away'),
+    'Pace': ('PACE', 'PACE'),
+}
+
+
+def kpis_equipo_temporada(c, kpis=None):
+    """Promedio de cada KPI por (season_id, team_id) con local y visitante juntos.
+
+    Equivale al concat de home/away + groupby(['season_id', 'team_id']).mean() del notebook
+    (los NaN no cuentan, como en pandas), pero sin materializar la tabla apilada.
+    """
+    kpis = kpis_partido(c) if kpis is None else kpis
+    cod_t, temporadas = pd.factorize(np.asarray(c['season_id']), sort=True)
+    # códigos de equipo compartidos por ambos lados: se factoriza cada lado y se reindexan
+    # sus (pocos) valores únicos contra la unión ordenada
+    cod_home, eq_home = pd.factorize(np.asarray(c['team_id_home']))
+    cod_away, eq_away = pd.factorize(np.asarray(c['team_id_away']))
+    equipos = np.union1d(eq_home, eq_away)
+    clave_home = cod_t * len(equipos) + np.searchsorted(equipos, eq_home)[cod_home]
+    clave_away = cod_t * len(equipos) + np.searchsorted(equipos, eq_away)[cod_away]
+    total = len(temporadas) * len(equipos)
+
+    partidos = np.bincount(clave_home, minlength=total) + np.bincount(clave_away, minlength=total)
+    presentes = np.flatnonzero(partidos)
+    salida = {
+        'season_id': temporadas[presentes // len(equipos)],
+        'team_id': equipos[presentes % len(equipos)],
+    }
+    for nombre, (col_home, col_away) in KPIS_EQUIPO.items():
+        suma = np.zeros(total)
+        cuenta = np.zeros(total)
+        for clave, valores in ((clave_home, kpis[col_home]), (clave_away, kpis[col_away])):
+            ok = np.isfinite(valores)
+            suma += np.bincount(clave[ok], weights=valores[ok], minlength=total)
+            cuenta += np.bincount(clave[ok], minlength=total)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            salida[f'Avg_{nombre}'] = (suma / cuenta)[presentes]
+    salida['Total_Games'] = partidos[presentes]
+    return pd.DataFrame(salida)
+
+
+def exportar_looker(equipo_temporada, carpeta):
+    """Las dos tablas que el notebook exportaba para BigQuery/Looker, más el Parquet completo."""
+    os.makedirs(carpeta, exist_ok=True)
+    equipo_temporada[['season_id', 'team_id', 'Avg_NetRtg', 'Avg_ORtg', 'Avg_DRtg', 'Total_Games']].to_csv(
+        os.path.join(carpeta, 'nba_kpi_net_rating.csv'), index=False)
+    equipo_temporada[['season_id', 'team_id', 'Avg_TS_PCT']].to_csv(
+        os.path.join(carpeta, 'nba_kpi_ts_pct.csv'), index=False)
+    equipo_temporada.to_parquet(os.path.join(carpeta, 'nba_kpis_equipo_temporada.parquet'), index=False)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="KPIs de eficiencia por partido y por equipo/temporada")
+    parser.add_argument("partidos", help="clean_game.csv")
+    parser.add_argument("--salida", required=True, help="carpeta de salida")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    columnas = leer_partidos(args.partidos)
+    t_lectura = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    resumen = kpis_equipo_temporada(columnas)
+    t_kpis = time.perf_counter() - t0
+    exportar_looker(resumen, args.salida)
+    print(f"{len(columnas['game_id']):,} partidos -> {len(resumen):,} filas equipo/temporada "
+          f"(lectura {t_lectura:.2f}s, KPIs {t_kpis:.2f}s) -> {args.salida}")
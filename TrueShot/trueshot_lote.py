@@ -0,0 +1,96 @@
+# =======================================================
+# 🏀 TrueShot - Predicción por lotes (sin interfaz)
+# Puntúa una cartelera completa o la matriz de todos los cruces con el modelo precalculado.
+#
+#   python trueshot_lote.py cartelera partidos.csv --salida cuotas.csv
+#   python trueshot_lote.py matriz --salida matriz.parquet [--arbitros "Scott Foster,Tony Brothers"]
+#
+# La cartelera es un CSV con columnas local, visitante, arbitro y, opcionales,
+# mvp_local_lesionado / mvp_visitante_lesionado (1/0, Sí/No, True/False).
+# =======================================================
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from trueshot_modelo import ModeloTrueShot, FEATURES
+
+VALORES_SI = {"1", "1.0", "si", "sí", "true", "t", "y", "yes", "lesionado"}
+
+
+def _flag(col):
+    return col.astype(str).str.strip().str.lower().isin(VALORES_SI).to_numpy(dtype=np.float64)
+
+
+def puntuar_cartelera(modelo, partidos):
+    """DataFrame de la cartelera + features, prob_local, prob_visitante y favorito."""
+    n = len(partidos)
+    mvp_l = _flag(partidos["mvp_local_lesionado"]) if "mvp_local_lesionado" in partidos else np.zeros(n)
+    mvp_v = _flag(partidos["mvp_visitante_lesionado"]) if "mvp_visitante_lesionado" in partidos else np.zeros(n)
+    X, prob = modelo.predecir_lote(partidos["local"].tolist(), partidos["visitante"].tolist(),
+                                   partidos["arbitro"].tolist(), mvp_l, mvp_v)
+
+    out = partidos.copy()
+    for i, f in enumerate(FEATURES):
+        out[f] = X[:, i]
+    out["prob_local"] = prob
+    out["prob_visitante"] = 1.0 - prob
+    out["favorito"] = np.where(prob > 0.5, out["local"], out["visitante"])
+    desconocidos = sorted(set(out["local"]).union(out["visitante"]) - set(modelo.nombres_equipos))
+    if desconocidos:
+        print(f"⚠️ Equipos sin datos (PPA por defecto): {desconocidos}")
+    return out
+
+
+def puntuar_matriz(modelo, arbitros=None):
+    """Todos los cruces local/visitante × árbitro × MVP lesionado (4 combinaciones)."""
+    arbitros = modelo.arbitros_list if not arbitros else arbitros
+    li, vi, ai, mvp_l, mvp_v, prob = modelo.matriz_completa(arbitros)
+    equipos = np.array(modelo.nombres_equipos, dtype=object)
+    nombres_arbitros = np.array(arbitros, dtype=object)
+    return pd.DataFrame({
+        "local": pd.Categorical.from_codes(li, equipos),
+        "visitante": pd.Categorical.from_codes(vi, equipos),
+        "arbitro": pd.Categorical.from_codes(ai, nombres_arbitros),
+        "mvp_local_lesionado": mvp_l.astype(np.int8),
+        "mvp_visitante_lesionado": mvp_v.astype(np.int8),
+        "prob_local": prob,
+        "prob_visitante": 1.0 - prob,
+    })
+
+
+def guardar(df, salida):
+    if salida.lower().endswith(".parquet"):
+        df.to_parquet(salida, index=False)   # requiere pyarrow
+    else:
+        df.to_csv(salida, index=False, float_format="%.6f")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predicción TrueShot por lotes")
+    sub = parser.add_subparsers(dest="modo", required=True)
+    p_cart = sub.add_parser("cartelera", help="puntúa los partidos de un CSV")
+    p_cart.add_argument("partidos", help="CSV con local, visitante, arbitro[, mvp_local_lesionado, mvp_visitante_lesionado]")
+    p_cart.add_argument("--salida", required=True, help=".csv o .parquet")
+    p_mat = sub.add_parser("matriz", help="todos los pares de equipos × árbitros × lesiones")
+    p_mat.add_argument("--arbitros", help="lista separada por comas (por defecto, todos)")
+    p_mat.add_argument("--salida", required=True, help=".csv o .parquet")
+    args = parser.parse_args()
+
+    modelo = ModeloTrueShot.cargar()
+    t0 = time.perf_counter()
+    if args.modo == "cartelera":
+        df = puntuar_cartelera(modelo, pd.read_csv(args.partidos))
+    else:
+        arbitros = [a.strip() for a in args.arbitros.split(",")] if args.arbitros else None
+        df = puntuar_matriz(modelo, arbitros)
+    t_pred = time.perf_counter() - t0
+    guardar(df, args.salida)
+    print(f"{len(df):,} filas puntuadas en {t_pred * 1000:.1f} ms "
+          f"({len(df) / max(t_pred, 1e-9) / 1e6:.1f} M filas/s) -> {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+# =======================================================
+# 🏀 TrueShot - Construcción reproducible de matriz_entrenamiento_final.csv
+# Arma la matriz de entrenamiento desde las tablas limpias (partidos, árbitros, lesiones)
+# con joins vectorizados, sin loops por fila. Por defecto las features usan los totales de
+# toda la historia, igual que las tablas con las que predice la app (PPA de la hoja Equipos);
+# con --asof cada partido solo ve la historia anterior (trueshot_asof), pero la app todavía
+# no sirve esas features, así que entrenar con ellas mete sesgo train/serve.
+# La salida por defecto es artefactos/matriz_entrenamiento_pipeline.csv: el
+# matriz_entrenamiento_final.csv versionado no se pisa salvo con --salida explícito (su
+# diff_strength viene de una definición anterior que no es la (a-b)/(a+b) de la app).
+# Cada etapa se cachea en Parquet junto con la huella de sus entradas; al volver a correr
+# solo se recalculan las etapas cuyas entradas (archivos o etapas previas) cambiaron.
+#
+#   python trueshot_matriz.py [--datos DIR] [--salida matriz.csv] [--asof] [--forzar] [--kpis DIR]
+#
+# Entradas (en --datos, por defecto TRUESHOT_DATOS_DIR o TrueShot/processed_data):
+#   clean_game.csv         game_id, game_date, season_id, team_id_home, team_id_away, wl_home, pts_home, pts_away
+#   officials_clean.csv    game_id, official_id
+#   team.csv               id, abbreviation
+#   lesiones_listas.csv    Date, Acquired, Relinquished, player_id
+# y la hoja Jugadores de datos_nba_analizados_final_v4.xlsx (MVP de cada equipo).
+# =======================================================
+
+import os
+import json
+import time
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from trueshot_modelo import BASE_DIR, MATRIZ_PATH, DATOS_NBA_PATH, SHEET_JUGADORES, FEATURES
+from trueshot_arbitros import MatrizArbitros
+from trueshot_asof import fuerza_asof, efecto_arbitro_asof
+from trueshot_referencia import leer_hoja
+from trueshot_kpis import leer_partidos, kpis_equipo_temporada, exportar_looker
+
+DATOS_DIR = os.environ.get("TRUESHOT_DATOS_DIR", os.path.join(BASE_DIR, "processed_data"))
+CACHE_DIR = os.path.join(BASE_DIR, "artefactos", "matriz_cache")
+MATRIZ_PIPELINE_PATH = os.path.join(BASE_DIR, "artefactos", "matriz_entrenamiento_pipeline.csv")
+
+ARCHIVO_PARTIDOS = "clean_game.csv"
+ARCHIVO_ARBITROS = "officials_clean.csv"
+ARCHIVO_EQUIPOS = "team.csv"
+ARCHIVO_LESIONES = "lesiones_listas.csv"
+
+OBJETIVO = 'Resultado_Real'
+
+
+# ==============================================
+# Motor de etapas con caché
+# ==============================================
+
+class Etapa:
+    """Paso del pipeline: `funcion(datos_dir, *salidas_de_dependencias) -> DataFrame`.
+
+    `archivos` son las entradas en disco (relativas a datos_dir o absolutas) y `version`
+    se sube a mano cuando cambia la lógica, para invalidar la caché.
+    """
+
+    def __init__(self, nombre, funcion, archivos=(), depende=(), version=1):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.archivos = tuple(archivos)
+        self.depende = tuple(depende)
+        self.version = version
+
+
+def _huella_archivo(path):
+    st = os.stat(path)
+    return [os.path.basename(path), st.st_size, int(st.st_mtime)]
+
+
+class Pipeline:
+    def __init__(self, etapas, datos_dir=DATOS_DIR, cache_dir=CACHE_DIR):
+        self.etapas = {e.nombre: e for e in etapas}
+        self.datos_dir = datos_dir
+        self.cache_dir = cache_dir
+        self._claves = {}
+        self._salidas = {}
+        self.recalculadas = []
+
+    def _path(self, archivo):
+        return archivo if os.path.isabs(archivo) else os.path.join(self.datos_dir, archivo)
+
+    def clave(self, nombre):
+        """Hash de la versión de la etapa, sus archivos y las claves de sus dependencias."""
+        if nombre not in self._claves:
+            etapa = self.etapas[nombre]
+            contenido = {
+                "etapa": nombre,
+                "version": etapa.version,
+                "archivos": [_huella_archivo(self._path(a)) for a in etapa.archivos],
+                "depende": [self.clave(d) for d in etapa.depende],
+            }
+            self._claves[nombre] = hashlib.sha1(json.dumps(contenido, sort_keys=True).encode()).hexdigest()
+        return self._claves[nombre]
+
+    def _cache(self, nombre):
+        return (os.path.join(self.cache_dir, f"{nombre}.parquet"),
+                os.path.join(self.cache_dir, f"{nombre}.json"))
+
+    def _en_cache(self, nombre):
+        datos, meta = self._cache(nombre)
+        try:
+            with open(meta, encoding="utf-8") as f:
+                return json.load(f).get("clave") == self.clave(nombre) and os.path.exists(datos)
+        except (OSError, ValueError):
+            return False
+
+    def salida(self, nombre, forzar=False):
+        """DataFrame de la etapa: de la caché si la clave coincide, si no la recalcula."""
+        if nombre in self._salidas:
+            return self._salidas[nombre]
+        datos, meta = self._cache(nombre)
+        if not forzar and self._en_cache(nombre):
+            df = pd.read_parquet(datos)
+        else:
+            etapa = self.etapas[nombre]
+            entradas = [self.salida(d, forzar) for d in etapa.depende]
+            t0 = time.perf_counter()
+            df = etapa.funcion(self.datos_dir, *entradas)
+            segundos = time.perf_counter() - t0
+            os.makedirs(self.cache_dir, exist_ok=True)
+            df.to_parquet(datos + ".tmp", index=False)
+            os.replace(datos + ".tmp", datos)
+            with open(meta, "w", encoding="utf-8") as f:
+                json.dump({"clave": self.clave(nombre), "filas": len(df), "segundos": round(segundos, 3),
+                           "creado": time.strftime("%Y-%m-%d %H:%M:%S")}, f, indent=1)
+            self.recalculadas.append((nombre, len(df), segundos))
+        self._salidas[nombre] = df
+        return df
+
+
+# ==============================================
+# Etapas
+# ==============================================
+
+def etapa_partidos(datos_dir):
+    """Un partido por fila, ordenado cronológicamente (temporadas nuevas quedan al final)."""
+    df = pd.read_csv(
+        os.path.join(datos_dir, ARCHIVO_PARTIDOS),
+        usecols=['game_id', 'game_date', 'season_id', 'team_id_home', 'team_id_away', 'wl_home', 'pts_home', 'pts_away'],
+        dtype={'game_id': 'int64', 'season_id': 'int64', 'team_id_home': 'int64', 'team_id_away': 'int64',
+               'wl_home': 'string', 'pts_home': 'float64', 'pts_away': 'float64'},
+        parse_dates=['game_date'])
+    df = df[df['wl_home'].isin(['W', 'L'])].drop_duplicates('game_id')
+    return pd.DataFrame({
+        'game_id': df['game_id'].to_numpy(),
+        'fecha': df['game_date'].to_numpy(),
+        'season_id': df['season_id'].to_numpy(),
+        'local_id': df['team_id_home'].to_numpy(),
+        'visitante_id': df['team_id_away'].to_numpy(),
+        'gano_local': (df['wl_home'] == 'W').to_numpy(dtype=np.int8),
+        'pts_local': df['pts_home'].to_numpy(),
+        'pts_visitante': df['pts_away'].to_numpy(),
+    }).sort_values(['fecha', 'game_id'], kind='stable', ignore_index=True)
+
+
+def etapa_arbitros(datos_dir):
+    """Filas partido × árbitro (todas las del cuerpo arbitral, en el orden del archivo)."""
+    df = pd.read_csv(os.path.join(datos_dir, ARCHIVO_ARBITROS), usecols=['game_id', 'official_id'],
+                     dtype={'game_id': 'int64', 'official_id': 'int64'})
+    return df.drop_duplicates(ignore_index=True)
+
+
+def etapa_fuerza(datos_dir, partidos):
+    """PPA de local y visitante por partido con toda la historia: promedio de puntos anotados
+    de local y de visitante de cada equipo (como la hoja Equipos)."""
+    local = partidos.groupby('local_id')['pts_local'].mean()
+    visitante = partidos.groupby('visitante_id')['pts_visitante'].mean()
+    ppa = (local + visitante.reindex(local.index)) / 2
+    return pd.DataFrame({'game_id': partidos['game_id'].to_numpy(),
+                         'ppa_local': ppa.reindex(partidos['local_id']).to_numpy(),
+                         'ppa_visitante': ppa.reindex(partidos['visitante_id']).to_numpy()})
+
+
+def etapa_fuerza_asof(datos_dir, partidos):
+    """PPA de local y visitante con solo los partidos anteriores a cada uno."""
+    return fuerza_asof(partidos)
+
+
+def etapa_efecto_arbitro(datos_dir, partidos, arbitros):
+    """referee_effect por partido con el árbitro principal (el primero listado del cuerpo arbitral).
+
+    Las victorias se cuentan con todos los árbitros de cada partido en la matriz densa
+    [árbitro, equipo], igual que la hoja Arbitros_y_Victorias que usa la app.
+    """
+    filas = arbitros.merge(partidos[['game_id', 'local_id', 'visitante_id', 'gano_local']], on='game_id')
+    matriz = MatrizArbitros.desde_partidos(filas['official_id'], filas['local_id'], filas['visitante_id'],
+                                          filas['gano_local'])
+    principal = filas.drop_duplicates('game_id')
+    return pd.DataFrame({
+        'game_id': principal['game_id'].to_numpy(),
+        'referee_effect': matriz.efecto_nombres(principal['official_id'].tolist(), principal['local_id'].tolist(),
+                                                principal['visitante_id'].tolist()).astype(np.float64),
+    })
+
+
+def etapa_efecto_arbitro_asof(datos_dir, partidos, arbitros):
+    """referee_effect del árbitro principal con las victorias previas a cada partido."""
+    return efecto_arbitro_asof(partidos, arbitros)
+
+
+def etapa_kpis_equipo(datos_dir):
+    """KPIs de eficiencia (Net Rating, TS%, eFG%, Pace...) promedio por equipo y temporada."""
+    return kpis_equipo_temporada(leer_partidos(os.path.join(datos_dir, ARCHIVO_PARTIDOS)))
+
+
+def etapa_estrellas(datos_dir):
+    """MVP de cada equipo (hoja Jugadores) con el team_id de su equipo más reciente."""
+    jugadores = leer_hoja(SHEET_JUGADORES)
+    equipos = pd.read_csv(os.path.join(datos_dir, ARCHIVO_EQUIPOS), usecols=['id', 'abbreviation'])
+    mvp = jugadores[jugadores['Jugador más valioso (Punto 9)'] == 'Sí']
+    # la hoja trae el id como Int64 nullable: un MVP sin id no se puede cruzar con las lesiones
+    mvp = mvp.dropna(subset=['id player (Punto 1)'])
+    estrellas = mvp.merge(equipos, left_on='Equipo más reciente', right_on='abbreviation')
+    return pd.DataFrame({'team_id': estrellas['id'].astype('int64').to_numpy(),
+                         'player_id': estrellas['id player (Punto 1)'].astype('int64').to_numpy()})
+
+
+def etapa_lesiones(datos_dir):
+    """Eventos de la lista de lesionados: Relinquished = sale (lesionado=1), Acquired = vuelve (0)."""
+    df = pd.read_csv(os.path.join(datos_dir, ARCHIVO_LESIONES), usecols=['Date', 'Acquired', 'Relinquished', 'player_id'],
+                     parse_dates=['Date'])
+    df = df.dropna(subset=['Date', 'player_id'])
+    sale, vuelve = df['Relinquished'].notna(), df['Acquired'].notna()
+    df = df[sale ^ vuelve]
+    return pd.DataFrame({
+        'player_id': df['player_id'].astype('int64').to_numpy(),
+        'fecha': df['Date'].to_numpy(),
+        'lesionado': df['Relinquished'].notna().to_numpy(dtype=np.int8),
+    }).sort_values(['fecha', 'player_id'], kind='stable', ignore_index=True)
+
+
+def _estrella_lesionada(partidos, estrellas, lesiones, lado):
+    """1 si alguna estrella del equipo `lado` estaba en la lista de lesionados antes del partido."""
+    jugadores = partidos[['game_id', 'fecha', lado]].merge(estrellas, left_on=lado, right_on='team_id')
+    if jugadores.empty or lesiones.empty:
+        return pd.Series(0.0, index=partidos['game_id'])
+    estado = pd.merge_asof(jugadores.sort_values('fecha'), lesiones, on='fecha', by='player_id',
+                           allow_exact_matches=False)
+    por_partido = estado['lesionado'].fillna(0).groupby(estado['game_id']).max()
+    return por_partido.reindex(partidos['game_id'], fill_value=0).astype(np.float64)
+
+
+def etapa_matriz(datos_dir, partidos, fuerza, efecto, estrellas, lesiones):
+    """Features en el orden de FEATURES + Resultado_Real, una fila por partido."""
+    fuerza = fuerza.set_index('game_id').reindex(partidos['game_id'])
+    ppa_l, ppa_v = fuerza['ppa_local'].to_numpy(), fuerza['ppa_visitante'].to_numpy()
+    ref = efecto.set_index('game_id')['referee_effect'].reindex(partidos['game_id'], fill_value=0.0).to_numpy()
+    return pd.DataFrame({
+        'diff_strength': (ppa_l - ppa_v) / (ppa_l + ppa_v),
+        'Localia': 1.0,
+        'star_home_is_injured': _estrella_lesionada(partidos, estrellas, lesiones, 'local_id').to_numpy(),
+        'star_away_is_injured': _estrella_lesionada(partidos, estrellas, lesiones, 'visitante_id').to_numpy(),
+        'referee_effect': ref,
+        OBJETIVO: partidos['gano_local'].to_numpy(dtype=np.int64),
+    })[FEATURES + [OBJETIVO]]
+
+
+ETAPAS = [
+    Etapa('partidos', etapa_partidos, archivos=[ARCHIVO_PARTIDOS]),
+    Etapa('arbitros', etapa_arbitros, archivos=[ARCHIVO_ARBITROS]),
+    Etapa('fuerza', etapa_fuerza, depende=['partidos'], version=2),
+    Etapa('efecto_arbitro', etapa_efecto_arbitro, depende=['partidos', 'arbitros']),
+    Etapa('fuerza_asof', etapa_fuerza_asof, depende=['partidos']),
+    Etapa('efecto_arbitro_asof', etapa_efecto_arbitro_asof, depende=['partidos', 'arbitros']),
+    Etapa('kpis_equipo', etapa_kpis_equipo, archivos=[ARCHIVO_PARTIDOS]),
+    Etapa('estrellas', etapa_estrellas, archivos=[DATOS_NBA_PATH, ARCHIVO_EQUIPOS]),
+    Etapa('lesiones', etapa_lesiones, archivos=[ARCHIVO_LESIONES]),
+    Etapa('matriz', etapa_matriz, depende=['partidos', 'fuerza_asof', 'efecto_arbitro_asof', 'estrellas', 'lesiones']),
+    Etapa('matriz_historica', etapa_matriz, depende=['partidos', 'fuerza', 'efecto_arbitro', 'estrellas', 'lesiones'],
+          version=2),
+]
+
+
+def construir_matriz(datos_dir=DATOS_DIR, salida=MATRIZ_PIPELINE_PATH, forzar=False, cache_dir=CACHE_DIR, asof=False):
+    """Corre el pipeline y escribe la matriz en `salida` (solo si cambió alguna etapa).
+
+    Por defecto las features usan los totales de toda la historia, como las que sirve la app
+    (con fuga: un partido ve resultados posteriores). Con `asof` cada partido solo ve los
+    anteriores; usarla para entrenar recién cuando la app sirva las mismas features.
+    """
+    pipeline = Pipeline(ETAPAS, datos_dir, cache_dir)
+    final = 'matriz' if asof else 'matriz_historica'
+    en_cache = not forzar and pipeline._en_cache(final) and os.path.exists(salida)
+    matriz = pipeline.salida(final, forzar)
+    if not en_cache:
+        os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+        tmp = salida + ".tmp"
+        matriz.to_csv(tmp, index=False)
+        os.replace(tmp, salida)
+    return matriz, pipeline.recalculadas
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Construye matriz_entrenamiento_final.csv desde las tablas limpias")
+    parser.add_argument("--datos", default=DATOS_DIR, help="carpeta con las tablas limpias")
+    parser.add_argument("--salida", default=MATRIZ_PIPELINE_PATH,
+                        help=f"CSV de salida (para reemplazar la matriz de entrenamiento: {MATRIZ_PATH})")
+    parser.add_argument("--asof", action="store_true",
+                        help="features as-of (solo la historia anterior); la app todavía sirve las históricas")
+    parser.add_argument("--forzar", action="store_true", help="ignora la caché de etapas")
+    parser.add_argument("--kpis", metavar="DIR", help="exporta además las tablas de KPIs para Looker en DIR")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.asof and os.path.abspath(args.salida) == os.path.abspath(MATRIZ_PATH):
+        print("  ⚠️ matriz as-of sobre la matriz de entrenamiento: la app predice con features históricas")
+    matriz, recalculadas = construir_matriz(args.datos, args.salida, args.forzar, asof=args.asof)
+    for nombre, filas, segundos in recalculadas:
+        print(f"  ⚙️ {nombre:<20} {filas:>10,} filas  {segundos:.2f}s")
+    if args.kpis:
+        exportar_looker(Pipeline(ETAPAS, args.datos, CACHE_DIR).salida('kpis_equipo', args.forzar), args.kpis)
+        print(f"  📊 KPIs por equipo/temporada -> {args.kpis}")
+    if not recalculadas:
+        print("  ✔ todas las etapas en caché")
+    print(f"Matriz: {len(matriz):,} filas en {time.perf_counter() - t0:.2f}s -> {args.salida}")
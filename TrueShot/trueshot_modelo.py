@@ -0,0 +1,289 @@
+# =======================================================
+# 🏀 TrueShot - Modelo y tablas de referencia precalculadas
+# El modelo de Regresión Logística y los diccionarios que usa la interfaz (fuerza de equipos,
+# MVP lesionados, victorias por árbitro) se construyen una vez y se guardan en un JSON.
+# La app solo lee ese JSON: no entrena ni abre el Excel al arrancar (ni importa sklearn).
+#
+#   python trueshot_modelo.py --rebuild    # regenera el artefacto desde el CSV y el Excel
+# =======================================================
+
+import os
+import json
+import math
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Fuentes
+MATRIZ_PATH = os.path.join(BASE_DIR, "matriz_entrenamiento_final.csv")
+DATOS_NBA_PATH = os.path.join(BASE_DIR, "datos_nba_analizados_final_v4.xlsx")
+SHEET_EQUIPOS = "Equipos"
+SHEET_JUGADORES = "Jugadores"
+SHEET_ARBITROS = "Arbitros_y_Victorias"
+
+# Artefacto generado (no versionado: se reconstruye si falta o si cambian las fuentes)
+ARTEFACTO_PATH = os.path.join(BASE_DIR, "artefactos", "trueshot_modelo.json")
+ARTEFACTO_VERSION = 2
+
+FEATURES = ['diff_strength', 'Localia', 'star_home_is_injured', 'star_away_is_injured', 'referee_effect']
+PPA_POR_DEFECTO = 100
+
+
+def _huella_fuentes():
+    """Tamaño y fecha de modificación de las fuentes: si cambian, el artefacto está vencido."""
+    huella = {}
+    for path in (MATRIZ_PATH, DATOS_NBA_PATH):
+        st = os.stat(path)
+        huella[os.path.basename(path)] = [st.st_size, int(st.st_mtime)]
+    return huella
+
+
+# ==============================================
+# Construcción (lenta: pandas + entrenamiento)
+# ==============================================
+
+def construir_artefacto(path=ARTEFACTO_PATH, reentrenar_completo=False):
+    """Actualiza el modelo, arma las tablas de referencia y las escribe en `path`.
+
+    El modelo sale de trueshot_entrenamiento: si la matriz solo creció, se entrena
+    sobre las filas nuevas partiendo de la versión anterior.
+    """
+    from trueshot_entrenamiento import actualizar_modelo
+    from trueshot_arbitros import MatrizArbitros
+    from trueshot_referencia import leer_hoja
+
+    # 1. Modelo (versión incremental sobre la matriz de entrenamiento)
+    modelo = actualizar_modelo(completo=reentrenar_completo)
+
+    # 2. Tablas de referencia (Feather exportado del Excel; se re-exporta solo si el Excel cambió)
+    df_equipos = leer_hoja(SHEET_EQUIPOS)
+    df_jugadores = leer_hoja(SHEET_JUGADORES)
+    df_arbitros = leer_hoja(SHEET_ARBITROS)
+
+    df_equipos['PPA_Total'] = (df_equipos['promedio de puntos ANOTADOS de local'] + df_equipos['promedio de puntos ANOTADOS de visitante']) / 2
+    equipos = df_equipos.set_index('nickname (Punto 2)')
+    mvp = df_jugadores[df_jugadores['Jugador más valioso (Punto 9)'] == 'Sí']
+    # matriz densa [árbitro, equipo] con los ejes alineados a los equipos del modelo
+    matriz_arbitros = MatrizArbitros.desde_registros(
+        df_arbitros['nombre arbitro (Punto 3)'], df_arbitros['nombre equipo'],
+        df_arbitros['número de victorias del equipo con este árbitro (Punto 6)'],
+        nombres_equipos=sorted(set(equipos.index)))
+
+    artefacto = {
+        "version": ARTEFACTO_VERSION,
+        "fuentes": _huella_fuentes(),
+        "creado": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "modelo": {
+            "features": FEATURES,
+            "coef": modelo["coef"],
+            "intercept": modelo["intercept"],
+            "version": modelo["version"],
+            "filas": modelo["filas"],
+        },
+        "equipos_ppa": {k: float(v) for k, v in equipos['PPA_Total'].items()},
+        "equipos_id": {k: int(v) for k, v in equipos['id team (Punto 2)'].items()},
+        "mvp_lesionados": {str(k): v for k, v in mvp.set_index('Equipo más reciente')['Estado MVP (Punto 9)'].items()},
+        "arbitros": matriz_arbitros.arbitros,
+        "arbitros_matriz": matriz_arbitros.a_json(),
+    }
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(artefacto, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+    return artefacto
+
+
+def _leer_artefacto(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            artefacto = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if artefacto.get("version") != ARTEFACTO_VERSION:
+        return None
+    try:
+        if artefacto.get("fuentes") != _huella_fuentes():
+            return None
+    except OSError:
+        pass  # sin fuentes en disco (p.ej. solo se distribuyó el artefacto): se usa tal cual
+    return artefacto
+
+
+# ==============================================
+# Servicio de predicción (rápido: solo el JSON)
+# ==============================================
+
+class ModeloTrueShot:
+    """Modelo y tablas de referencia en memoria, cargados una sola vez.
+
+    La probabilidad se calcula con los coeficientes guardados (sigmoide de X·coef + intercept),
+    que es exactamente lo que hace LogisticRegression.predict_proba para el caso binario.
+    """
+
+    def __init__(self, artefacto):
+        modelo = artefacto["modelo"]
+        self.features = modelo["features"]
+        self.coef = modelo["coef"]
+        self.intercept = modelo["intercept"]
+        self.equipos_dict = artefacto["equipos_ppa"]
+        self.equipos_id_dict = artefacto["equipos_id"]
+        self.mvp_lesionados_dict = artefacto["mvp_lesionados"]
+        self.arbitros_list = artefacto["arbitros"]
+        self.nombres_equipos = sorted(self.equipos_dict.keys())
+        # referee_effect: filas densas de la matriz [árbitro, equipo] (listas para la predicción
+        # individual; la versión numpy se arma recién en el primer lote)
+        self._arbitros_json = artefacto["arbitros_matriz"]
+        self._fila_arbitro = {a: i for i, a in enumerate(self._arbitros_json["arbitros"])}
+        self._col_equipo = {e: i for i, e in enumerate(self._arbitros_json["equipos"])}
+        self._tablas_np = None
+
+    @classmethod
+    def cargar(cls, path=ARTEFACTO_PATH):
+        """Lee el artefacto; si falta o quedó viejo respecto de las fuentes, lo reconstruye."""
+        artefacto = _leer_artefacto(path)
+        if artefacto is None:
+            artefacto = construir_artefacto(path)
+        return cls(artefacto)
+
+    @property
+    def arbitros_dict(self):
+        """Vista {(árbitro, equipo): victorias} con la forma del diccionario original de la interfaz."""
+        equipos = self._arbitros_json["equipos"]
+        return {(a, equipos[j]): v
+                for a, fila in zip(self._arbitros_json["arbitros"], self._arbitros_json["victorias"])
+                for j, v in enumerate(fila) if v}
+
+    def victorias_arbitro(self, arbitro, equipo):
+        i, j = self._fila_arbitro.get(arbitro), self._col_equipo.get(equipo)
+        return 0 if i is None or j is None else self._arbitros_json["victorias"][i][j]
+
+    def calcular_factor_arbitro(self, local, visitante, arbitro_seleccionado):
+        """Factor de sesgo del árbitro (Victorias Local - Victorias Visitante)."""
+        victorias_local = self.victorias_arbitro(arbitro_seleccionado, local)
+        victorias_visitante = self.victorias_arbitro(arbitro_seleccionado, visitante)
+        return victorias_local - victorias_visitante, victorias_local, victorias_visitante
+
+    def probabilidad_local(self, x):
+        z = self.intercept + sum(c * v for c, v in zip(self.coef, x))
+        return 1.0 / (1.0 + math.exp(-z))
+
+    # ----- lotes (numpy, importado recién acá para no demorar el arranque de la interfaz) -----
+    def _tablas(self):
+        """(matriz de árbitros, vector de PPA) alineados por índice de equipo.
+
+        El último índice de cada eje es el "desconocido": PPA por defecto y 0 victorias,
+        igual que los .get(..., default) de la predicción individual.
+        """
+        if self._tablas_np is None:
+            import numpy as np
+            from trueshot_arbitros import MatrizArbitros
+            matriz = MatrizArbitros.desde_json(self._arbitros_json)
+            if matriz.equipos != self.nombres_equipos:
+                raise ValueError("la matriz de árbitros no está alineada con los equipos del artefacto")
+            ppa = np.array([self.equipos_dict[e] for e in self.nombres_equipos] + [PPA_POR_DEFECTO], dtype=np.float64)
+            self._tablas_np = (matriz, ppa)
+        return self._tablas_np
+
+    @property
+    def matriz_arbitros(self):
+        return self._tablas()[0]
+
+    def features_lote(self, locales, visitantes, arbitros, mvp_local=None, mvp_visitante=None):
+        """Matriz (n, 5) de features en el orden de FEATURES para n partidos."""
+        import numpy as np
+        matriz, ppa = self._tablas()
+        li = matriz.indices_equipos(locales)
+        vi = matriz.indices_equipos(visitantes)
+        ai = matriz.indices_arbitros(arbitros)
+        n = len(li)
+        X = np.empty((n, len(FEATURES)), dtype=np.float64)
+        X[:, 0] = (ppa[li] - ppa[vi]) / (ppa[li] + ppa[vi])
+        X[:, 1] = 1.0
+        X[:, 2] = np.zeros(n) if mvp_local is None else np.asarray(mvp_local, dtype=np.float64)
+        X[:, 3] = np.zeros(n) if mvp_visitante is None else np.asarray(mvp_visitante, dtype=np.float64)
+        X[:, 4] = matriz.efecto(ai, li, vi)
+        return X
+
+    def probabilidades(self, X):
+        """P(gana local) para cada fila de X: una sola operación matricial."""
+        import numpy as np
+        z = X @ np.asarray(self.coef, dtype=np.float64) + self.intercept
+        return 1.0 / (1.0 + np.exp(-z))
+
+    def predecir_lote(self, locales, visitantes, arbitros, mvp_local=None, mvp_visitante=None):
+        """(X, prob_local) para una cartelera completa; X trae las features de cada partido."""
+        X = self.features_lote(locales, visitantes, arbitros, mvp_local, mvp_visitante)
+        return X, self.probabilidades(X)
+
+    def matriz_completa(self, arbitros=None):
+        """Todos los pares ordenados de equipos × árbitros × las 4 combinaciones de MVP lesionado.
+
+        Devuelve (local_idx, visitante_idx, arbitro_idx, mvp_local, mvp_visitante, prob_local)
+        como arrays planos; el modelo es lineal en las features, así que z se arma por broadcasting
+        sobre (pares, árbitros, lesiones) sin materializar la matriz de features.
+        """
+        import numpy as np
+        matriz, ppa = self._tablas()
+        arbitros = self.arbitros_list if arbitros is None else arbitros
+        ai = matriz.indices_arbitros(arbitros)
+        n_eq = len(matriz.equipos)
+        li, vi = np.nonzero(~np.eye(n_eq, dtype=bool))            # 870 pares ordenados con 30 equipos
+        lesion = np.array([[0, 0], [1, 0], [0, 1], [1, 1]], dtype=np.float64)
+
+        c = np.asarray(self.coef, dtype=np.float64)
+        diff = (ppa[li] - ppa[vi]) / (ppa[li] + ppa[vi])                       # (P,)
+        ref = matriz.efecto(ai[:, None], li[None, :], vi[None, :])            # (A, P)
+        z = (self.intercept + c[1]
+             + (c[0] * diff)[:, None, None]
+             + (c[4] * ref.T)[:, :, None]
+             + (lesion @ c[2:4])[None, None, :])                               # (P, A, 4)
+        prob = 1.0 / (1.0 + np.exp(-z))
+
+        P, A, L = prob.shape
+        return (np.repeat(li, A * L), np.repeat(vi, A * L),
+                np.tile(np.repeat(np.arange(A), L), P),
+                np.tile(lesion[:, 0], P * A), np.tile(lesion[:, 1], P * A),
+                prob.ravel())
+
+    def predecir(self, local, visitante, arbitro_seleccionado, mvp_local_lesionado=False, mvp_visitante_lesionado=False):
+        """Misma salida que hacer_prediccion: (prob_local, prob_visitante, ganador, resumen)."""
+        ppa_local = self.equipos_dict.get(local, PPA_POR_DEFECTO)
+        ppa_visitante = self.equipos_dict.get(visitante, PPA_POR_DEFECTO)
+        diff_strength = (ppa_local - ppa_visitante) / (ppa_local + ppa_visitante)
+        localia = 1.0
+        star_home_is_injured = 1.0 if mvp_local_lesionado else 0.0
+        star_away_is_injured = 1.0 if mvp_visitante_lesionado else 0.0
+        referee_effect, victorias_local, victorias_visitante = self.calcular_factor_arbitro(local, visitante, arbitro_seleccionado)
+
+        prob_local = self.probabilidad_local([diff_strength, localia, star_home_is_injured, star_away_is_injured, referee_effect])
+        prob_visitante = 1.0 - prob_local
+        ganador = local if prob_local > prob_visitante else visitante
+
+        return prob_local, prob_visitante, ganador, {
+            "diff_strength": diff_strength,
+            "star_home_is_injured": star_home_is_injured,
+            "star_away_is_injured": star_away_is_injured,
+            "referee_effect": referee_effect,
+            "victorias_local_arbitro": victorias_local,
+            "victorias_visitante_arbitro": victorias_visitante
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Artefacto precalculado del modelo TrueShot")
+    parser.add_argument("--rebuild", action="store_true", help="regenera el artefacto desde el CSV y el Excel")
+    parser.add_argument("--completo", action="store_true", help="con --rebuild, reentrena sobre toda la matriz")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.rebuild:
+        construir_artefacto(reentrenar_completo=args.completo)
+        print(f"Artefacto regenerado en {time.perf_counter() - t0:.2f}s: {ARTEFACTO_PATH}")
+    else:
+        modelo = ModeloTrueShot.cargar()
+        print(f"Artefacto cargado en {(time.perf_counter() - t0) * 1000:.1f} ms: "
+              f"{len(modelo.nombres_equipos)} equipos, {len(modelo.arbitros_list)} árbitros")
@@ -0,0 +1,108 @@
+# =======================================================
+# 🏀 TrueShot - Tablas de referencia en formato columnar (Feather)
+# Las hojas de datos_nba_analizados_final_v4.xlsx se exportan una sola vez a Feather sin
+# compresión, con solo las columnas que se usan y los nombres (equipos, árbitros, flags)
+# como categóricos. Leerlas es un memory-map en lugar de parsear el .xlsx con openpyxl.
+# Si el Excel cambia (tamaño / fecha), la exportación se rehace sola al leer.
+#
+#   python trueshot_referencia.py    # exporta (o re-exporta) las hojas
+# =======================================================
+
+import os
+import json
+import time
+
+import pandas as pd
+
+from trueshot_modelo import BASE_DIR, DATOS_NBA_PATH, SHEET_EQUIPOS, SHEET_JUGADORES, SHEET_ARBITROS
+
+REFERENCIA_DIR = os.path.join(BASE_DIR, "artefactos", "referencia")
+HUELLA_PATH = os.path.join(REFERENCIA_DIR, "huella.json")
+
+# Columnas que se usan de cada hoja y su tipo
+COLUMNAS = {
+    SHEET_EQUIPOS: {
+        'id team (Punto 2)': 'int64',
+        'nickname (Punto 2)': 'category',
+        'promedio de puntos ANOTADOS de local': 'float64',
+        'promedio de puntos ANOTADOS de visitante': 'float64',
+    },
+    SHEET_JUGADORES: {
+        'id player (Punto 1)': 'int64',
+        'Equipo más reciente': 'category',
+        'Jugador más valioso (Punto 9)': 'category',
+        'Estado MVP (Punto 9)': 'category',
+    },
+    SHEET_ARBITROS: {
+        'nombre arbitro (Punto 3)': 'category',
+        'nombre equipo': 'category',
+        'número de victorias del equipo con este árbitro (Punto 6)': 'int64',
+    },
+}
+
+
+def _path_hoja(hoja):
+    return os.path.join(REFERENCIA_DIR, f"{hoja}.feather")
+
+
+def _huella_excel():
+    st = os.stat(DATOS_NBA_PATH)
+    return [os.path.basename(DATOS_NBA_PATH), st.st_size, int(st.st_mtime)]
+
+
+def _vigente():
+    try:
+        with open(HUELLA_PATH, encoding="utf-8") as f:
+            huella = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if huella.get("columnas") != {h: list(c) for h, c in COLUMNAS.items()}:
+        return False
+    if not all(os.path.exists(_path_hoja(h)) for h in COLUMNAS):
+        return False
+    try:
+        return huella.get("excel") == _huella_excel()
+    except OSError:
+        return True   # sin el Excel en disco (solo se distribuyó la exportación): se usa tal cual
+
+
+def exportar_referencia():
+    """Lee el Excel una sola vez (todas las hojas juntas) y escribe una .feather por hoja."""
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    hojas = pd.read_excel(DATOS_NBA_PATH, sheet_name=list(COLUMNAS),
+                          usecols=lambda c: any(c in cols for cols in COLUMNAS.values()))
+    os.makedirs(REFERENCIA_DIR, exist_ok=True)
+    for hoja, columnas in COLUMNAS.items():
+        df = hojas[hoja][list(columnas)]
+        df = df.astype({c: t for c, t in columnas.items() if t != 'int64'})
+        # enteros con nulos (filas incompletas del Excel) quedan como Int64 nullable
+        df = df.astype({c: ('int64' if not df[c].isna().any() else 'Int64') for c, t in columnas.items() if t == 'int64'})
+        tmp = _path_hoja(hoja) + ".tmp"
+        feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), tmp, compression="uncompressed")
+        os.replace(tmp, _path_hoja(hoja))
+    with open(HUELLA_PATH, "w", encoding="utf-8") as f:
+        json.dump({"excel": _huella_excel(), "columnas": {h: list(c) for h, c in COLUMNAS.items()},
+                   "creado": time.strftime("%Y-%m-%d %H:%M:%S")}, f, ensure_ascii=False, indent=1)
+
+
+def leer_hoja(hoja):
+    """DataFrame tipado de una hoja (memory-map de la .feather; exporta antes si hace falta)."""
+    import pyarrow.feather as feather
+
+    if not _vigente():
+        exportar_referencia()
+    return feather.read_table(_path_hoja(hoja), memory_map=True).to_pandas()
+
+
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    exportar_referencia()
+    t_export = time.perf_counter() - t0
+    for hoja in COLUMNAS:
+        t0 = time.perf_counter()
+        df = leer_hoja(hoja)
+        print(f"  {hoja:<22} {len(df):>6,} filas  {os.path.getsize(_path_hoja(hoja)) / 1024:>7.1f} KB  "
+              f"lectura {(time.perf_counter() - t0) * 1000:.1f} ms")
+    print(f"Exportado en {t_export:.2f}s -> {REFERENCIA_DIR}")
@@ -0,0 +1,276 @@
+# =======================================================
+# 🏀 TrueShot - Servidor HTTP de predicción (asyncio, sin dependencias externas)
+# El modelo y las tablas se cargan una sola vez; los requests concurrentes se agrupan
+# en micro-lotes y cada lote se resuelve con una sola llamada a predecir_lote.
+#
+#   python trueshot_servidor.py [--host 127.0.0.1] [--port 8765]
+#
+#   GET  /health       -> {"status": "ok", ...}
+#   GET  /equipos      -> lista de equipos
+#   GET  /arbitros     -> lista de árbitros
+#   POST /prediccion   {"local": "...", "visitante": "...", "arbitro": "...",
+#                       "mvp_local_lesionado": false, "mvp_visitante_lesionado": false}
+# =======================================================
+
+import argparse
+import asyncio
+import json
+import time
+
+from trueshot_modelo import ModeloTrueShot, FEATURES
+
+MAX_LOTE = 256           # requests por llamada al modelo
+VENTANA_LOTE_MS = 2.0    # espera máxima para juntar un lote una vez que llegó el primero
+MAX_BODY = 64 * 1024    # bytes de cuerpo por request
+MAX_HEADERS = 100
+
+RAZONES = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ErrorPedido(Exception):
+    def __init__(self, status, mensaje):
+        super().__init__(mensaje)
+        self.status = status
+
+
+class MicroLotes:
+    """Cola de predicciones pendientes que un único worker resuelve de a lotes.
+
+    El primer request de un lote espera como mucho `ventana_ms` a que lleguen otros;
+    con carga baja eso es casi nada de latencia extra y con carga alta evita una
+    llamada al modelo por request.
+    """
+
+    def __init__(self, modelo, max_lote=MAX_LOTE, ventana_ms=VENTANA_LOTE_MS):
+        self.modelo = modelo
+        self.max_lote = max_lote
+        self.ventana = ventana_ms / 1000.0
+        self.cola = asyncio.Queue()
+        self.lotes = 0
+        self.predicciones = 0
+
+    async def predecir(self, partido):
+        fut = asyncio.get_running_loop().create_future()
+        await self.cola.put((partido, fut))
+        return await fut
+
+    async def correr(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self.cola.get()]
+            limite = loop.time() + self.ventana
+            while len(lote) < self.max_lote:
+                restante = limite - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(await asyncio.wait_for(self.cola.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+            self._resolver(lote)
+
+    def _predecir(self, partidos):
+        return self.modelo.predecir_lote(
+            [p["local"] for p in partidos], [p["visitante"] for p in partidos],
+            [p["arbitro"] for p in partidos],
+            [p["mvp_local_lesionado"] for p in partidos], [p["mvp_visitante_lesionado"] for p in partidos])
+
+    def _resolver(self, lote):
+        try:
+            X, prob = self._predecir([p for p, _ in lote])
+        except Exception:
+            # un pedido malo no tiene que tumbar a los demás del lote: se resuelve de a uno
+            # y solo falla el que falla
+            for item in lote:
+                self._resolver_uno(item)
+            return
+        self.lotes += 1
+        self.predicciones += len(lote)
+        for i, (p, fut) in enumerate(lote):
+            if fut.done():   # el cliente se fue
+                continue
+            try:
+                fut.set_result(self._respuesta(p, X[i], prob[i]))
+            except Exception as e:
+                fut.set_exception(e)
+
+    def _resolver_uno(self, item):
+        p, fut = item
+        if fut.done():
+            return
+        try:
+            X, prob = self._predecir([p])
+            respuesta = self._respuesta(p, X[0], prob[0])
+        except Exception as e:
+            fut.set_exception(e)
+            return
+        self.predicciones += 1
+        fut.set_result(respuesta)
+
+    def _respuesta(self, p, x, prob):
+        prob_local = float(prob)
+        fila = dict(zip(FEATURES, x.tolist()))
+        return {
+            "local": p["local"],
+            "visitante": p["visitante"],
+            "arbitro": p["arbitro"],
+            "prob_local": prob_local,
+            "prob_visitante": 1.0 - prob_local,
+            "ganador": p["local"] if prob_local > 0.5 else p["visitante"],
+            "resumen": {
+                "diff_strength": fila["diff_strength"],
+                "star_home_is_injured": fila["star_home_is_injured"],
+                "star_away_is_injured": fila["star_away_is_injured"],
+                "referee_effect": fila["referee_effect"],
+                "victorias_local_arbitro": self.modelo.victorias_arbitro(p["arbitro"], p["local"]),
+                "victorias_visitante_arbitro": self.modelo.victorias_arbitro(p["arbitro"], p["visitante"]),
+            },
+        }
+
+
+class ServidorTrueShot:
+    def __init__(self, modelo, max_lote=MAX_LOTE, ventana_ms=VENTANA_LOTE_MS):
+        self.modelo = modelo
+        self.lotes = MicroLotes(modelo, max_lote, ventana_ms)
+        self.inicio = time.time()
+
+    def validar(self, cuerpo):
+        try:
+            datos = json.loads(cuerpo or b"{}")
+        except ValueError:
+            raise ErrorPedido(400, "JSON inválido")
+        if not isinstance(datos, dict):
+            raise ErrorPedido(400, "se espera un objeto JSON")
+        faltan = [k for k in ("local", "visitante", "arbitro") if not datos.get(k)]
+        if faltan:
+            raise ErrorPedido(400, f"faltan campos: {', '.join(faltan)}")
+        for k in ("local", "visitante", "arbitro"):
+            if not isinstance(datos[k], str):
+                raise ErrorPedido(400, f"'{k}' debe ser un texto")
+        for k in ("local", "visitante"):
+            if datos[k] not in self.modelo.equipos_dict:
+                raise ErrorPedido(400, f"equipo desconocido: {datos[k]}")
+        if datos["local"] == datos["visitante"]:
+            raise ErrorPedido(400, "el equipo local y el visitante no pueden ser el mismo")
+        flags = {}
+        for k in ("mvp_local_lesionado", "mvp_visitante_lesionado"):
+            v = datos.get(k, False)
+            # bool es subclase de int: true/false y 0/1 pasan, 2, "si" o null no
+            if not isinstance(v, (bool, int)) or v not in (0, 1):
+                raise ErrorPedido(400, f"'{k}' debe ser true/false o 0/1")
+            flags[k] = float(v)
+        return {
+            "local": datos["local"],
+            "visitante": datos["visitante"],
+            "arbitro": datos["arbitro"],
+            **flags,
+        }
+
+    async def despachar(self, metodo, ruta, cuerpo):
+        ruta = ruta.split("?", 1)[0]
+        if ruta == "/health":
+            return 200, {"status": "ok", "uptime_s": round(time.time() - self.inicio, 1),
+                         "equipos": len(self.modelo.nombres_equipos), "lotes": self.lotes.lotes,
+                         "predicciones": self.lotes.predicciones}
+        if ruta == "/equipos":
+            return 200, self.modelo.nombres_equipos
+        if ruta == "/arbitros":
+            return 200, self.modelo.arbitros_list
+        if ruta == "/prediccion":
+            if metodo != "POST":
+                raise ErrorPedido(405, "usar POST")
+            return 200, await self.lotes.predecir(self.validar(cuerpo))
+        raise ErrorPedido(404, f"ruta desconocida: {ruta}")
+
+    async def atender(self, reader, writer):
+        """Una conexión HTTP/1.1 (con keep-alive)."""
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                try:
+                    metodo, ruta, version = linea.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers = {}
+                lineas = 0
+                while lineas <= MAX_HEADERS:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    lineas += 1
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                try:
+                    largo = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    largo = -1
+                mantener = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+
+                # sin un largo válido no se sabe dónde termina el cuerpo: se responde y se cierra
+                if largo < 0:
+                    status, cuerpo_resp = 400, {"error": "Content-Length inválido"}
+                    mantener = False
+                elif lineas > MAX_HEADERS:
+                    status, cuerpo_resp = 400, {"error": "demasiados headers"}
+                    mantener = False
+                elif largo > MAX_BODY:
+                    status, cuerpo_resp = 413, {"error": "cuerpo demasiado grande"}
+                    mantener = False
+                else:
+                    cuerpo = await reader.readexactly(largo) if largo else b""
+                    try:
+                        status, cuerpo_resp = await self.despachar(metodo, ruta, cuerpo)
+                    except ErrorPedido as e:
+                        status, cuerpo_resp = e.status, {"error": str(e)}
+                    except Exception as e:
+                        status, cuerpo_resp = 500, {"error": str(e)}
+
+                datos = json.dumps(cuerpo_resp, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {RAZONES.get(status, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(datos)}\r\n"
+                    f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n".encode("latin-1") + datos)
+                await writer.drain()
+                if not mantener:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def servir(self, host, port):
+        worker = asyncio.create_task(self.lotes.correr())
+        servidor = await asyncio.start_server(self.atender, host, port, backlog=1024)
+        print(f"TrueShot escuchando en http://{host}:{port} (lotes de hasta {self.lotes.max_lote}, "
+              f"ventana {self.lotes.ventana * 1000:.1f} ms)")
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            worker.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor HTTP de predicción TrueShot")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-lote", type=int, default=MAX_LOTE)
+    parser.add_argument("--ventana-ms", type=float, default=VENTANA_LOTE_MS)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    modelo = ModeloTrueShot.cargar()
+    modelo.predecir_lote([], [], [])   # arma las tablas numpy antes del primer request
+    print(f"Modelo cargado en {(time.perf_counter() - t0) * 1000:.0f} ms")
+    try:
+        asyncio.run(ServidorTrueShot(modelo, args.max_lote, args.ventana_ms).servir(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()